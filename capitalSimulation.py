@@ -5,10 +5,16 @@ from matplotlib import rcParams
 import seaborn as sns
 from matplotlib.patches import Rectangle
 
+from simcore import (INVESTMENT_RETURN, STANDARD_SALARY, STANDARD_SALARY_YEARS, START_AGE, TAX_RATE,
+                     affordable_monthly, event_cost_schedule, future_value, life_events,
+                     living_cost_schedule, recurring_costs, required_monthly_contribution,
+                     simulate_with_life_events, take_home_income, target_probability_grid,
+                     yearly_contribution_path)
+from simcore.cache import cached_balance_path, default_cache
+from simcore.plotting import setup_japanese_font
+
 # 日本語フォントの設定
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
-plt.rcParams['axes.unicode_minus'] = False
+setup_japanese_font()
 
 # 保存用ディレクトリ
 save_dir = "asset_simulation_with_life_events"
@@ -16,116 +22,17 @@ import os
 if not os.path.exists(save_dir):
     os.makedirs(save_dir)
 
-# ライフイベントの定義（入社年齢23歳想定）
-life_events = {
-    3: {'name': '一人暮らし開始', 'cost': 50, 'type': 'single'},  # 引越し・家具等
-    5: {'name': '車購入', 'cost': 200, 'type': 'single'},
-    7: {'name': '結婚', 'cost': 300, 'type': 'single'},
-    8: {'name': '新婚旅行', 'cost': 80, 'type': 'single'},
-    10: {'name': '住宅購入頭金', 'cost': 500, 'type': 'single'},
-    12: {'name': '第一子出産', 'cost': 50, 'type': 'single'},
-    15: {'name': '第二子出産', 'cost': 50, 'type': 'single'},
-    18: {'name': '車買い替え', 'cost': 250, 'type': 'single'},
-}
-
-# 継続的な支出の追加（年額）
-recurring_costs = {
-    10: {'name': '住宅ローン', 'annual_cost': 120},  # 月10万円
-    12: {'name': '子育て費用', 'annual_cost': 60},   # 月5万円
-    15: {'name': '子育て費用増', 'annual_cost': 120}, # 月10万円（2人分）
-}
-
-# 基本パラメータ
-TAX_RATE = 0.20
-INVESTMENT_RETURN = 0.05
-SAVINGS_RATE = 0.0001
-
-# 標準グループのデータ（前回より）
-standard_years = [1, 2, 3, 4, 6, 8, 11, 14, 17, 20]
-standard_salary = [340, 340, 390, 430, 480, 520, 590, 700, 800, 900]
-
-# 1. ライフイベント込みの資産シミュレーション
-def simulate_with_life_events(salary_years, salary_amounts, max_years=20, 
-                             include_events=True, savings_rate_base=0.25):
-    years = np.arange(1, max_years + 1)
-    salaries = np.interp(years, salary_years, salary_amounts)
-    
-    # 結果を格納
-    investment_history = []
-    savings_history = []
-    available_cash = []
-    cumulative_events_cost = []
-    monthly_savings_history = []
-    
-    investment_balance = 0
-    savings_balance = 0
-    total_event_cost = 0
-    
-    for i, year in enumerate(years):
-        # 手取り計算
-        take_home = salaries[i] * (1 - TAX_RATE) * 10000
-        
-        # 基本生活費（年次により変動）
-        if year <= 3:
-            living_cost = 20 * 12 * 10000  # 月20万円
-        elif year <= 7:
-            living_cost = 23 * 12 * 10000  # 月23万円
-        elif year <= 15:
-            living_cost = 25 * 12 * 10000  # 月25万円
-        else:
-            living_cost = 28 * 12 * 10000  # 月28万円
-        
-        # 継続的な支出を追加
-        for start_year, cost_info in recurring_costs.items():
-            if year >= start_year:
-                living_cost += cost_info['annual_cost'] * 10000
-        
-        # 利用可能額
-        available = take_home - living_cost
-        
-        # ライフイベントの支出
-        event_cost = 0
-        if include_events and year in life_events:
-            event_cost = life_events[year]['cost'] * 10000
-            total_event_cost += event_cost
-        
-        # 実際の貯蓄可能額
-        actual_savings = max(0, available - event_cost)
-        
-        # 貯蓄率の調整（ライフイベント時は貯蓄率を下げる）
-        if event_cost > 0:
-            adjusted_rate = min(0.1, actual_savings / take_home)  # 最低10%
-        else:
-            adjusted_rate = min(savings_rate_base, actual_savings / take_home)
-        
-        annual_savings = take_home * adjusted_rate
-        monthly_savings = annual_savings / 12
-        
-        # 積立投資
-        for month in range(12):
-            investment_balance = investment_balance * (1 + INVESTMENT_RETURN/12) + monthly_savings
-        
-        # 貯金
-        savings_balance = savings_balance * (1 + SAVINGS_RATE) + annual_savings
-        
-        # 記録
-        investment_history.append(investment_balance / 10000)
-        savings_history.append(savings_balance / 10000)
-        available_cash.append(available / 10000)
-        cumulative_events_cost.append(total_event_cost / 10000)
-        monthly_savings_history.append(monthly_savings / 10000)
-    
-    return {
-        'years': years,
-        'investment': investment_history,
-        'savings': savings_history,
-        'available_cash': available_cash,
-        'events_cost': cumulative_events_cost,
-        'monthly_savings': monthly_savings_history
-    }
+# ライフイベント・継続費用・基本パラメータ・標準グループの年収は simcore に集約
+standard_years = list(STANDARD_SALARY_YEARS)
+standard_salary = list(STANDARD_SALARY)
 
 # シミュレーション実行
-with_events = simulate_with_life_events(standard_years, standard_salary, include_events=True)
+# 市場リターンを確率的にした場合（年率5%・ボラティリティ15%の正規分布、10万経路）も計算
+with_events = simulate_with_life_events(standard_years, standard_salary, include_events=True,
+                                        n_paths=100_000, seed=42)
+market = with_events['monte_carlo']
+market_bands = market.percentiles([5, 25, 50, 75, 95])
+market_reach = market.reach_probability()
 without_events = simulate_with_life_events(standard_years, standard_salary, include_events=False)
 
 # 2. ライフイベントの影響を可視化
@@ -178,6 +85,13 @@ events_cost_10 = with_events['events_cost'][:10]
 ax3.bar(years_10, investment_10, color='#87CEEB', alpha=0.7, label='資産残高')
 ax3.plot(years_10, investment_10, 'o-', color='#FF6B6B', linewidth=3, markersize=8)
 
+# 市場変動を考慮した場合のパーセンタイル帯（5-95%・25-75%）と中央値
+ax3.fill_between(years_10, market_bands[0, :10], market_bands[4, :10], color='#FF6B6B', alpha=0.12,
+                 label='市場変動5-95%タイル')
+ax3.fill_between(years_10, market_bands[1, :10], market_bands[3, :10], color='#FF6B6B', alpha=0.22,
+                 label='市場変動25-75%タイル')
+ax3.plot(years_10, market_bands[2, :10], ':', color='#C0392B', linewidth=2, label='市場変動の中央値')
+
 # ライフイベントコストを表示
 for year in years_10:
     if year in life_events:
@@ -191,20 +105,13 @@ ax3.set_title('入社10年間の資産形成詳細', fontsize=14, fontweight='bo
 ax3.grid(True, alpha=0.3)
 
 # 10年後の目標ラインを追加
-ax3.axhline(y=500, color='green', linestyle='--', label='目標500万円')
-ax3.axhline(y=1000, color='orange', linestyle='--', label='理想1000万円')
+ax3.axhline(y=500, color='green', linestyle='--', label=f'目標500万円（到達確率{market_reach[0, 9]:.0%}）')
+ax3.axhline(y=1000, color='orange', linestyle='--', label=f'理想1000万円（到達確率{market_reach[1, 9]:.0%}）')
 ax3.legend()
 
 # グラフ4: 積立額別シミュレーション（10年）
 monthly_amounts = [1, 3, 5, 7, 10]  # 万円
-results_10y = []
-
-for amount in monthly_amounts:
-    balance = 0
-    monthly = amount * 10000
-    for _ in range(10 * 12):
-        balance = balance * (1 + INVESTMENT_RETURN/12) + monthly
-    results_10y.append(balance / 10000)
+results_10y = future_value(np.array(monthly_amounts) * 10000, INVESTMENT_RETURN, 10 * 12) / 10000
 
 bars = ax4.bar([f'{amt}万円' for amt in monthly_amounts], results_10y, 
                 color=['#FFE5E5', '#FFB6C1', '#87CEEB', '#98FB98', '#90EE90'])
@@ -251,19 +158,9 @@ ax1.set_ylim(0, 18)
 
 # グラフ2: 積立開始タイミングの影響
 start_timings = [1, 3, 5, 7]  # 開始年
-final_assets = []
-labels = []
-
-for start in start_timings:
-    balance = 0
-    monthly = 50000  # 月5万円固定
-    months = (10 - start + 1) * 12
-    
-    for _ in range(months):
-        balance = balance * (1 + INVESTMENT_RETURN/12) + monthly
-    
-    final_assets.append(balance / 10000)
-    labels.append(f'{start}年目\n開始')
+months = (10 - np.array(start_timings) + 1) * 12
+final_assets = future_value(50000, INVESTMENT_RETURN, months) / 10000  # 月5万円固定
+labels = [f'{start}年目\n開始' for start in start_timings]
 
 colors = ['#2E8B57', '#3CB371', '#90EE90', '#FFB6C1']
 bars = ax2.bar(labels, final_assets, color=colors)
@@ -323,12 +220,17 @@ targets = [
     {'amount': 2000, 'years': 20, 'label': '老後資金'}
 ]
 
-required_monthly = []
-for target in targets:
-    r = INVESTMENT_RETURN / 12
-    n = target['years'] * 12
-    monthly = target['amount'] * 10000 * r / ((1 + r)**n - 1) / 10000
-    required_monthly.append(monthly)
+target_amounts = np.array([t['amount'] for t in targets])
+target_years = np.array([t['years'] for t in targets])
+required_monthly = required_monthly_contribution(target_amounts, target_years, INVESTMENT_RETURN)
+
+# ライフイベント・継続費用で積立可能額に上限がある場合（標準グループの年収）
+plan_years = np.arange(1, target_years.max() + 1)
+plan_affordable = affordable_monthly(np.interp(plan_years, standard_years, standard_salary),
+                                     living_cost_schedule(plan_years, recurring_costs),
+                                     event_cost_schedule(plan_years, life_events), TAX_RATE, START_AGE)
+required_monthly_with_events = required_monthly_contribution(target_amounts, target_years,
+                                                             INVESTMENT_RETURN, affordable=plan_affordable)
 
 x = np.arange(len(targets))
 bars = ax4.bar(x, required_monthly, color=['#FFB6C1', '#87CEEB', '#98FB98', '#DDA0DD'])
@@ -496,30 +398,13 @@ fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
 initial_salaries = [300, 340, 400, 450]  # 万円
 salary_labels = ['300万円', '340万円\n(標準)', '400万円', '450万円']
 
-for i, initial_salary in enumerate(initial_salaries):
-    # 10年間の資産推移を計算
-    years = np.arange(1, 11)
-    assets = []
-    
-    for year in years:
-        # 簡易的な昇給モデル（年3%）
-        current_salary = initial_salary * (1.03 ** (year - 1))
-        take_home = current_salary * 0.8 * 10000
-        
-        # 積立率25%
-        monthly_saving = take_home * 0.25 / 12
-        
-        # 資産計算
-        if year == 1:
-            balance = 0
-        else:
-            balance = assets[-1] * 10000
-        
-        for month in range(12):
-            balance = balance * (1 + INVESTMENT_RETURN/12) + monthly_saving
-        
-        assets.append(balance / 10000)
-    
+# 10年間の資産推移を計算（簡易的な昇給モデル：年3%、手取りの25%を積立）
+years = np.arange(1, 11)
+salary_by_year = np.outer(initial_salaries, 1.03 ** (years - 1))
+monthly_saving_by_year = take_home_income(salary_by_year, TAX_RATE, START_AGE) * 10000 * 0.25 / 12
+salary_based_assets = yearly_contribution_path(monthly_saving_by_year, INVESTMENT_RETURN) / 10000
+
+for i, assets in enumerate(salary_based_assets):
     ax1.plot(years, assets, 'o-', linewidth=2.5, markersize=8, 
              label=salary_labels[i])
 
@@ -531,19 +416,7 @@ ax1.legend()
 ax1.set_xlim(0, 11)
 
 # 10年後の資産額比較
-final_assets = []
-for initial_salary in initial_salaries:
-    # 10年間の計算
-    balance = 0
-    for year in range(1, 11):
-        current_salary = initial_salary * (1.03 ** (year - 1))
-        take_home = current_salary * 0.8 * 10000
-        monthly_saving = take_home * 0.25 / 12
-        
-        for month in range(12):
-            balance = balance * (1 + INVESTMENT_RETURN/12) + monthly_saving
-    
-    final_assets.append(balance / 10000)
+final_assets = salary_based_assets[:, -1]
 
 bars = ax2.bar(salary_labels, final_assets, color=['#FFE5E5', '#87CEEB', '#98FB98', '#90EE90'])
 
@@ -595,6 +468,19 @@ print("-" * 70)
 print("300万円    | 5年    | 4.4万円          | 264万円")
 print("500万円    | 7年    | 5.3万円          | 445万円")
 print("1000万円   | 10年   | 7.9万円          | 948万円")
+print("※ライフイベント・継続費用を考慮した場合（標準グループ）")
+for target, monthly in zip(targets, required_monthly_with_events):
+    needed = f'{monthly:.1f}万円' if not np.isnan(monthly) else '積立可能額の範囲では未達'
+    print(f"  {target['label']}（{target['amount']}万円/{target['years']}年）: {needed}")
+
+print("\n【4-2. 市場変動を考慮した10年後の資産（年率5%・変動15%、10万経路）】")
+print(f"中央値: {market_bands[2, 9]:.0f}万円（5%タイル {market_bands[0, 9]:.0f}万円 / 25%タイル {market_bands[1, 9]:.0f}万円"
+      f" / 75%タイル {market_bands[3, 9]:.0f}万円 / 95%タイル {market_bands[4, 9]:.0f}万円）")
+shortfall_10y = market.shortfall(10)
+for target, probability, expected, conditional in zip(shortfall_10y['target'], shortfall_10y['probability'],
+                                                      shortfall_10y['expected'], shortfall_10y['conditional']):
+    print(f"  {target:.0f}万円: 到達確率 {1 - probability:.1%} / 不足額の期待値 {expected:.0f}万円"
+          f" / 未達時の平均不足額 {conditional:.0f}万円")
 
 print("\n【5. 成功のための重要ポイント】")
 print("• 早期開始: 1年の遅れが10年後に100万円以上の差を生む")
@@ -620,43 +506,18 @@ with open(f'{save_dir}/life_event_simulation.csv', 'w', newline='', encoding='ut
     writer.writerow(['年次', '年収', '手取り', '生活費', 'イベント費用', 
                      '積立可能額', '投資残高', '貯金残高'])
     
-    for i in range(20):
-        year = i + 1
-        salary = np.interp(year, standard_years, standard_salary)
-        take_home = salary * 0.8
-        
-        # 生活費
-        if year <= 3:
-            living_cost = 20 * 12
-        elif year <= 7:
-            living_cost = 23 * 12
-        elif year <= 15:
-            living_cost = 25 * 12
-        else:
-            living_cost = 28 * 12
-        
-        # イベント費用
-        event_cost = life_events.get(year, {}).get('cost', 0)
-        
-        # 継続費用
-        for start_year, cost_info in recurring_costs.items():
-            if year >= start_year:
-                living_cost += cost_info['annual_cost']
-        
-        # 積立可能額
-        available = max(0, take_home - living_cost/12 - event_cost)
-        saving_amount = available * 0.25  # 25%を積立
-        
-        # 資産額（簡易計算）
-        if year <= len(with_events['investment']):
-            investment = with_events['investment'][year-1]
-            savings = with_events['savings'][year-1]
-        else:
-            investment = 0
-            savings = 0
-        
-        writer.writerow([year, salary, take_home, living_cost/12, event_cost,
-                        saving_amount, investment, savings])
+    # 手取り・生活費・イベント費用は simulate_with_life_events と同じ simcore の計算を使う
+    csv_years = with_events['years']
+    csv_salary = np.interp(csv_years, standard_years, standard_salary)
+    csv_take_home = take_home_income(csv_salary, TAX_RATE, START_AGE)
+    csv_living_cost = living_cost_schedule(csv_years, recurring_costs)
+    csv_event_cost = event_cost_schedule(csv_years, life_events)
+    # 積立可能額（投資残高・貯金残高を計算したときの年間積立額）
+    csv_saving = np.asarray(with_events['monthly_savings']) * 12
+
+    for row in zip(csv_years, csv_salary, csv_take_home, csv_living_cost / 12, csv_event_cost, csv_saving,
+                   with_events['investment'], with_events['savings']):
+        writer.writerow(row)
 
 print(f"\nシミュレーション詳細データを保存しました:")
 print(f"- {save_dir}/life_event_simulation.csv")
@@ -740,16 +601,11 @@ colors = ['#FFE5E5', '#87CEEB', '#98FB98', '#90EE90']
 
 # 5年後と10年後の資産額
 years = [5, 10]
+salary_by_year = np.outer(initial_salaries, 1.03 ** np.arange(max(years)))
+salary_paths = yearly_contribution_path(take_home_income(salary_by_year, TAX_RATE, START_AGE) * 0.25 / 12 * 10000,
+                                       0.05) / 10000
 for i, salary in enumerate(initial_salaries):
-    assets = []
-    for year in years:
-        balance = 0
-        for y in range(1, year + 1):
-            current_salary = salary * (1.03 ** (y - 1))
-            monthly_saving = current_salary * 0.8 * 0.25 / 12 * 10000
-            for m in range(12):
-                balance = balance * (1 + 0.05/12) + monthly_saving
-        assets.append(balance / 10000)
+    assets = salary_paths[i, np.array(years) - 1]
     
     ax_salary.plot([0, 1], assets, 'o-', linewidth=2.5, markersize=10,
                    label=f'初任給{salary}万円', color=colors[i])
@@ -813,20 +669,10 @@ ax_guide.grid(True, alpha=0.3)
 ax_diff = fig.add_subplot(gs[2, 0])
 
 years_diff = np.arange(1, 21)
-diff_percentage = []
-for year in years_diff:
-    # 月5万円積立の場合
-    investment = 0
-    savings = 0
-    monthly = 50000
-    
-    for y in range(year):
-        for m in range(12):
-            investment = investment * (1 + 0.05/12) + monthly
-            savings = savings * (1 + 0.0001/12) + monthly
-    
-    diff = (investment / savings - 1) * 100
-    diff_percentage.append(diff)
+# 月5万円積立の場合
+investment = cached_balance_path(50000, 0.05, 20 * 12, step=12)
+savings = cached_balance_path(50000, 0.0001, 20 * 12, step=12)
+diff_percentage = (investment / savings - 1) * 100
 
 ax_diff.plot(years_diff, diff_percentage, 'o-', linewidth=3, markersize=6, color='#FF6B6B')
 ax_diff.fill_between(years_diff, 0, diff_percentage, alpha=0.3, color='#FFB6C1')
@@ -895,28 +741,9 @@ fig2.suptitle('新入社員のための資産形成シミュレーター', fonts
 ax_slider = fig2.add_subplot(gs2[0, :2])
 
 monthly_amounts = [1, 2, 3, 5, 7, 10, 15]
-results_5y = []
-results_10y = []
-results_20y = []
-
-for amount in monthly_amounts:
-    # 5年後
-    balance_5y = 0
-    for _ in range(5 * 12):
-        balance_5y = balance_5y * (1 + 0.05/12) + amount * 10000
-    results_5y.append(balance_5y / 10000)
-    
-    # 10年後
-    balance_10y = 0
-    for _ in range(10 * 12):
-        balance_10y = balance_10y * (1 + 0.05/12) + amount * 10000
-    results_10y.append(balance_10y / 10000)
-    
-    # 20年後
-    balance_20y = 0
-    for _ in range(20 * 12):
-        balance_20y = balance_20y * (1 + 0.05/12) + amount * 10000
-    results_20y.append(balance_20y / 10000)
+# 5年後・10年後・20年後を一度に計算
+horizons = np.array([5, 10, 20])[:, np.newaxis] * 12
+results_5y, results_10y, results_20y = future_value(np.array(monthly_amounts) * 10000, 0.05, horizons) / 10000
 
 # 3つの期間を同時にプロット
 x = np.arange(len(monthly_amounts))
@@ -1017,26 +844,15 @@ ax_tax = fig2.add_subplot(gs2[1, 2:])
 years_tax = np.arange(1, 21)
 monthly_investment = 50000
 
-nisa_balance = []
-taxable_balance = []
 tax_rate = 0.20315  # 譲渡益税
 
-for year in years_tax:
-    # NISA（非課税）
-    balance_nisa = 0
-    for _ in range(year * 12):
-        balance_nisa = balance_nisa * (1 + 0.05/12) + monthly_investment
-    nisa_balance.append(balance_nisa / 10000)
-    
-    # 課税口座
-    balance_taxable = 0
-    for _ in range(year * 12):
-        balance_taxable = balance_taxable * (1 + 0.05/12) + monthly_investment
-    # 売却時の税金を考慮
-    principal = monthly_investment * year * 12 / 10000
-    gain = balance_taxable / 10000 - principal
-    tax = gain * tax_rate
-    taxable_balance.append(balance_taxable / 10000 - tax)
+# NISA（非課税）：各年末の残高を一度に計算
+nisa_balance = cached_balance_path(monthly_investment, 0.05, 20 * 12, step=12) / 10000
+
+# 課税口座：運用益は同じで、売却時の税金を考慮
+principal = monthly_investment * years_tax * 12 / 10000
+gain = nisa_balance - principal
+taxable_balance = nisa_balance - gain * tax_rate
 
 ax_tax.plot(years_tax, nisa_balance, 'o-', linewidth=3, markersize=6,
             label='NISA（非課税）', color='#4ECDC4')
@@ -1148,6 +964,7 @@ print("生成されたダッシュボード:")
 print("- 15_comprehensive_dashboard.png: 包括的ダッシュボード")
 print("- 16_interactive_simulator_dashboard.png: インタラクティブシミュレーター")
 print("- 17_complete_guide_one_page.png: 1枚完全ガイド")
+print("- 18_target_achievement_probability.png: 目標額・年数ごとの到達確率")
 
 # 最終的な1枚まとめシートの詳細実装
 fig3 = plt.figure(figsize=(16, 20))
@@ -1384,10 +1201,43 @@ plt.tight_layout()
 plt.savefig(f'{save_dir}/17_complete_guide_one_page.png', dpi=300, bbox_inches='tight')
 plt.close()
 
+# 18. 目標額 × 年数ごとの到達確率（95%信頼区間の幅が1%以下になるまで経路を追加）
+probability_targets = np.array([100, 200, 300, 500, 700, 1000, 1500, 2000])
+probability_years = np.arange(1, 21)
+achievement = target_probability_grid(np.repeat(with_events['monthly_savings'], 12),
+                                      probability_targets, probability_years, max_paths=200_000,
+                                      seed=42, ci_width=0.01)
+achievement_probability = achievement.probability()
+achievement_lower, achievement_upper = achievement.interval()
+
+fig, ax = plt.subplots(figsize=(16, 7))
+sns.heatmap(achievement_probability * 100, annot=True, fmt='.0f', cmap='YlGn', vmin=0, vmax=100,
+            xticklabels=probability_years, yticklabels=[f'{t:,}万円' for t in probability_targets],
+            cbar_kws={'label': '到達確率（%）'}, annot_kws={'fontsize': 8}, ax=ax)
+ax.invert_yaxis()
+ax.set_xlabel('入社後年数', fontsize=12)
+ax.set_ylabel('目標資産額', fontsize=12)
+ax.set_title('その年までに目標資産額へ到達する確率（標準グループ・ライフイベント考慮、年率5%・ボラティリティ15%）',
+             fontsize=14, fontweight='bold')
+ax.text(0, -0.12, f'各セルの95%信頼区間の幅は{achievement.width().max():.1%}以下'
+        f'（試行回数 {achievement.trials.min():,}〜{achievement.trials.max():,}経路）',
+        transform=ax.transAxes, fontsize=10)
+plt.tight_layout()
+plt.savefig(f'{save_dir}/18_target_achievement_probability.png', dpi=300, bbox_inches='tight')
+plt.close()
+
+print("\n【目標到達確率（95%信頼区間）】")
+for year in (5, 10, 15, 20):
+    column = year - 1
+    cells = [f'{t:,}万円 {achievement_probability[i, column]:.1%}'
+             f'[{achievement_lower[i, column]:.1%}-{achievement_upper[i, column]:.1%}]'
+             for i, t in enumerate(probability_targets) if t in (500, 1000, 2000)]
+    print(f"{year:2d}年目まで: " + " / ".join(cells))
+
 print("\n【最終まとめ】")
 print("生成された全ファイル一覧:")
 print("-" * 60)
-for i in range(1, 18):
+for i in range(1, 19):
     print(f"{i:02d}. {save_dir}/{i:02d}_*.png")
 print("-" * 60)
 print("\n新入社員の方は「17_complete_guide_one_page.png」を")
@@ -1409,4 +1259,8 @@ print("- 13_action_plan_dashboard.png: アクションプランダッシュボ
 print("- 14_salary_based_simulation.png: 年収別シミュレーション")
 print("- 15_comprehensive_dashboard.png: 総合ダッシュボード")
 print("- life_event_simulation.csv: ライフイベント詳細データ")
-print("- investment_plans_comparison.csv: 投資プラン比較表")
\ No newline at end of file
+print("- investment_plans_comparison.csv: 投資プラン比較表")
+
+cache_stats = default_cache.stats()
+print(f"\nシナリオキャッシュ: ヒット {cache_stats['memory_hits'] + cache_stats['disk_hits']}回 / "
+      f"ミス {cache_stats['misses']}回（ヒット率 {cache_stats['hit_rate']:.0%}）")
\ No newline at end of file
@@ -3,12 +3,12 @@ import numpy as np
 import seaborn as sns
 import os
 
-# 日本語フォントの設定（ご自身の環境に合わせて調整してください）
-# Windows: 'Yu Gothic', 'Meiryo'
-# Mac: 'Hiragino Sans'
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Takao', 'IPAexGothic', 'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
-plt.rcParams['axes.unicode_minus'] = False
+from simcore import AGE_SALARY_CURVES
+from simcore.cache import cached_linear_recurrence, default_cache
+from simcore.plotting import setup_japanese_font
+
+# 日本語フォントの設定
+setup_japanese_font()
 
 # 保存用ディレクトリの作成
 save_dir = "seminar_graphs_v2"
@@ -17,12 +17,7 @@ if not os.path.exists(save_dir):
 
 # --- シミュレーションデータの生成 ---
 # キャリアパスと年収データ
-career_data = {
-    'age':       [22, 25, 28, 33, 38, 46, 65],
-    'std_salary': [344, 402, 506, 686, 850, 1144, 1144],
-    'high_salary':[344, 441, 605, 850, 1079, 1144, 1144],
-    'low_salary': [344, 362, 417, 522, 686, 1144, 1144]
-}
+career_data = AGE_SALARY_CURVES
 
 # 1年ごとの詳細データを生成
 ages = np.arange(22, 66)
@@ -40,11 +35,7 @@ def create_01_introduction_gap():
     savings_only = 34.4 * 0.15 * 10 
     
     # 投資ありの10年後資産（標準シナリオ）
-    balance = 0
-    for i in range(10):
-        annual_saving = salaries['std'][i] * 0.15
-        balance = balance * 1.05 + annual_saving
-    investment_asset = balance
+    investment_asset = cached_linear_recurrence(0.05, salaries['std'][:10] * 0.15)[-1]
 
     ax1.bar(['資産'], [savings_only], color='#a2d2ff', width=0.5)
     ax1.text(0, savings_only / 2, '貯金のみ', ha='center', va='center', fontsize=20, fontweight='bold', color='#023047')
@@ -111,10 +102,7 @@ def create_04_compound_interest_snowball():
 
     years = np.arange(0, 44)
     principal = 3 * 12 * years
-    asset_3 = [3*12 if i == 0 else asset * (1.03) + 3*12 for i, asset in enumerate([0] + [0]*(len(years)-1))]
-    for i in range(1, len(years)): asset_3[i] = asset_3[i-1] * 1.03 + 3*12
-    asset_5 = [3*12 if i == 0 else asset * (1.05) + 3*12 for i, asset in enumerate([0] + [0]*(len(years)-1))]
-    for i in range(1, len(years)): asset_5[i] = asset_5[i-1] * 1.05 + 3*12
+    asset_3, asset_5 = cached_linear_recurrence(np.array([[0.03], [0.05]]), np.full(len(years), 3 * 12))
     
     ax.stackplot(years, principal, [a - p for a, p in zip(asset_5, principal)],
                  labels=['元本', '運用益'], colors=['#a2d2ff', '#ffb703'], alpha=0.8)
@@ -166,13 +154,8 @@ def create_05_career_mountain():
 def create_06_asset_roadmap_standard():
     fig, ax = plt.subplots(figsize=(14, 8))
     
-    # 標準シナリオの資産推移を計算
-    assets = []
-    balance = 0
-    for i, age in enumerate(ages):
-        annual_saving = salaries['std'][i] * 0.20 # 手取りの20%
-        balance = balance * 1.05 + annual_saving
-        assets.append(balance)
+    # 標準シナリオの資産推移を計算（手取りの20%）
+    assets = cached_linear_recurrence(0.05, salaries['std'] * 0.20)
 
     ax.plot(ages, assets, color='#4ECDC4', lw=4, label='資産額')
     ax.fill_between(ages, 0, assets, color='#4ECDC4', alpha=0.1)
@@ -207,12 +190,7 @@ def create_07_choice_contribution():
     colors = {'保守(10%)': '#a2d2ff', '標準(20%)': '#8ecae6', '積極(30%)': '#ffb703'}
     
     for name, rate in plans.items():
-        assets = []
-        balance = 0
-        for i, age in enumerate(ages):
-            annual_saving = salaries['std'][i] * rate
-            balance = balance * 1.05 + annual_saving
-            assets.append(balance)
+        assets = cached_linear_recurrence(0.05, salaries['std'] * rate)
         
         ax.plot(ages, assets, label=f'{name}: {assets[-1]/10000:.1f}億円', 
                 color=colors[name], lw=4 if name == '標準(20%)' else 2.5)
@@ -235,12 +213,7 @@ def create_08_choice_return():
     colors = {'保守(3%)': '#a2d2ff', '標準(5%)': '#8ecae6', '積極(7%)': '#ffb703'}
     
     for name, rate in returns.items():
-        assets = []
-        balance = 0
-        for i, age in enumerate(ages):
-            annual_saving = salaries['std'][i] * 0.20
-            balance = balance * rate + annual_saving
-            assets.append(balance)
+        assets = cached_linear_recurrence(rate - 1, salaries['std'] * 0.20)
             
         ax.plot(ages, assets, label=f'{name}: {assets[-1]/10000:.1f}億円', 
                 color=colors[name], lw=4 if name == '標準(5%)' else 2.5)
@@ -290,4 +263,7 @@ if __name__ == '__main__':
     create_08_choice_return()
     create_09_action_plan_3steps()
     
-    print(f"9個のグラフが '{save_dir}/' ディレクトリに保存されました。")
\ No newline at end of file
+    print(f"9個のグラフが '{save_dir}/' ディレクトリに保存されました。")
+    cache_stats = default_cache.stats()
+    print(f"シナリオキャッシュ: ヒット {cache_stats['memory_hits'] + cache_stats['disk_hits']}回 / "
+          f"ミス {cache_stats['misses']}回（ヒット率 {cache_stats['hit_rate']:.0%}）")
\ No newline at end of file
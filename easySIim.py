@@ -1,9 +1,11 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from simcore import solve_linear_recurrence
+from simcore.plotting import setup_japanese_font
+
 # 日本語フォントの設定
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Takao', 'IPAexGothic', 'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
+setup_japanese_font()
 
 # シンプルな比較
 fig, ax = plt.subplots(figsize=(12, 8))
@@ -17,11 +19,9 @@ principal = years * 36  # 元本
 # 銀行預金（金利0.001%）
 bank = principal.copy()  # ほぼ元本のまま
 
-# 投資（年利6%）の計算
-investment = np.zeros_like(years, dtype=float)
-for i, year in enumerate(years):
-    for y in range(year):
-        investment[i] += 36 * (1.06 ** (year - y))
+# 投資（年利6%）の計算：年初に36万円を積み立て、その年の運用益も受け取る
+annual_path = solve_linear_recurrence(0.06, np.full(years[-1], 36 * 1.06))
+investment = np.concatenate([[0.0], annual_path])[years]
 
 # 積み上げ棒グラフ
 bar_width = 1.5
@@ -5,34 +5,51 @@ from matplotlib import rcParams
 import seaborn as sns
 import os
 
+from simcore import (CURRENT_ORGANIZATION, DEFAULT_COHORT_MODEL, DEFAULT_TENURE_RECORDS, GRADES, HIRING_LAST_YEAR,
+                     HIRING_THIS_YEAR, LOWER_PATH, STANDARD_PATH, UPPER_PATH, calibrate_cohort_model,
+                     cohort_model_from_survival, first_passage, fit_by_tier, kaplan_meier, load_tenure_records,
+                     project_organization, reach_probability, simulate_cohort)
+from simcore.plotting import setup_japanese_font
+
 # 保存用ディレクトリの作成
 save_dir = "career_simulation_graphs"
 if not os.path.exists(save_dir):
     os.makedirs(save_dir)
 
 # 日本語フォントの設定
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meirio', 'Takao', 'IPAexGothic', 'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
-plt.rcParams['axes.unicode_minus'] = False
-
-# データの準備
-# 上位予想（上位10%）
-upper_years = [1, 2, 3, 4, 5, 7, 9, 11, 13, 16]
-upper_salary = [340, 390, 430, 480, 520, 590, 700, 800, 900, 980]
-upper_grade = ['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3']
-upper_retention = [100, 92, 85, 80, 75, 68, 60, 55, 50, 45]
-
-# 標準予想（中央50%）
-standard_years = [1, 2, 3, 4, 6, 8, 11, 14, 17]
-standard_salary = [340, 340, 390, 430, 480, 520, 590, 700, 800]
-standard_grade = ['B2', 'B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2']
-standard_retention = [100, 95, 90, 85, 75, 65, 55, 45, 40]
-
-# 下位予想（下位25%）
-lower_years = [1, 3, 5, 7, 10, 13, 16]
-lower_salary = [340, 340, 390, 430, 480, 520, 590]
-lower_grade = ['B2', 'B2', 'B1', 'P4', 'P3', 'P2', 'P1']
-lower_retention = [100, 90, 80, 70, 55, 45, 35]
+setup_japanese_font()
+
+# データの準備（simcore.salary のキャリアパス）
+upper_years = list(UPPER_PATH.years)
+upper_salary = list(UPPER_PATH.salary)
+upper_grade = list(UPPER_PATH.grade)
+upper_retention = list(UPPER_PATH.retention)
+
+standard_years = list(STANDARD_PATH.years)
+standard_salary = list(STANDARD_PATH.salary)
+standard_grade = list(STANDARD_PATH.grade)
+standard_retention = list(STANDARD_PATH.retention)
+
+lower_years = list(LOWER_PATH.years)
+lower_salary = list(LOWER_PATH.salary)
+lower_grade = list(LOWER_PATH.grade)
+lower_retention = list(LOWER_PATH.retention)
+
+# 在籍記録（data/tenure_records.csv）があれば、層ごとのカプラン・マイヤー推定で離職率を置き換える
+retention_fits = None
+cohort_model = DEFAULT_COHORT_MODEL
+if os.path.exists(DEFAULT_TENURE_RECORDS):
+    tenure_records = load_tenure_records()
+    if tenure_records.tier is not None:
+        retention_fits = fit_by_tier(tenure_records, 'kaplan-meier', tiers=list(cohort_model.tiers))
+    else:
+        overall_fit = kaplan_meier(tenure_records.tenure, tenure_records.event)
+        retention_fits = {tier: overall_fit for tier in cohort_model.tiers}
+    cohort_model = cohort_model_from_survival(retention_fits, cohort_model)
+
+# 新卒コホートのエージェント・ベース・シミュレーション（20万人、層ごとの昇進・離職はキャリアパスから推定）
+cohort = simulate_cohort(200_000, years=20, model=cohort_model, seed=42, salary_year=10)
+cohort_retention = cohort.retention()
 
 # 1. 年収推移グラフ
 plt.figure(figsize=(10, 8))
@@ -54,14 +71,18 @@ plt.tight_layout()
 plt.savefig(f'{save_dir}/01_salary_progression.png', dpi=300, bbox_inches='tight')
 plt.close()
 
-# 2. 残存率グラフ
+# 2. 残存率グラフ（線はコホート・シミュレーション、点はキャリアパスの想定値）
 plt.figure(figsize=(10, 8))
-plt.plot(upper_years, upper_retention, 'o-', linewidth=2.5, markersize=8,
-         label='上位10%', color='#FF6B6B')
-plt.plot(standard_years, standard_retention, 's-', linewidth=2.5, markersize=8,
-         label='標準50%', color='#4ECDC4')
-plt.plot(lower_years, lower_retention, '^-', linewidth=2.5, markersize=8,
-         label='下位25%', color='#95A5A6')
+for tier, (path_years, path_retention, marker, label, color) in enumerate([
+        (upper_years, upper_retention, 'o', '上位10%', '#FF6B6B'),
+        (standard_years, standard_retention, 's', '標準50%', '#4ECDC4'),
+        (lower_years, lower_retention, '^', '下位25%', '#95A5A6')]):
+    plt.plot(cohort.years, cohort_retention[:, tier], '-', linewidth=2.5, label=label, color=color)
+    plt.plot(path_years, path_retention, marker, markersize=8, color=color)
+    if retention_fits is not None:
+        # 在籍記録から推定した残存率の95%信頼帯
+        lower, upper = retention_fits[cohort_model.tiers[tier]].confidence_band(cohort.years - 1)
+        plt.fill_between(cohort.years, lower * 100, upper * 100, step='post', alpha=0.15, color=color)
 
 plt.xlabel('勤続年数', fontsize=12)
 plt.ylabel('残存率（%）', fontsize=12)
@@ -77,53 +98,13 @@ plt.close()
 # 3. グレード分布の積み上げ面グラフ
 plt.figure(figsize=(12, 8))
 
-# 各年次でのグレード別人数を推定（新卒54人ベース）
-years = np.arange(1, 21)
-grade_distribution = pd.DataFrame(index=years, columns=['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3'])
-grade_distribution = grade_distribution.fillna(0)
-
-# 簡易的な分布モデル
-for year in years:
-    total = 54 * (0.95 ** (year-1))  # 離職率を考慮
-    if year <= 2:
-        grade_distribution.loc[year, 'B2'] = total * 0.7
-        grade_distribution.loc[year, 'B1'] = total * 0.3
-    elif year <= 4:
-        grade_distribution.loc[year, 'B1'] = total * 0.3
-        grade_distribution.loc[year, 'P4'] = total * 0.5
-        grade_distribution.loc[year, 'P3'] = total * 0.2
-    elif year <= 7:
-        grade_distribution.loc[year, 'P4'] = total * 0.2
-        grade_distribution.loc[year, 'P3'] = total * 0.4
-        grade_distribution.loc[year, 'P2'] = total * 0.3
-        grade_distribution.loc[year, 'P1'] = total * 0.1
-    elif year <= 10:
-        grade_distribution.loc[year, 'P3'] = total * 0.2
-        grade_distribution.loc[year, 'P2'] = total * 0.4
-        grade_distribution.loc[year, 'P1'] = total * 0.3
-        grade_distribution.loc[year, 'M3'] = total * 0.1
-    elif year <= 15:
-        grade_distribution.loc[year, 'P2'] = total * 0.2
-        grade_distribution.loc[year, 'P1'] = total * 0.4
-        grade_distribution.loc[year, 'M3'] = total * 0.2
-        grade_distribution.loc[year, 'M2'] = total * 0.15
-        grade_distribution.loc[year, 'M1'] = total * 0.05
-    else:
-        grade_distribution.loc[year, 'P1'] = total * 0.3
-        grade_distribution.loc[year, 'M3'] = total * 0.3
-        grade_distribution.loc[year, 'M2'] = total * 0.2
-        grade_distribution.loc[year, 'M1'] = total * 0.15
-        grade_distribution.loc[year, 'D3'] = total * 0.05
+# 各年次でのグレード別人数（コホート・シミュレーションを新卒54人あたりに換算）
+years = cohort.years
+grade_distribution = pd.DataFrame(cohort.scaled_grade_counts(54), index=years, columns=GRADES)
+grade_distribution = grade_distribution.loc[:, grade_distribution.sum() > 0]
 
 # 積み上げ面グラフ
-plt.stackplot(years, 
-              grade_distribution['B2'], grade_distribution['B1'],
-              grade_distribution['P4'], grade_distribution['P3'], 
-              grade_distribution['P2'], grade_distribution['P1'],
-              grade_distribution['M3'], grade_distribution['M2'], 
-              grade_distribution['M1'], grade_distribution['D3'],
-              labels=['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3'],
-              alpha=0.8)
+plt.stackplot(years, grade_distribution.T.values, labels=list(grade_distribution.columns), alpha=0.8)
 
 plt.xlabel('勤続年数', fontsize=12)
 plt.ylabel('社員数', fontsize=12)
@@ -138,30 +119,18 @@ plt.close()
 # 4. 10年後の年収分布（ヒストグラム）
 plt.figure(figsize=(10, 8))
 
-# 10年後の年収分布をシミュレーション
-np.random.seed(42)
-n_employees = 54
-
-# 各グループの人数
-n_upper = int(n_employees * 0.1)
-n_standard = int(n_employees * 0.65)
-n_lower = n_employees - n_upper - n_standard
-
-# 各グループの年収分布（正規分布でばらつきを追加）
-upper_10y = np.random.normal(700, 50, n_upper)
-standard_10y = np.random.normal(550, 40, n_standard)
-lower_10y = np.random.normal(450, 30, n_lower)
-
-all_salaries = np.concatenate([upper_10y, standard_10y, lower_10y])
+# 10年後も在籍している社員の年収分布（グレードの想定年収 × 個人差）
+all_salaries = cohort.salaries
 
-plt.hist(all_salaries, bins=20, alpha=0.7, color='#3498DB', edgecolor='black')
+plt.hist(all_salaries, bins=40, weights=np.full(len(all_salaries), 100 / len(all_salaries)),
+         alpha=0.7, color='#3498DB', edgecolor='black')
 plt.axvline(np.mean(all_salaries), color='red', linestyle='--', linewidth=2, 
             label=f'平均: {np.mean(all_salaries):.0f}万円')
 plt.axvline(np.median(all_salaries), color='green', linestyle='--', linewidth=2,
             label=f'中央値: {np.median(all_salaries):.0f}万円')
 
 plt.xlabel('入社10年後の年収（万円）', fontsize=12)
-plt.ylabel('人数', fontsize=12)
+plt.ylabel('構成比（%）', fontsize=12)
 plt.title('入社10年後の年収分布', fontsize=14, fontweight='bold')
 plt.legend()
 plt.grid(True, alpha=0.3, axis='y')
@@ -326,37 +295,11 @@ plt.close()
 # 9. グレード到達確率のヒートマップ
 plt.figure(figsize=(12, 8))
 
-# データの準備
-grades = ['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3']
+# 12グレード + 退職のマルコフ連鎖で、在籍を続けた場合に各グレード以上へ到達している確率を計算
 years_range = range(1, 21)
-
-# 到達確率マトリックスの作成
-probability_matrix = np.zeros((len(grades), len(years_range)))
-
-# 各グループの到達確率を設定（簡易モデル）
-for i, grade in enumerate(grades):
-    for j, year in enumerate(years_range):
-        # 基本的な到達確率の設定
-        if grade == 'B2':
-            probability_matrix[i, j] = 100 if year == 1 else 20 if year <= 3 else 5
-        elif grade == 'B1':
-            probability_matrix[i, j] = 0 if year == 1 else 80 if year == 2 else 60 if year <= 4 else 10
-        elif grade == 'P4':
-            probability_matrix[i, j] = 0 if year <= 2 else 70 if year == 3 else 80 if year == 4 else 40 if year <= 6 else 10
-        elif grade == 'P3':
-            probability_matrix[i, j] = 0 if year <= 3 else 50 if year == 4 else 70 if year <= 7 else 30 if year <= 10 else 10
-        elif grade == 'P2':
-            probability_matrix[i, j] = 0 if year <= 4 else 40 if year <= 8 else 60 if year <= 12 else 20
-        elif grade == 'P1':
-            probability_matrix[i, j] = 0 if year <= 5 else 20 if year <= 10 else 40 if year <= 15 else 30
-        elif grade == 'M3':
-            probability_matrix[i, j] = 0 if year <= 7 else 10 if year <= 12 else 20 if year <= 17 else 15
-        elif grade == 'M2':
-            probability_matrix[i, j] = 0 if year <= 9 else 5 if year <= 15 else 10
-        elif grade == 'M1':
-            probability_matrix[i, j] = 0 if year <= 11 else 3 if year <= 18 else 5
-        elif grade == 'D3':
-            probability_matrix[i, j] = 0 if year <= 14 else 1 if year <= 20 else 2
+reach = reach_probability(years=len(years_range), stay=True)
+grades = [grade for grade, probability in zip(GRADES, reach.max(axis=0)) if probability > 0]
+probability_matrix = reach[:, :len(grades)].T * 100
 
 # ヒートマップの作成
 sns.heatmap(probability_matrix, 
@@ -379,13 +322,8 @@ plt.close()
 # 10. 組織ピラミッド図
 plt.figure(figsize=(10, 8))
 
-# 現在の組織構成（推定）
-org_data = {
-    'Director (D1-D3)': 10,
-    'Manager (M1-M3)': 42,
-    'Professional (P1-P4)': 160,
-    'Basic (B1-B2)': 166
-}
+# 現在の組織構成（推定、simcore.organization）
+org_data = CURRENT_ORGANIZATION
 
 levels = list(org_data.keys())
 sizes = list(org_data.values())
@@ -395,6 +333,13 @@ colors = ['#FFD700', '#90EE90', '#87CEEB', '#FFB6C1']
 y_pos = np.arange(len(levels))
 bars = plt.barh(y_pos, sizes, color=colors, edgecolor='black', linewidth=1.5)
 
+# 昇進確率・離職率をこの構成と残存率に合わせて校正したモデルの構成（毎年同じ人数を15年間採用した場合）
+calibration = calibrate_cohort_model(cohort_model, history=15)
+fitted_pyramid = calibration.pyramid(sum(sizes))
+fitted_sizes = [fitted_pyramid[level][1] for level in levels]
+plt.scatter(fitted_sizes, y_pos, marker='D', s=80, color='black', zorder=5, label='校正モデルの構成')
+plt.legend(loc='lower right')
+
 # 各バーに人数と割合を表示
 total = sum(sizes)
 for i, (bar, size) in enumerate(zip(bars, sizes)):
@@ -412,6 +357,47 @@ plt.tight_layout()
 plt.savefig(f'{save_dir}/10_organization_pyramid.png', dpi=300, bbox_inches='tight')
 plt.close()
 
+# 11. 30年間の組織構成と人件費の推計（新卒採用を毎年重ねる、校正したモデルを使用）
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+
+hiring_plans = {f'毎年{HIRING_THIS_YEAR}人採用': HIRING_THIS_YEAR, f'毎年{HIRING_LAST_YEAR}人採用': HIRING_LAST_YEAR}
+projections = {label: project_organization(hiring, years=30, model=calibration.model)
+               for label, hiring in hiring_plans.items()}
+base_projection = projections[f'毎年{HIRING_THIS_YEAR}人採用']
+
+# 職位レベル別人数の積み上げ（毎年54人採用の場合）
+level_counts = base_projection.level_counts()
+ax1.stackplot(base_projection.years, *reversed(list(level_counts.values())),
+              labels=list(reversed(list(level_counts))), colors=list(reversed(colors)), alpha=0.8)
+ax1.set_xlabel('経過年数', fontsize=12)
+ax1.set_ylabel('社員数', fontsize=12)
+ax1.set_title(f'職位レベル別人数の推移（毎年{HIRING_THIS_YEAR}人採用）', fontsize=14, fontweight='bold')
+ax1.legend(loc='upper left')
+ax1.grid(True, alpha=0.3)
+ax1.set_xlim(0, 30)
+
+# 人件費（グレードの想定年収の合計）と社員数
+for (label, projection), color in zip(projections.items(), ['#4ECDC4', '#FF6B6B']):
+    ax2.plot(projection.years, projection.payroll() / 10000, '-', linewidth=2.5, color=color,
+             label=f'{label}：人件費（30年後 {projection.payroll()[-1] / 10000:.0f}億円）')
+ax2.set_xlabel('経過年数', fontsize=12)
+ax2.set_ylabel('人件費（億円/年）', fontsize=12)
+ax2.set_title('人件費と社員数の推移', fontsize=14, fontweight='bold')
+ax2.grid(True, alpha=0.3)
+ax2.set_xlim(0, 30)
+ax2_headcount = ax2.twinx()
+for (label, projection), color in zip(projections.items(), ['#4ECDC4', '#FF6B6B']):
+    ax2_headcount.plot(projection.years, projection.headcount(), '--', linewidth=2, color=color,
+                       label=f'{label}：社員数（30年後 {projection.headcount()[-1]:.0f}名）')
+ax2_headcount.set_ylabel('社員数', fontsize=12)
+lines = ax2.get_legend_handles_labels()
+headcount_lines = ax2_headcount.get_legend_handles_labels()
+ax2.legend(lines[0] + headcount_lines[0], lines[1] + headcount_lines[1], loc='upper left')
+
+plt.tight_layout()
+plt.savefig(f'{save_dir}/11_organization_projection.png', dpi=300, bbox_inches='tight')
+plt.close()
+
 # 保存完了メッセージ
 print("=" * 60)
 print("すべてのグラフが保存されました")
@@ -428,6 +414,7 @@ print("7. 07_career_comparison_table.png - キャリアパス比較表")
 print("8. 08_salary_growth_rate.png - 年収成長率の比較")
 print("9. 09_grade_probability_heatmap.png - グレード到達確率ヒートマップ")
 print("10. 10_organization_pyramid.png - 組織構成ピラミッド")
+print("11. 11_organization_projection.png - 30年間の組織構成・人件費の推計")
 print("=" * 60)
 
 # サマリーレポートをテキストファイルとして保存
@@ -450,6 +437,15 @@ with open(f'{save_dir}/career_simulation_summary.txt', 'w', encoding='utf-8') as
     f.write("・8-10年目 : マネージャー層への昇進が大きな分岐点\n")
     f.write("・15年目以降: ディレクター層は極めて限定的（全体の2-3%）\n\n")
     
+    f.write("【入社からの平均到達年数（マルコフ連鎖、到達する場合）】\n")
+    passage = first_passage()
+    for tier, label in zip(range(3), ['上位10%', '標準50%', '下位25%']):
+        milestones = [f"{grade} {passage['expected_years'][tier, GRADES.index(grade)]:.1f}年"
+                      f"（到達率{passage['probability'][tier, GRADES.index(grade)]:.0%}）"
+                      for grade in ['P4', 'P1', 'M3'] if passage['probability'][tier, GRADES.index(grade)] > 0]
+        f.write(f"・{label} : " + " / ".join(milestones) + "\n")
+    f.write("\n")
+    
     f.write("【年収成長率（入社時比）】\n")
     f.write(f"・上位10% : 10年で{700/340:.1f}倍、15年で{900/340:.1f}倍\n")
     f.write(f"・標準50% : 10年で{590/340:.1f}倍、15年で{700/340:.1f}倍\n")
@@ -459,6 +455,17 @@ with open(f'{save_dir}/career_simulation_summary.txt', 'w', encoding='utf-8') as
     f.write("・Director層 (D1-D3): 8-12名 (3%)\n")
     f.write("・Manager層 (M1-M3): 38-45名 (11%)\n")
     f.write("・Professional層 (P1-P4): 150-170名 (43%)\n")
-    f.write("・Basic層 (B1-B2): 150-170名 (43%)\n")
+    f.write("・Basic層 (B1-B2): 150-170名 (43%)\n\n")
+    
+    f.write(f"【昇進・離職率の校正（{calibration.evaluations}回評価、{calibration.elapsed:.2f}秒）】\n")
+    f.write("・昇進確率の倍率 : " + " / ".join(f"{level.split()[0]} {value:.2f}倍"
+                                        for level, value in calibration.promotion.items()) + "\n")
+    f.write("・離職率の倍率 : " + " / ".join(f"{tier} {value:.2f}倍"
+                                       for tier, value in calibration.attrition.items()) + "\n\n")
+    
+    f.write("【30年間の組織推計（新卒採用を毎年重ねた場合）】\n")
+    for label, projection in projections.items():
+        f.write(f"・{label} : 10年後 {projection.headcount()[10]:.0f}名 / 30年後 {projection.headcount()[-1]:.0f}名"
+                f"、人件費 {projection.payroll()[0] / 10000:.1f}億円 → {projection.payroll()[-1] / 10000:.1f}億円\n")
 
 print("\nサマリーレポートも保存されました: career_simulation_summary.txt")
\ No newline at end of file
@@ -1,40 +1,15 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from simcore import GRADE_SALARIES, GRADES, get_grade_and_salary, simulate_joint, solve_linear_recurrence
+from simcore.plotting import setup_japanese_font
+
 # 日本語フォントの設定
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Takao', 'IPAexGothic', 'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
-
-# グレードと想定年収
-grades = ['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3', 'D2', 'D1']
-salaries = [340, 390, 430, 480, 520, 590, 700, 800, 900, 980, 1100, 1300]
-
-# 年齢とグレードのマッピング（11年目でD2想定）
-def get_grade_and_salary(years_of_service):
-    if years_of_service <= 1:
-        return 'B2', 340
-    elif years_of_service <= 2:
-        return 'B1', 390
-    elif years_of_service <= 3:
-        return 'P4', 430
-    elif years_of_service <= 4:
-        return 'P3', 480
-    elif years_of_service <= 5:
-        return 'P2', 520
-    elif years_of_service <= 6:
-        return 'P1', 590
-    elif years_of_service <= 7:
-        return 'M3', 700
-    elif years_of_service <= 8:
-        return 'M2', 800
-    elif years_of_service <= 9:
-        return 'M1', 900
-    elif years_of_service <= 10:
-        return 'D3', 980
-    elif years_of_service <= 15:
-        return 'D2', 1100
-    else:
-        return 'D1', 1300
+setup_japanese_font()
+
+# グレードと想定年収、勤続年数とグレードのマッピング（11年目でD2想定）は simcore.salary に集約
+grades = GRADES
+salaries = GRADE_SALARIES
 
 # シミュレーション設定
 start_age = 22
@@ -43,14 +18,7 @@ years = np.arange(0, retirement_age - start_age + 1)
 ages = start_age + years
 
 # 年収の推移
-annual_salaries = []
-grade_history = []
-for year in years:
-    grade, salary = get_grade_and_salary(year + 1)
-    annual_salaries.append(salary)
-    grade_history.append(grade)
-
-annual_salaries = np.array(annual_salaries)
+grade_history, annual_salaries = get_grade_and_salary(years + 1)
 
 # 3つのケースでシミュレーション
 # ケース1: 貯金のみ（年収の20%）
@@ -62,34 +30,12 @@ investment_return_2 = 0.04
 savings_rate_3 = 0.25
 investment_return_3 = 0.06
 
-# 資産計算
-assets_case1 = np.zeros_like(years, dtype=float)
-assets_case2 = np.zeros_like(years, dtype=float)
-assets_case3 = np.zeros_like(years, dtype=float)
-cumulative_saved = np.zeros_like(years, dtype=float)
-
-for i in range(len(years)):
-    annual_savings_1 = annual_salaries[i] * savings_rate_1
-    annual_savings_2 = annual_salaries[i] * savings_rate_2
-    annual_savings_3 = annual_salaries[i] * savings_rate_3
-    
-    if i == 0:
-        assets_case1[i] = annual_savings_1
-        assets_case2[i] = annual_savings_2
-        assets_case3[i] = annual_savings_3
-        cumulative_saved[i] = annual_savings_1
-    else:
-        # ケース1: 貯金のみ
-        assets_case1[i] = assets_case1[i-1] * 1.00001 + annual_savings_1
-        
-        # ケース2: 控えめな投資
-        assets_case2[i] = assets_case2[i-1] * (1 + investment_return_2) + annual_savings_2
-        
-        # ケース3: 積極的な投資
-        assets_case3[i] = assets_case3[i-1] * (1 + investment_return_3) + annual_savings_3
-        
-        # 累積貯蓄額（ケース1の元本）
-        cumulative_saved[i] = cumulative_saved[i-1] + annual_savings_1
+# 資産計算（ケース1〜3と累積貯蓄額を一度に解く）
+# ケース1: 貯金のみ / ケース2: 控えめな投資 / ケース3: 積極的な投資 / 累積貯蓄額（ケース1の元本）
+case_returns = np.array([0.00001, investment_return_2, investment_return_3, 0.0])
+case_savings_rates = np.array([savings_rate_1, savings_rate_2, savings_rate_3, savings_rate_1])
+assets_case1, assets_case2, assets_case3, cumulative_saved = solve_linear_recurrence(
+    case_returns[:, np.newaxis], np.outer(case_savings_rates, annual_salaries))
 
 # メイングラフ
 fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
@@ -209,4 +155,14 @@ for check_age in [30, 40, 50, 60]:
     print(f"\n{check_age}歳（勤続{years_worked}年、{grade}グレード、年収{salary}万円）")
     print(f"  貯金のみ: {assets_case1[idx]:,.0f}万円")
     print(f"  控えめ投資: {assets_case2[idx]:,.0f}万円")
-    print(f"  積極投資: {assets_case3[idx]:,.0f}万円")
\ No newline at end of file
+    print(f"  積極投資: {assets_case3[idx]:,.0f}万円")
+
+# 昇進の早さと相場の両方がばらつく場合（昇進の経路 × 市場リターンの同時シミュレーション）
+# 積立は手取りから生活費・ライフイベント費用を引いた範囲で手取りの20%まで（離職後は積立なし）、
+# 年率5%・ボラティリティ15%、昇進確率は simcore.cohort の層別モデル
+joint = simulate_joint(100_000, savings_rate=0.20, mean=0.05, vol=0.15, ages=[30, 40, 50, 60], seed=42)
+print("\n【昇進 × 市場リターンの同時シミュレーション（10万人、手取りの20%まで積立、年率5%・リスク15%で運用）】")
+for (check_age, stats), retention in zip(joint.summary().items(), joint.retention()):
+    bands = stats['percentiles']
+    print(f"{check_age}歳: 中央値 {bands[50]:,.0f}万円（下位5% {bands[5]:,.0f}万円 〜 上位5% {bands[95]:,.0f}万円）、"
+          f"平均 {stats['mean']:,.0f}万円、在籍率 {retention:.0%}")
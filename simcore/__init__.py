@@ -0,0 +1,116 @@
+# simcore
+# 資産形成・キャリアシミュレーションの計算コア（描画処理を含まない）
+
+from .annuity import (
+    annuity_factor,
+    balance_path,
+    contribution_path,
+    future_value,
+    monthly_rate,
+    yearly_contribution_path,
+)
+from .bootstrap import IndexReturns, bootstrap_returns, drawdown_statistics, load_index_returns
+from .calibration import CalibrationResult, apply_multipliers, calibrate_cohort_model, minimize_bounded
+from .cohort import DEFAULT_COHORT_MODEL, CohortModel, CohortResult, cohort_model_from_paths, simulate_cohort
+from .compact import COMPACT_FLOAT, COMPACT_YEN, from_fixed_yen, precision_report, to_fixed_yen
+from .goal_seek import (
+    earliest_achievement_year,
+    project_balances,
+    required_monthly_contribution,
+    required_return,
+)
+from .joint import CHECK_AGES, JointResult, sample_career_paths, simulate_joint
+from .life_events import (
+    COMPACT_LIFE_EVENT_DTYPE,
+    LIFE_EVENT_DTYPE,
+    affordable_monthly,
+    event_cost_schedule,
+    living_cost_schedule,
+    monthly_savings_schedule,
+    simulate_life_events_batch,
+    take_home_income,
+)
+from .markov import STATES, first_passage, occupancy, reach_probability, transition_matrices
+from .monte_carlo import (
+    MonteCarloResult,
+    antithetic_shocks,
+    compact_precision_report,
+    lognormal_returns,
+    normal_returns,
+    pseudo_random_shocks,
+    return_sampler,
+    simulate_market_paths,
+    sobol_shocks,
+)
+from .organization import (
+    CURRENT_ORGANIZATION,
+    HIRING_LAST_YEAR,
+    HIRING_THIS_YEAR,
+    ORG_LEVELS,
+    OrganizationProjection,
+    project_organization,
+)
+from .parallel import block_seeds, ordered_map, parallel_reduce
+from .payroll import (
+    PAYROLL_DTYPE,
+    PAYROLL_FIELDS,
+    annual_take_home,
+    gross_for_take_home,
+    split_annual_salary,
+    standard_monthly_remuneration,
+    take_home_path,
+    take_home_pay,
+)
+from .probability import (
+    TargetProbabilityGrid,
+    clopper_pearson_interval,
+    target_probability_grid,
+    wilson_interval,
+)
+from .recurrence import returns_from_prices, solve_linear_recurrence
+from .regime import DEFAULT_REGIMES, RegimeModel, crash_statistics, regime_returns, simulate_crash_statistics
+from .retention import (
+    DEFAULT_TENURE_RECORDS,
+    KaplanMeier,
+    PiecewiseExponential,
+    TenureRecords,
+    WeibullFit,
+    cohort_model_from_survival,
+    fit_by_tier,
+    fit_piecewise_exponential,
+    fit_weibull,
+    kaplan_meier,
+    load_tenure_records,
+)
+from .salary import (
+    AGE_SALARY_CURVES,
+    CAREER_PATHS,
+    GRADE_LADDERS,
+    GRADE_SALARIES,
+    GRADE_SALARY,
+    GRADES,
+    LOWER_PATH,
+    STANDARD_PATH,
+    STANDARD_SALARY,
+    STANDARD_SALARY_YEARS,
+    UPPER_PATH,
+    CareerPath,
+    GradeLadder,
+    GradeLadderTable,
+    get_grade_and_salary,
+    grade_ladder_salaries,
+)
+from .scenarios import (
+    INVESTMENT_RETURN,
+    SAVINGS_RATE,
+    START_AGE,
+    TAX_RATE,
+    LifeEventScenario,
+    life_events,
+    recurring_costs,
+    simulate_with_life_events,
+)
+from .sensitivity import SENSITIVITY_AXES, SensitivityCube, evaluate_cube, final_assets
+from .sketch import QuantileSketch, RunningMoments
+from .sweep import policy_grid, sweep_policies, sweep_table, write_sweep_csv
+from .tail_risk import TailRiskResult, simulate_tail_risk
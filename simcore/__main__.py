@@ -0,0 +1,131 @@
+# simcore/__main__.py
+# 市場リターン・モンテカルロのバッチ実行
+#   python -m simcore --paths 100000000 --workers 64
+#   python -m simcore --tail --paths 2000000   # 重点サンプリングと普通のモンテカルロの比較
+#   python -m simcore --joint --paths 1000000   # 昇進 × 市場リターンの同時シミュレーション
+#   python -m simcore --sweep --hiring 54 80 --promotion 1.0 0.8 --output sweep.csv   # 人事施策のスイープ
+
+import argparse
+import time
+
+import numpy as np
+
+from .bootstrap import BOOTSTRAP_METHODS, bootstrap_returns, load_index_returns
+from .joint import CHECK_AGES, simulate_joint
+from .monte_carlo import RETURN_SAMPLERS, compact_precision_report, simulate_market_paths
+from .organization import ORG_LEVELS
+from .sweep import policy_grid, sweep_policies, write_sweep_csv
+from .tail_risk import simulate_tail_risk
+
+
+def tail_benchmark(args):
+    """最終残高の下位1%・0.1%を普通のモンテカルロ（--paths 本）と重点サンプリング（--tail-paths 本）で比べる"""
+    contributions = np.full(args.years * 12, args.monthly)
+    results = {}
+    for name, n_paths, tilt in (('モンテカルロ', args.paths, 0), ('重点サンプリング', args.tail_paths, args.tilt)):
+        started = time.perf_counter()
+        results[name] = simulate_tail_risk(contributions, n_paths, args.sampler, args.mean, args.vol, tilt=tilt,
+                                           seed=args.seed, workers=args.workers)
+        print(f'{name}: {n_paths:,}経路 {time.perf_counter() - started:.1f}秒')
+    brute, tilted = results.values()
+    for level in (0.01, 0.001):
+        for key, label in (('var', 'VaR'), ('cvar', 'CVaR')):
+            expected, actual = brute.summary([level])[level][key], tilted.summary([level])[level][key]
+            print(f'下位{level:.1%} {label:4s}: {expected:8.0f}万円 / {actual:8.0f}万円'
+                  f'（差 {actual / expected - 1:+.2%}）')
+
+
+def joint_distribution(args, sampler):
+    """昇進の経路と市場リターンを --paths 人分同時に抽選して、年齢ごとの資産の分布を表示する"""
+    started = time.perf_counter()
+    result = simulate_joint(args.paths, savings_rate=args.savings_rate, sampler=sampler, mean=args.mean,
+                            vol=args.vol, ages=args.ages, seed=args.seed, chunk_size=args.chunk,
+                            workers=args.workers)
+    print(f'{result.n_samples:,}人 × {max(result.ages) - 22 + 1}年: {time.perf_counter() - started:.1f}秒')
+    for (age, stats), retention in zip(result.summary().items(), result.retention()):
+        bands = ' / '.join(f'{q}%タイル {value:.0f}' for q, value in stats['percentiles'].items())
+        print(f"{age}歳: 平均 {stats['mean']:.0f}万円（{bands}）、在籍率 {retention:.0%}")
+
+
+def policy_sweep(args):
+    """採用人数・昇進率・離職率の全組み合わせを推計して、最終年の結果を表示・CSV に保存する"""
+    policies = policy_grid(args.hiring, args.promotion, args.attrition)
+    levels = [level for level in ORG_LEVELS if level.split()[0] in args.levels]
+    started = time.perf_counter()
+    table = sweep_policies(policies, args.horizon, promotion_levels=levels, workers=args.workers)
+    print(f'{len(policies)}施策 × {args.horizon}年: {time.perf_counter() - started:.1f}秒')
+    last = table['year'] == args.horizon
+    for i in np.flatnonzero(last):
+        print(f"採用{table['hiring'][i]:.0f}人 昇進×{table['promotion'][i]:.2f} 離職×{table['attrition'][i]:.2f}: "
+              f"{table['headcount'][i]:6.0f}名 人件費 {table['payroll'][i] / 10000:6.1f}億円 "
+              f"マネージャー比率 {table['manager_ratio'][i]:.1%}")
+    if args.output:
+        write_sweep_csv(table, args.output)
+        print(f'保存: {args.output}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='月額積立の市場リターン・モンテカルロ')
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--years', type=int, default=40)
+    parser.add_argument('--monthly', type=float, default=5.0, help='月額積立（万円）')
+    parser.add_argument('--mean', type=float, default=0.05)
+    parser.add_argument('--vol', type=float, default=0.15)
+    parser.add_argument('--sampler', choices=sorted(RETURN_SAMPLERS), default='normal')
+    parser.add_argument('--history', help='月次指数リターンの CSV / Parquet（指定するとブロック・ブートストラップ）')
+    parser.add_argument('--bootstrap', choices=sorted(BOOTSTRAP_METHODS), default='stationary')
+    parser.add_argument('--block', type=int, default=12, help='ブロック長（月）')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help='プロセス数（省略時は全コア）')
+    parser.add_argument('--chunk', type=int, default=8192, help='1チャンクの経路数')
+    parser.add_argument('--compact', action='store_true', help='経路と残高を float32 で持ってメモリを節約する')
+    parser.add_argument('--tail', action='store_true', help='最終残高の下側リスクを重点サンプリングと比較する')
+    parser.add_argument('--tail-paths', type=int, default=50_000, help='重点サンプリングの経路数')
+    parser.add_argument('--tilt', type=float, default=0.01, help='重点サンプリングで狙う下側確率')
+    parser.add_argument('--joint', action='store_true', help='昇進の経路と市場リターンを同時にシミュレーションする')
+    parser.add_argument('--savings-rate', type=float, default=0.25,
+                        help='手取りに対する積立率の上限（生活費・ライフイベント費用を引いた残りの範囲で積み立てる）')
+    parser.add_argument('--ages', type=int, nargs='+', default=list(CHECK_AGES), help='資産を確認する年齢')
+    parser.add_argument('--sweep', action='store_true', help='人事施策（採用・昇進・離職）の組み合わせを評価する')
+    parser.add_argument('--hiring', type=float, nargs='+', default=[54, 80], help='毎年の新卒採用人数')
+    parser.add_argument('--promotion', type=float, nargs='+', default=[1.0, 0.8], help='昇進率の倍率')
+    parser.add_argument('--attrition', type=float, nargs='+', default=[1.0], help='離職率の倍率')
+    parser.add_argument('--levels', nargs='+', default=['Manager'], help='昇進率の倍率をかける昇進先の職位レベル')
+    parser.add_argument('--horizon', type=int, default=30, help='組織推計の年数')
+    parser.add_argument('--output', help='スイープ結果の CSV の保存先')
+    args = parser.parse_args()
+
+    if args.sweep:
+        policy_sweep(args)
+        return
+
+    if args.tail:
+        tail_benchmark(args)
+        return
+
+    sampler = args.sampler
+    if args.history:
+        sampler = bootstrap_returns(load_index_returns(args.history), args.bootstrap, args.block)
+
+    if args.joint:
+        joint_distribution(args, sampler)
+        return
+
+    started = time.perf_counter()
+    result = simulate_market_paths(np.full(args.years * 12, args.monthly), args.paths, sampler,
+                                   args.mean, args.vol, seed=args.seed, chunk_size=args.chunk,
+                                   workers=args.workers, compact=args.compact)
+    elapsed = time.perf_counter() - started
+    bands = result.percentiles([5, 50, 95])[:, -1]
+    print(f'{result.n_paths:,}経路 × {args.years * 12}か月: {elapsed:.1f}秒')
+    print(f'{args.years}年後: 平均 {result.mean()[-1]:.0f}万円 / 5%タイル {bands[0]:.0f}万円'
+          f' / 中央値 {bands[1]:.0f}万円 / 95%タイル {bands[2]:.0f}万円')
+    if args.compact:
+        report = compact_precision_report(np.full(args.years * 12, args.monthly), sampler=sampler,
+                                          mean=args.mean, vol=args.vol, seed=args.seed)
+        print(f'compact モードの誤差（float64 比）: 最大 {report["max_abs"] * 10000:.0f}円'
+              f' / 最大相対誤差 {report["max_rel"]:.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# simcore/annuity.py
+# 積立投資の複利計算エンジン（NumPyベクトル化版）
+#
+# 各スクリプトで繰り返し書かれていた
+#     balance = balance * (1 + r/12) + monthly
+# のループを、閉形式（年金終価係数）と累積スキャンで置き換える。
+# 引数はすべてNumPyのブロードキャスト規則に従うので、
+# 積立額・利回り・期間の配列を渡せば全組み合わせを一度に計算できる。
+
+import numpy as np
+
+from .recurrence import solve_linear_recurrence
+
+
+def monthly_rate(annual_rate):
+    """年率を月率に変換する（年率/12、従来の計算と同じ単利換算）"""
+    return np.asarray(annual_rate, dtype=float) / 12
+
+
+def annuity_factor(rate, periods):
+    """年金終価係数 ((1+r)^n - 1) / r を返す（r=0のときはn）"""
+    rate = np.asarray(rate, dtype=float)
+    periods = np.asarray(periods, dtype=float)
+    # (1+r)^n - 1 は expm1/log1p で計算して r≒0 の桁落ちを防ぐ
+    growth_minus_one = np.expm1(periods * np.log1p(rate))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = growth_minus_one / rate
+    return np.where(rate == 0, periods, factor)
+
+
+def future_value(monthly, annual_rate, months, initial=0.0):
+    """毎月末に積み立てた場合のnヶ月後の残高
+
+    monthly, annual_rate, months, initial はブロードキャスト可能な配列。
+    ループ版の balance = balance * (1 + r/12) + monthly をn回繰り返した値と一致する。
+    """
+    r = monthly_rate(annual_rate)
+    months = np.asarray(months, dtype=float)
+    growth = np.exp(months * np.log1p(r))
+    return np.asarray(initial, dtype=float) * growth + np.asarray(monthly, dtype=float) * annuity_factor(r, months)
+
+
+def balance_path(monthly, annual_rate, months, initial=0.0, step=1):
+    """積立残高の推移を返す
+
+    戻り値の形状は broadcast(monthly, annual_rate, initial) + (months // step,)。
+    最後の軸の k 番目は (k+1)*step ヶ月後の残高（step=12 なら各年末）。
+    """
+    monthly = np.asarray(monthly, dtype=float)[..., np.newaxis]
+    r = monthly_rate(annual_rate)[..., np.newaxis]
+    initial = np.asarray(initial, dtype=float)[..., np.newaxis]
+    n = np.arange(step, int(months) + 1, step, dtype=float)
+    growth = np.exp(n * np.log1p(r))
+    return initial * growth + monthly * annuity_factor(r, n)
+
+
+def contribution_path(contributions, growth, initial=0.0):
+    """一定の成長率で期ごとの積立額が変化する場合の残高推移
+
+    b_t = b_{t-1} * growth + c_t を最後の軸に沿って解く。
+    contributions は (..., T)、growth と initial は (...) にブロードキャスト可能。
+    """
+    returns = np.asarray(growth, dtype=float)[..., np.newaxis] - 1
+    return solve_linear_recurrence(returns, contributions, initial)
+
+
+def yearly_contribution_path(monthly_by_year, annual_rate, initial=0.0):
+    """年ごとに月額積立額が変わる場合の各年末残高
+
+    monthly_by_year は (..., 年数) の月額積立額。年内は毎月複利で積み立てる
+    （capitalSimulation.py の「12ヶ月ループ×年数」と同じ計算）。
+    """
+    r = monthly_rate(annual_rate)
+    growth_12 = np.exp(12 * np.log1p(r))
+    contributions = np.asarray(monthly_by_year, dtype=float) * annuity_factor(r, 12)[..., np.newaxis]
+    return contribution_path(contributions, growth_12, initial)
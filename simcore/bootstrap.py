@@ -0,0 +1,178 @@
+# simcore/bootstrap.py
+# 過去の月次指数リターンからのブロック・ブートストラップ
+#
+# 正規分布の代わりに実際のリターン系列（暴落や回復の癖を含む）を使うため、
+# ローカルの CSV / Parquet を一度だけ読み込んで .npy に変換し、以降はメモリマップで開く。
+# 変換結果のファイル名には元ファイルのパス・更新時刻・サイズのハッシュを含めるので、
+# 元データを差し替えれば自動的に読み直す。
+#
+# リサンプリングはブロック単位（連続した数か月をまとめて抜き出す）なので、
+# ボラティリティの偏りや暴落の連続性がある程度保たれる。
+#   moving:     長さ固定のブロックを一様な位置から抜き出す（Künsch の moving block）
+#   stationary: ブロック長が幾何分布（平均 block_length）の Politis–Romano 法
+
+import functools
+import hashlib
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cache import CACHE_DIR
+from .io import atomic_write, pick_column, read_table
+from .recurrence import returns_from_prices
+
+# 既定の指数リターンファイル（環境変数 SIMCORE_INDEX_RETURNS で変更できる）
+DEFAULT_INDEX_RETURNS = os.environ.get('SIMCORE_INDEX_RETURNS', os.path.join('data', 'index_monthly_returns.csv'))
+
+# 列名の候補（大文字小文字は区別しない）
+RETURN_COLUMNS = ('return', 'returns', 'monthly_return', 'リターン', '騰落率')
+PRICE_COLUMNS = ('price', 'close', 'index', 'level', '終値', '指数')
+DATE_COLUMNS = ('date', 'month', '日付', '年月')
+
+
+@dataclass(frozen=True)
+class IndexReturns:
+    """月次リターン（小数、0.01 = 1%）と対応する年月"""
+    returns: np.ndarray
+    months: np.ndarray = None
+    source: str = ''
+
+    def __len__(self):
+        return self.returns.shape[0]
+
+    def between(self, start, stop):
+        """start〜stop（'YYYY-MM'、両端を含む）の期間のリターン"""
+        if self.months is None:
+            raise ValueError('年月の列がないデータでは期間を指定できません')
+        mask = (self.months >= np.datetime64(start, 'M')) & (self.months <= np.datetime64(stop, 'M'))
+        return self.returns[mask]
+
+    def levels(self, start=None, base=100.0):
+        """指数水準（start の月初を base とする）"""
+        returns = self.returns if start is None else self.returns[self.months >= np.datetime64(start, 'M')]
+        return base * np.concatenate([[1.0], np.cumprod(1 + returns)])
+
+
+def _parse_months(values):
+    return np.array([np.datetime64(value.strip()[:7].replace('/', '-'), 'M') for value in values])
+
+
+def _parse_index_file(path, column=None, kind=None, percent=False):
+    header, columns = read_table(path)
+    if column is not None:
+        index = list(header).index(column)
+        kind = kind or 'return'
+    else:
+        index = pick_column(header, RETURN_COLUMNS)
+        kind = kind or 'return'
+        if index is None:
+            index, kind = pick_column(header, PRICE_COLUMNS), 'price'
+        if index is None:
+            raise ValueError(f'{path}: リターンまたは指数の列が見つかりません（列: {header}）')
+    values = np.array([float(v) for v in columns[index]])
+    date_index = pick_column(header, DATE_COLUMNS)
+    months = _parse_months(columns[date_index]) if date_index is not None else None
+
+    if kind == 'price':
+        returns = returns_from_prices(values)[1:]
+        months = months[1:] if months is not None else None
+    else:
+        returns = values / 100 if percent else values
+    return returns, months
+
+
+_loaded = {}
+
+
+def load_index_returns(path=DEFAULT_INDEX_RETURNS, column=None, kind=None, percent=False, cache_dir=None):
+    """月次指数リターンを読み込む（初回だけ解析し、以降は .npy をメモリマップで開く）
+
+    kind は 'return'（リターンの列）か 'price'（指数・価格の列、リターンに変換する）。
+    省略時は列名から判断する。percent=True ならリターンの列を % 表記として100で割る。
+    cache_dir は変換結果の置き場所（省略時は simcore.cache.CACHE_DIR、元データのディレクトリには書かない）。
+    同じプロセス内では2回目以降の呼び出しで同じオブジェクトを返す。
+    """
+    stat = os.stat(path)
+    fingerprint = repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size, column, kind, percent))
+    digest = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+    if digest in _loaded:
+        return _loaded[digest]
+
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.join(cache_dir, f'{os.path.basename(path)}.{digest}')
+    returns_file, months_file = f'{stem}.returns.npy', f'{stem}.months.npy'
+    if not os.path.exists(returns_file):
+        returns, months = _parse_index_file(path, column, kind, percent)
+        # 書き込み途中のファイルを読まないよう、一時ファイルに保存してから置き換える
+        # （リターンのファイルがあれば年月のファイルも書き終わっている）
+        if months is not None:
+            atomic_write(months_file, lambda f: np.save(f, months))
+        atomic_write(returns_file, lambda f: np.save(f, returns))
+
+    months = np.load(months_file) if os.path.exists(months_file) else None
+    data = IndexReturns(np.load(returns_file, mmap_mode='r'), months, path)
+    _loaded[digest] = data
+    return data
+
+
+def moving_block_indices(n_history, n_paths, n_months, block_length, rng):
+    """moving block 法のインデックス（形状は (n_paths, n_months)）"""
+    block_length = min(int(block_length), n_history)
+    n_blocks = -(-n_months // block_length)
+    starts = rng.integers(0, n_history - block_length + 1, size=(n_paths, n_blocks))
+    indices = starts[..., np.newaxis] + np.arange(block_length)
+    return indices.reshape(n_paths, -1)[:, :n_months]
+
+
+def stationary_indices(n_history, n_paths, n_months, block_length, rng):
+    """stationary bootstrap のインデックス（形状は (n_paths, n_months)）
+
+    各月、確率 1/block_length で新しいブロックをランダムな位置から始め、
+    それ以外は前月の次の月（末尾の次は先頭に戻る）を使う。
+    """
+    steps = np.arange(n_months)
+    new_block = rng.random((n_paths, n_months)) < 1 / block_length
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_history, size=(n_paths, n_months))
+    # 各月が属するブロックの開始月
+    block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    origin = np.take_along_axis(starts, block_start, axis=1)
+    return (origin + steps - block_start) % n_history
+
+
+BOOTSTRAP_METHODS = {'moving': moving_block_indices, 'stationary': stationary_indices}
+
+
+def _bootstrap_sample(returns, method, block_length, rng, shape):
+    n_paths, n_months = shape
+    indices = BOOTSTRAP_METHODS[method](returns.shape[0], n_paths, n_months, block_length, rng)
+    return np.asarray(returns)[indices]
+
+
+def bootstrap_returns(returns, method='stationary', block_length=12):
+    """過去リターンのブロック・ブートストラップによるサンプラー（simulate_market_paths 用）
+
+    returns は月次リターンの配列または IndexReturns。
+    """
+    if isinstance(returns, IndexReturns):
+        returns = returns.returns
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f'未対応のブートストラップ法です: {method}')
+    return functools.partial(_bootstrap_sample, np.asarray(returns, dtype=float), method, block_length)
+
+
+def drawdown_statistics(returns, search_months=None):
+    """リターン系列の最大下落率（%）と、底から元の高値に戻るまでの月数（戻らなければ nan）
+
+    search_months を指定すると底は最初の search_months か月の中から探す
+    （回復は系列の最後まで探す）。
+    """
+    levels = np.concatenate([[1.0], np.cumprod(1 + np.asarray(returns, dtype=float))])
+    peaks = np.maximum.accumulate(levels)
+    drawdowns = levels / peaks - 1
+    trough = int(np.argmin(drawdowns[:None if search_months is None else search_months + 1]))
+    recovered = np.nonzero(levels[trough:] >= peaks[trough])[0]
+    recovery = float(recovered[0]) if recovered.size else np.nan
+    return drawdowns[trough] * 100, recovery
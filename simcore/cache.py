@@ -0,0 +1,165 @@
+# simcore/cache.py
+# シナリオ計算結果のキャッシュ
+#
+# 同じ「月5万円・年率5%」の推移を各スクリプトが別々に計算していたので、
+# シナリオのパラメータを正規化したハッシュをキーに結果を共有する。
+#   1段目: プロセス内のLRU（同じ実行中の再計算を防ぐ）
+#   2段目: ディスク（任意、実行をまたいで再利用。合計サイズの上限を超えたら古いものから削除）
+# 環境変数 SIMCORE_CACHE_DIR を設定すると既定のキャッシュでディスク層が有効になる。
+# 指数リターンの変換結果など、常にディスクに置くキャッシュは CACHE_DIR（SIMCORE_CACHE_DIR、
+# 未設定なら ~/.cache/simcore）に保存する。
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from .annuity import balance_path
+from .io import atomic_write
+from .recurrence import solve_linear_recurrence
+
+# simcore のディスクキャッシュの置き場所
+CACHE_DIR = os.environ.get('SIMCORE_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'simcore')
+
+
+def _canonical(value):
+    """ハッシュ用にパラメータを JSON で表せる正規形に変換する"""
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return ['ndarray', data.dtype.str, list(data.shape), hashlib.sha256(data.tobytes()).hexdigest()]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        # 1 と 1.0 は同じ計算結果になるので区別しない
+        return repr(float(value))
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    raise TypeError(f'キャッシュキーに使えない型です: {type(value).__name__}')
+
+
+def scenario_key(namespace, **params):
+    """名前空間とパラメータから決まるキャッシュキー（SHA-256）"""
+    payload = json.dumps([namespace, _canonical(params)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _freeze(value):
+    """キャッシュした配列が呼び出し側で書き換えられないよう読み取り専用にする"""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+class ScenarioCache:
+    """メモリ（LRU）とディスクの2段キャッシュ"""
+
+    def __init__(self, max_entries=256, directory=None, max_disk_bytes=256 * 2**20):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key, default=None):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self._stats['memory_hits'] += 1
+            return self._memory[key]
+        if self.directory is not None and os.path.exists(self._path(key)):
+            with open(self._path(key), 'rb') as f:
+                value = _freeze(pickle.load(f))
+            os.utime(self._path(key))  # 最終利用時刻を更新（LRU削除の基準）
+            self._stats['disk_hits'] += 1
+            self._remember(key, value)
+            return value
+        self._stats['misses'] += 1
+        return default
+
+    def put(self, key, value):
+        value = _freeze(value)
+        self._remember(key, value)
+        if self.directory is not None:
+            # 一時ファイルに書いてから置き換える（中断や同時書き込みで壊れた pickle を残さない）
+            atomic_write(self._path(key), lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+            self._evict_disk()
+        return value
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def memoize(self, namespace=None):
+        """関数の結果を引数のハッシュでキャッシュするデコレーター"""
+        def decorator(func):
+            signature = inspect.signature(func)
+            name = namespace or f'{func.__module__}.{func.__qualname__}'
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = scenario_key(name, **bound.arguments)
+                missing = object()
+                value = self.get(key, missing)
+                if value is missing:
+                    value = self.put(key, func(*args, **kwargs))
+                return value
+
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """ヒット・ミスの回数とヒット率"""
+        stats = dict(self._stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['memory_entries'] = len(self._memory)
+        return stats
+
+    def clear(self):
+        """メモリ層を空にする（ディスク層は残す）"""
+        self._memory.clear()
+
+
+# 全スクリプトで共有する既定のキャッシュ
+default_cache = ScenarioCache(directory=os.environ.get('SIMCORE_CACHE_DIR'))
+
+# よく使う推移計算のキャッシュ付き版
+cached_balance_path = default_cache.memoize('balance_path')(balance_path)
+cached_linear_recurrence = default_cache.memoize('solve_linear_recurrence')(solve_linear_recurrence)
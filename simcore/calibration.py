@@ -0,0 +1,170 @@
+# simcore/calibration.py
+# 昇進確率・離職率の校正（観測された組織ピラミッドと残存率に合わせる）
+#
+# キャリアパスから作った CohortModel の昇進確率を昇進先の職位レベルごとに、離職率をパフォーマンス層ごとに
+# 定数倍して、次の2つがなるべく観測値に近くなる倍率を探す。
+#   組織ピラミッド: 毎年同じ人数を history 年間採用し続けたときの職位レベル別の構成比
+#                   （= 1コホートの勤続1〜history 年目の状態分布の合計、simcore.markov）
+#   残存率:         層ごとのキャリアパスの残存率（upper_retention など）
+# 目的関数の1回の評価はマルコフ連鎖の行列積だけ（約1ミリ秒）で、同じ倍率の評価結果と
+# 同じモデルの状態分布はキャッシュする。最適化は範囲制約付きの Nelder–Mead 法（numpy のみ）。
+
+import functools
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cohort import DEFAULT_COHORT_MODEL
+from .markov import occupancy
+from .organization import CURRENT_ORGANIZATION, ORG_LEVELS
+from .salary import CAREER_PATHS, GRADES
+
+# 倍率をかける単位（昇進は昇進先のグレードの職位レベル、離職は層）と探索範囲
+PROMOTION_BOUNDS = (0.2, 3.0)
+ATTRITION_BOUNDS = (0.5, 2.0)
+
+
+def apply_multipliers(model, promotion, attrition):
+    """昇進確率を昇進先の職位レベルごと、離職率を層ごとに定数倍したモデル
+
+    promotion は ORG_LEVELS の順（例えば Director の倍率は M1→D3・D3→D2・D2→D1 の昇進にかかる）。
+    """
+    promotion_rates = model.promotion_matrix()
+    for multiplier, grades in zip(promotion, ORG_LEVELS.values()):
+        columns = [GRADES.index(grade) - 1 for grade in grades if GRADES.index(grade) > 0]
+        promotion_rates[:, columns] *= multiplier
+    attrition_rates = model.attrition_matrix() * np.asarray(attrition, dtype=float)[:, np.newaxis]
+    return type(model)(model.tiers, model.shares,
+                       tuple(map(tuple, np.clip(promotion_rates, 0, 1))),
+                       tuple(map(tuple, np.clip(attrition_rates, 0, 0.95))),
+                       model.salary_spread)
+
+
+@functools.lru_cache(maxsize=4096)
+def level_shares(model, history=15):
+    """毎年同じ人数を history 年間採用したときの職位レベル別の構成比（ORG_LEVELS の順）"""
+    grades = occupancy(model, history)[:, :len(GRADES)].sum(axis=0)
+    levels = np.array([grades[[GRADES.index(grade) for grade in level]].sum() for level in ORG_LEVELS.values()])
+    return levels / levels.sum()
+
+
+def retention_curves(model, paths=CAREER_PATHS):
+    """層ごとのキャリアパスの勤続年数における残存率（%）{層: 配列}"""
+    survival = 100 * np.cumprod(np.concatenate([np.ones((len(model.tiers), 1)), 1 - model.attrition_matrix()],
+                                               axis=1), axis=1)
+    return {tier: survival[i, np.asarray(paths[tier].years) - 1] for i, tier in enumerate(model.tiers)}
+
+
+def minimize_bounded(func, x0, bounds, max_evals=2000, tolerance=1e-10, step=0.1):
+    """範囲制約付きの Nelder–Mead 法（各点を範囲内に切り詰めて評価する）
+
+    戻り値は（最適な点, 目的関数の値, 評価回数）。
+    """
+    lower, upper = np.asarray(bounds, dtype=float).T
+    clip = functools.partial(np.clip, a_min=lower, a_max=upper)
+    n = len(x0)
+    simplex = [clip(np.asarray(x0, dtype=float))]
+    for i in range(n):
+        vertex = simplex[0].copy()
+        delta = step * (upper[i] - lower[i])
+        vertex[i] += delta if vertex[i] + delta <= upper[i] else -delta
+        simplex.append(clip(vertex))
+    simplex = np.array(simplex)
+    values = np.array([func(x) for x in simplex])
+    evals = n + 1
+
+    while evals < max_evals:
+        order = np.argsort(values)
+        simplex, values = simplex[order], values[order]
+        if values[-1] - values[0] <= tolerance:
+            break
+        centroid = simplex[:-1].mean(axis=0)
+        reflected = clip(centroid + (centroid - simplex[-1]))
+        f_reflected = func(reflected)
+        evals += 1
+        if f_reflected < values[0]:
+            expanded = clip(centroid + 2 * (centroid - simplex[-1]))
+            f_expanded = func(expanded)
+            evals += 1
+            if f_expanded < f_reflected:
+                simplex[-1], values[-1] = expanded, f_expanded
+            else:
+                simplex[-1], values[-1] = reflected, f_reflected
+        elif f_reflected < values[-2]:
+            simplex[-1], values[-1] = reflected, f_reflected
+        else:
+            contracted = clip(centroid + 0.5 * (simplex[-1] - centroid))
+            f_contracted = func(contracted)
+            evals += 1
+            if f_contracted < values[-1]:
+                simplex[-1], values[-1] = contracted, f_contracted
+            else:
+                # 縮小：最良点に向かって全体を半分に縮める
+                simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+                values[1:] = [func(x) for x in simplex[1:]]
+                evals += n
+    best = np.argmin(values)
+    return simplex[best], float(values[best]), evals
+
+
+@dataclass
+class CalibrationResult:
+    """校正後のモデルと当てはまり"""
+    model: object
+    promotion: dict
+    attrition: dict
+    objective: float
+    observed_shares: np.ndarray
+    fitted_shares: np.ndarray
+    evaluations: int
+    elapsed: float
+
+    def pyramid(self, total=None):
+        """職位レベル別人数 {レベル: (観測, 校正後)}（total 人に換算、省略時は観測の合計）"""
+        total = total or sum(CURRENT_ORGANIZATION.values())
+        return {level: (observed * total, fitted * total)
+                for level, observed, fitted in zip(ORG_LEVELS, self.observed_shares, self.fitted_shares)}
+
+
+def calibrate_cohort_model(model=DEFAULT_COHORT_MODEL, observed=CURRENT_ORGANIZATION, paths=CAREER_PATHS,
+                           history=15, retention_weight=1.0, max_evals=2000):
+    """組織ピラミッドと残存率に合うように昇進・離職の倍率を推定する
+
+    目的関数は 職位レベルの構成比の χ² 型の誤差 Σ (模擬 - 観測)² / 観測
+    ＋ retention_weight × 残存率（割合）の二乗誤差の平均。
+    """
+    started = time.perf_counter()
+    observed_shares = np.array([observed[level] for level in ORG_LEVELS], dtype=float)
+    observed_shares /= observed_shares.sum()
+    observed_retention = {tier: np.asarray(paths[tier].retention, dtype=float) for tier in model.tiers}
+    n_levels = len(ORG_LEVELS)
+
+    def candidate(x):
+        return apply_multipliers(model, x[:n_levels], x[n_levels:])
+
+    @functools.lru_cache(maxsize=None)
+    def cached_objective(key):
+        fitted = candidate(np.array(key))
+        shares = level_shares(fitted, history)
+        pyramid = np.sum(np.square(shares - observed_shares) / np.maximum(observed_shares, 1e-6))
+        retention = retention_curves(fitted, paths)
+        gaps = np.concatenate([(retention[tier] - observed_retention[tier]) / 100 for tier in model.tiers])
+        return pyramid + retention_weight * np.mean(np.square(gaps))
+
+    def objective(x):
+        return cached_objective(tuple(np.round(x, 10)))
+
+    bounds = [PROMOTION_BOUNDS] * n_levels + [ATTRITION_BOUNDS] * len(model.tiers)
+    best, value, evals = minimize_bounded(objective, np.ones(len(bounds)), bounds, max_evals=max_evals)
+    fitted = candidate(best)
+    return CalibrationResult(
+        model=fitted,
+        promotion=dict(zip(ORG_LEVELS, best[:n_levels])),
+        attrition=dict(zip(model.tiers, best[n_levels:])),
+        objective=value,
+        observed_shares=observed_shares,
+        fitted_shares=level_shares(fitted, history),
+        evaluations=evals,
+        elapsed=time.perf_counter() - started,
+    )
@@ -0,0 +1,166 @@
+# simcore/cohort.py
+# 新卒コホートのエージェント・ベース・シミュレーション
+#
+# 社員1人を配列の1要素として（グレード番号・勤続年数・パフォーマンス層・在籍フラグ）を持ち、
+# 1年ごとに離職と昇進を全員まとめて判定する。
+# 層ごとの昇進確率と離職率は simcore.salary のキャリアパスから作る：
+#   昇進: パスで各グレードに留まる年数 d から、毎年 1/d の確率で次のグレードへ（平均滞留年数が d）
+#   離職: パスの残存率を勤続年数ごとに対数線形補間し、1年ごとの離職率に直す
+# 人数は chunk_size 人ずつ独立した乱数系列で計算して合算するので、workers を変えても結果は同じ。
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .parallel import block_seeds, ordered_map
+from .salary import CAREER_PATHS, GRADE_SALARIES, GRADES
+
+# パフォーマンス層の構成比（上位10%・標準65%・下位25%）
+COHORT_TIER_SHARES = {'upper': 0.10, 'standard': 0.65, 'lower': 0.25}
+
+
+@dataclass(frozen=True)
+class CohortModel:
+    """層ごとの昇進確率（層 × グレード）・離職率（層 × 勤続年数）と年収の個人差"""
+    tiers: tuple
+    shares: tuple
+    promotion: tuple
+    attrition: tuple
+    salary_spread: float = 0.07
+
+    def promotion_matrix(self):
+        return np.asarray(self.promotion, dtype=float)
+
+    def attrition_matrix(self):
+        return np.asarray(self.attrition, dtype=float)
+
+    def with_promotion(self, tier, grade, rate):
+        """tier 層の grade からの昇進確率だけを rate に変えたモデル（人事制度の変更の試算用）"""
+        promotion = self.promotion_matrix()
+        promotion[self.tiers.index(tier), GRADES.index(grade)] = rate
+        return replace(self, promotion=tuple(map(tuple, promotion)))
+
+
+def promotion_rates(path, grades=GRADES):
+    """キャリアパスのグレードごとの年間昇進確率（パスの最後のグレードより上へは昇進しない）"""
+    rates = np.zeros(len(grades))
+    first_year = {}
+    for year, grade in zip(path.years, path.grade):
+        first_year.setdefault(grade, year)
+    reached = list(first_year.items())
+    for (grade, year), (_, next_year) in zip(reached, reached[1:]):
+        rates[grades.index(grade)] = 1 / (next_year - year)
+    return rates
+
+
+def attrition_rates(path, horizon):
+    """勤続1〜horizon 年目の1年ごとの離職率（残存率を対数線形補間、最後の区間の率で延長）"""
+    years = np.asarray(path.years, dtype=float)
+    log_survival = np.log(np.asarray(path.retention, dtype=float) / 100)
+    slope = (log_survival[-1] - log_survival[-2]) / (years[-1] - years[-2])
+    tenure = np.arange(1, horizon + 2)
+    curve = np.where(tenure <= years[-1], np.interp(tenure, years, log_survival),
+                     log_survival[-1] + slope * (tenure - years[-1]))
+    return 1 - np.exp(np.diff(curve))
+
+
+def cohort_model_from_paths(paths=CAREER_PATHS, shares=COHORT_TIER_SHARES, horizon=40, salary_spread=0.07):
+    """キャリアパス（層ごと）から CohortModel を作る"""
+    tiers = tuple(shares)
+    return CohortModel(
+        tiers=tiers,
+        shares=tuple(shares[tier] for tier in tiers),
+        promotion=tuple(tuple(promotion_rates(paths[tier])) for tier in tiers),
+        attrition=tuple(tuple(attrition_rates(paths[tier], horizon)) for tier in tiers),
+        salary_spread=salary_spread,
+    )
+
+
+DEFAULT_COHORT_MODEL = cohort_model_from_paths()
+
+
+@dataclass
+class CohortResult:
+    """年ごとの集計（全員分の配列は持たない）
+
+    grade_counts: (年数, グレード数) の在籍人数
+    tier_hired / tier_alive: 層ごとの入社人数と (年数, 層数) の在籍人数
+    salaries: salary_year 年目に在籍している社員の年収（万円）
+    """
+    tiers: tuple
+    grade_counts: np.ndarray
+    tier_hired: np.ndarray
+    tier_alive: np.ndarray
+    salaries: np.ndarray
+
+    @property
+    def years(self):
+        return np.arange(1, self.grade_counts.shape[0] + 1)
+
+    @property
+    def n_employees(self):
+        return int(self.tier_hired.sum())
+
+    def retention(self):
+        """層ごとの残存率（%、形状は (年数, 層数)）"""
+        return self.tier_alive / np.maximum(self.tier_hired, 1) * 100
+
+    def scaled_grade_counts(self, cohort_size):
+        """1コホート cohort_size 人あたりに換算したグレード別人数"""
+        return self.grade_counts * (cohort_size / self.n_employees)
+
+    def merge(self, other):
+        self.grade_counts += other.grade_counts
+        self.tier_hired += other.tier_hired
+        self.tier_alive += other.tier_alive
+        self.salaries = np.concatenate([self.salaries, other.salaries])
+        return self
+
+
+def _cohort_block(task):
+    model, size, seed, years, salary_year = task
+    rng = np.random.default_rng(seed)
+    promotion = model.promotion_matrix()
+    attrition = model.attrition_matrix()
+    grade_salaries = np.asarray(GRADE_SALARIES, dtype=float)
+    n_grades, n_tiers = promotion.shape[1], len(model.tiers)
+
+    tier = np.searchsorted(np.cumsum(model.shares), rng.random(size) * sum(model.shares), side='right')
+    tier = np.minimum(tier, n_tiers - 1).astype(np.int8)
+    grade = np.zeros(size, dtype=np.int8)
+    tenure = np.ones(size, dtype=np.int16)
+    alive = np.ones(size, dtype=bool)
+    salary_factor = 1 + model.salary_spread * rng.standard_normal(size)
+
+    grade_counts = np.zeros((years, n_grades), dtype=np.int64)
+    tier_alive = np.zeros((years, n_tiers), dtype=np.int64)
+    salaries = np.empty(0)
+    for year in range(years):
+        grade_counts[year] = np.bincount(grade[alive], minlength=n_grades)
+        tier_alive[year] = np.bincount(tier[alive], minlength=n_tiers)
+        if year + 1 == salary_year:
+            salaries = grade_salaries[grade[alive]] * salary_factor[alive]
+
+        # 年度末：離職してから、残った社員の昇進を判定する
+        alive &= rng.random(size) >= attrition[tier, np.minimum(tenure, attrition.shape[1]) - 1]
+        promoted = alive & (rng.random(size) < promotion[tier, grade]) & (grade < n_grades - 1)
+        grade += promoted
+        tenure += 1
+    return CohortResult(model.tiers, grade_counts, np.bincount(tier, minlength=n_tiers).astype(np.int64),
+                        tier_alive, salaries)
+
+
+def simulate_cohort(n_employees, years=20, model=DEFAULT_COHORT_MODEL, seed=None, salary_year=10,
+                    chunk_size=262144, workers=1):
+    """新卒 n_employees 人の1コホートを years 年間シミュレーションする
+
+    同じ seed と chunk_size なら workers（プロセス数、None なら全コア）によらず結果は同じ。
+    """
+    n_employees = int(n_employees)
+    n_chunks = max(1, -(-n_employees // chunk_size))
+    tasks = [(model, min(chunk_size, n_employees - i * chunk_size), chunk_seed, years, salary_year)
+             for i, chunk_seed in enumerate(block_seeds(seed, n_chunks))]
+    result = None
+    for part in ordered_map(_cohort_block, tasks, workers):
+        result = part if result is None else result.merge(part)
+    return result
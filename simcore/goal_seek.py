@@ -0,0 +1,104 @@
+# simcore/goal_seek.py
+# 目標資産額からの逆算（ゴールシーク）
+#
+# 「目標額を達成するには毎月いくら必要か」「何%で運用する必要があるか」
+# 「最短で何年目に達成できるか」を、多数の目標についてまとめて解く。
+# ライフイベントや継続費用で積立可能額に上限がある年は閉形式が使えないため、
+# 全目標を同時に二分法で絞り込む。
+
+import numpy as np
+
+from .annuity import yearly_contribution_path
+
+
+def project_balances(monthly, annual_rate, n_years, affordable=None):
+    """各年末の残高（月額積立・年内は毎月複利）を返す
+
+    affordable は各年の積立可能額の上限（(..., 年数) にブロードキャスト可能）。
+    上限を超える分は積み立てられないものとして扱う。戻り値の形状は (..., n_years)。
+    """
+    monthly = np.asarray(monthly, dtype=float)[..., np.newaxis]
+    monthly_by_year = np.broadcast_to(monthly, monthly.shape[:-1] + (int(n_years),))
+    if affordable is not None:
+        monthly_by_year = np.minimum(monthly_by_year, np.asarray(affordable, dtype=float)[..., :int(n_years)])
+    return yearly_contribution_path(monthly_by_year, np.asarray(annual_rate, dtype=float))
+
+
+def _balance_at(monthly, annual_rate, years, affordable):
+    """years 年目末の残高（目標ごとに年数が異なってよい）"""
+    years = np.asarray(years, dtype=int)
+    paths = project_balances(monthly, annual_rate, years.max(), affordable)
+    paths = np.broadcast_to(paths, np.broadcast_shapes(paths.shape[:-1], years.shape) + paths.shape[-1:])
+    index = np.broadcast_to(years - 1, paths.shape[:-1])[..., np.newaxis]
+    return np.take_along_axis(paths, index, axis=-1)[..., 0]
+
+
+def _bisect(reaches, low, high, tol, max_iter):
+    """reaches(x) が真になる最小の x を全要素同時に二分法で求める"""
+    for _ in range(max_iter):
+        middle = (low + high) / 2
+        ok = reaches(middle)
+        high = np.where(ok, middle, high)
+        low = np.where(ok, low, middle)
+        if np.all(high - low <= tol * np.maximum(np.abs(high), 1)):
+            break
+    return high
+
+
+def required_monthly_contribution(targets, years, annual_rate=0.05, affordable=None,
+                                  tol=1e-9, max_iter=200):
+    """目標額を years 年で達成するのに必要な月額積立額
+
+    targets, years, annual_rate はブロードキャスト可能。affordable を渡すと
+    各年の積立可能額の上限を考慮し、上限いっぱいでも届かない目標は nan になる。
+    """
+    targets = np.asarray(targets, dtype=float)
+    shape = np.broadcast_shapes(targets.shape, np.shape(years), np.shape(annual_rate))
+
+    def reaches(monthly):
+        return _balance_at(monthly, annual_rate, years, affordable) >= targets
+
+    if affordable is None:
+        # 上限を探す：元本だけで目標に届く額から始めて倍々に広げる
+        high = np.broadcast_to(targets / (12 * np.asarray(years, dtype=float)), shape).copy()
+        for _ in range(64):
+            ok = reaches(high)
+            if ok.all():
+                break
+            high = np.where(ok, high, high * 2)
+    else:
+        # 積立可能額の上限より多く積み立てても残高は増えない
+        cap = np.asarray(affordable, dtype=float)[..., :int(np.max(years))].max(axis=-1)
+        high = np.broadcast_to(cap, shape).copy()
+    feasible = reaches(high)
+
+    result = _bisect(reaches, np.zeros(shape), high, tol, max_iter)
+    return np.where(feasible, result, np.nan)
+
+
+def required_return(targets, years, monthly, affordable=None, bracket=(-0.99, 1.0),
+                    tol=1e-9, max_iter=200):
+    """月額 monthly を years 年積み立てて目標額に届くのに必要な年率リターン
+
+    届かない目標は nan、bracket の下限でも届く目標は下限値を返す。
+    """
+    targets = np.asarray(targets, dtype=float)
+    shape = np.broadcast_shapes(targets.shape, np.shape(years), np.shape(monthly))
+
+    def reaches(rate):
+        return _balance_at(monthly, rate, years, affordable) >= targets
+
+    low = np.full(shape, float(bracket[0]))
+    high = np.full(shape, float(bracket[1]))
+    feasible = reaches(high)
+    result = np.where(reaches(low), low, _bisect(reaches, low, high, tol, max_iter))
+    return np.where(feasible, result, np.nan)
+
+
+def earliest_achievement_year(targets, monthly, annual_rate=0.05, max_years=40, affordable=None):
+    """目標額に最初に到達する年（勤続年数）、max_years 年以内に届かなければ nan"""
+    targets = np.asarray(targets, dtype=float)
+    paths = project_balances(monthly, annual_rate, max_years, affordable)
+    reached = paths >= targets[..., np.newaxis]
+    first = np.argmax(reached, axis=-1) + 1.0
+    return np.where(reached.any(axis=-1), first, np.nan)
@@ -0,0 +1,49 @@
+# simcore/io.py
+# ファイル入出力の共通処理（キャッシュの書き込み、CSV / Parquet の表の読み込み）
+
+import contextlib
+import csv
+import os
+import tempfile
+
+
+def atomic_write(path, write, mode='wb'):
+    """write(f) で同じディレクトリの一時ファイルに書き、os.replace で path に置き換える
+
+    書き込みの途中で中断しても、複数のプロセスが同時に書いても、
+    path には書き終わったファイルしか現れない（書き込みに失敗したら一時ファイルは消す）。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f'{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
+
+
+def pick_column(header, candidates):
+    """candidates のうち最初に見つかった列名の位置（大文字小文字と前後の空白は無視、なければ None）"""
+    lowered = [name.strip().lower() for name in header]
+    for candidate in candidates:
+        if candidate.lower() in lowered:
+            return lowered.index(candidate.lower())
+    return None
+
+
+def read_table(path):
+    """CSV / Parquet を（列名, 列ごとの文字列または数値）に読み込む"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pandas as pd
+        except ImportError as exc:
+            raise ImportError('Parquet の読み込みには pandas（と pyarrow）が必要です') from exc
+        frame = pd.read_parquet(path)
+        return list(frame.columns), [frame[column].astype(str).tolist() for column in frame.columns]
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = [row for row in csv.reader(f) if row]
+    header, body = rows[0], rows[1:]
+    return header, [list(column) for column in zip(*body)]
@@ -0,0 +1,201 @@
+# simcore/joint.py
+# キャリア（昇進）× 市場リターンの同時モンテカルロ
+#
+# これまでは「標準パスの年収リスト → 決定論的な複利計算」を手でつないでいたので、
+# 昇進の早い・遅いと相場の良し悪しが資産にどう効くかを同時に見られなかった。
+# ここでは社員1人ごとに
+#   1. パフォーマンス層と昇進の経路を CohortModel（simcore.cohort と同じ確率）から抽選し、
+#   2. その年のグレードの年収 × 個人差 から、ライフイベント込みシミュレーションと同じキャッシュフロー
+#      （simcore.payroll の手取り → 生活費・ライフイベント費用 → 積立率の上限）で毎月の積立額を決め、
+#   3. 市場リターンの経路（simcore.monte_carlo のサンプラー）で運用する
+# という1サンプルを作り、チェックする年齢（30/40/50/60歳）の資産の分布を集計する。
+# 離職した社員は離職した年の年度末で積立をやめ（以後の収入はこのモデルの外）、残高の運用だけを続ける。
+#
+# サンプルは chunk_size 人ずつ独立した乱数系列で計算し、年齢ごとの資産は分位点スケッチに
+# 流し込んで捨てるので、100万人以上でもメモリはチャンク1つ分で済む。
+# チャンクは CHUNKS_PER_BLOCK 個ずつワーカープロセスに配り、順番に合算するので
+# 結果は workers によらずビット単位で一致する。
+
+import numpy as np
+
+from .cohort import DEFAULT_COHORT_MODEL
+from .life_events import event_cost_schedule, living_cost_schedule, monthly_savings_schedule
+from .monte_carlo import CHUNKS_PER_BLOCK, return_sampler
+from .parallel import block_seeds, parallel_reduce
+from .salary import GRADE_SALARIES, GRADES
+from .scenarios import TAX_RATE, life_events, recurring_costs
+from .sketch import QuantileSketch
+
+# rg_grapg.py で資産を確認する年齢
+CHECK_AGES = (30, 40, 50, 60)
+
+
+def sample_career_paths(model, size, years, rng):
+    """size 人分の層（長さ size）、1〜years 年目のグレード番号と在籍しているか（形状は (size, years)）を抽選する
+
+    年度末に離職と昇進を判定する順序は simcore.cohort.simulate_cohort と同じ。
+    離職した社員のグレードは離職時のまま残し、在籍の判定は離職した年の翌年から False になる。
+    """
+    promotion = model.promotion_matrix()
+    attrition = model.attrition_matrix()
+    n_grades, n_tiers = promotion.shape[1], len(model.tiers)
+
+    tier = np.searchsorted(np.cumsum(model.shares), rng.random(size) * sum(model.shares), side='right')
+    tier = np.minimum(tier, n_tiers - 1).astype(np.int8)
+    grade = np.zeros(size, dtype=np.int8)
+    alive = np.ones(size, dtype=bool)
+    history = np.empty((size, years), dtype=np.int8)
+    employed = np.empty((size, years), dtype=bool)
+    for year in range(years):
+        history[:, year] = grade
+        employed[:, year] = alive
+        alive &= rng.random(size) >= attrition[tier, min(year + 1, attrition.shape[1]) - 1]
+        grade += alive & (rng.random(size) < promotion[tier, grade]) & (grade < n_grades - 1)
+    return tier, history, employed
+
+
+class JointResult:
+    """チェックする年齢ごとの資産の分布（社員ごとの値は保持しない）
+
+    sketch: 全体の資産の分位点スケッチ（列がチェックする年齢）
+    tier_sketches: 層ごとの資産の分位点スケッチ
+    employed_counts: 年齢ごとの在籍者数
+    grade_counts / grade_assets: 年齢ごと・その年のグレードごとの在籍者数と資産の合計
+    """
+
+    def __init__(self, ages, tiers, relative_accuracy=0.005):
+        self.ages = tuple(ages)
+        self.tiers = tuple(tiers)
+        self.sketch = QuantileSketch(len(self.ages), relative_accuracy)
+        self.tier_sketches = [QuantileSketch(len(self.ages), relative_accuracy) for _ in self.tiers]
+        self.employed_counts = np.zeros(len(self.ages), dtype=np.int64)
+        self.grade_counts = np.zeros((len(self.ages), len(GRADES)), dtype=np.int64)
+        self.grade_assets = np.zeros((len(self.ages), len(GRADES)))
+
+    @property
+    def n_samples(self):
+        return self.sketch.count
+
+    def add(self, tier, grades, employed, assets):
+        """層（長さ n）・チェックする年齢のグレード番号・在籍しているかと資産（形状は (n, 年齢数)）を集計に加える"""
+        self.sketch.add(assets)
+        for i, tier_sketch in enumerate(self.tier_sketches):
+            tier_sketch.add(assets[tier == i])
+        self.employed_counts += employed.sum(axis=0)
+        for j in range(len(self.ages)):
+            staying = employed[:, j]
+            self.grade_counts[j] += np.bincount(grades[staying, j], minlength=len(GRADES))
+            self.grade_assets[j] += np.bincount(grades[staying, j], weights=assets[staying, j],
+                                                minlength=len(GRADES))
+        return self
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        for mine, theirs in zip(self.tier_sketches, other.tier_sketches):
+            mine.merge(theirs)
+        self.employed_counts += other.employed_counts
+        self.grade_counts += other.grade_counts
+        self.grade_assets += other.grade_assets
+        return self
+
+    def mean(self):
+        return self.sketch.moments.mean
+
+    def percentiles(self, q, tier=None):
+        """年齢ごとの資産のパーセンタイル（q は0〜100、形状は (len(q), 年齢数)）
+
+        tier（層の名前）を指定するとその層だけの分布。
+        """
+        sketch = self.sketch if tier is None else self.tier_sketches[self.tiers.index(tier)]
+        return sketch.percentiles(q)
+
+    def tier_mean(self):
+        """層ごとの平均資産 {層: 年齢ごとの配列}"""
+        return {tier: sketch.moments.mean for tier, sketch in zip(self.tiers, self.tier_sketches)}
+
+    def retention(self):
+        """年齢ごとの在籍率（入社した人数に対する割合）"""
+        return self.employed_counts / max(self.n_samples, 1)
+
+    def grade_share(self):
+        """年齢ごとの在籍者のグレードの構成比（形状は (年齢数, 12)）"""
+        return self.grade_counts / np.maximum(self.grade_counts.sum(axis=1, keepdims=True), 1)
+
+    def mean_by_grade(self):
+        """年齢ごと・その年のグレードごとの在籍者の平均資産（該当者がいないグレードは nan）"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.grade_counts > 0, self.grade_assets / self.grade_counts, np.nan)
+
+    def summary(self, q=(5, 25, 50, 75, 95)):
+        """{年齢: {'mean': 平均, 'percentiles': {q: 値}}}"""
+        bands = self.percentiles(q)
+        return {age: {'mean': self.mean()[j], 'percentiles': dict(zip(q, bands[:, j]))}
+                for j, age in enumerate(self.ages)}
+
+
+def _joint_chunk(model, size, sample, rng, ages, start_age, cash_flow, initial):
+    """1チャンク分の（層, チェックする年齢のグレード, 在籍しているか, 資産）を返す"""
+    n_years = max(ages) - start_age + 1
+    tier, history, employed = sample_career_paths(model, size, n_years, rng)
+    salary_factor = 1 + model.salary_spread * rng.standard_normal(size)
+    salaries = np.asarray(GRADE_SALARIES, dtype=float)[history] * salary_factor[:, np.newaxis]
+    # 在籍している年だけ、手取りから生活費・ライフイベント費用を引いた範囲で積み立てる
+    monthly = np.where(employed, monthly_savings_schedule(salaries, **cash_flow), 0.0)
+
+    growth = sample(rng, (size, n_years * 12))
+    growth += 1
+    columns = np.asarray(ages) - start_age
+    balance = np.full(size, initial, dtype=float)
+    assets = np.empty((size, len(ages)))
+    for month in range(n_years * 12):
+        balance *= growth[:, month]
+        balance += monthly[:, month // 12]
+        if month % 12 == 11:
+            # year 年目末（年齢 start_age + year）の資産
+            hit = np.flatnonzero(columns == month // 12)
+            if hit.size:
+                assets[:, hit[0]] = balance
+    return tier, history[:, columns], employed[:, columns], assets
+
+
+def _joint_block(task):
+    """1ブロック分のチャンクを順に計算して集計を返す（ワーカープロセスで実行）"""
+    model, sizes, seeds, sample, ages, start_age, cash_flow, initial = task
+    result = JointResult(ages, model.tiers)
+    for size, chunk_seed in zip(sizes, seeds):
+        result.add(*_joint_chunk(model, size, sample, np.random.default_rng(chunk_seed), ages, start_age,
+                                 cash_flow, initial))
+    return result
+
+
+def simulate_joint(n_samples, model=DEFAULT_COHORT_MODEL, savings_rate=0.25, sampler='normal', mean=0.05,
+                   vol=0.15, ages=CHECK_AGES, start_age=22, seed=None, initial=0.0, chunk_size=8192,
+                   workers=1, include_events=True, tax_rate=TAX_RATE):
+    """昇進の経路と市場リターンの経路を同時に抽選して、年齢ごとの資産の分布を求める
+
+    毎月「前月残高 × (1 + 月次リターン) + その年の積立額」で積み上げる。積立額は
+    simcore.life_events.monthly_savings_schedule() で、年収（その年のグレードの想定年収 × 個人差、万円）の
+    手取り（tax_rate、None なら simcore.payroll で start_age 歳からの年齢に応じて計算）から生活費・ライフイベント費用（simcore.scenarios、
+    勤続年数で数える、include_events=False なら単発のイベントなし）を引いた範囲で手取りの savings_rate まで。
+    離職した年の翌年からは積立なし。
+    sampler・mean・vol は simulate_market_paths() と同じ。ages はチェックする年齢
+    （start_age 歳入社の (年齢 - start_age + 1) 年目末の資産、rg_grapg.py と同じ数え方）。
+    同じ seed と chunk_size なら workers（プロセス数、None なら全コア）によらず結果は同じ。
+    戻り値は JointResult。
+    """
+    ages = tuple(sorted(ages))
+    if ages[0] < start_age:
+        raise ValueError('チェックする年齢は入社年齢以上にしてください')
+    sample = return_sampler(sampler, mean, vol)
+    years = np.arange(1, max(ages) - start_age + 2)
+    cash_flow = {'living_costs': living_cost_schedule(years, recurring_costs),
+                 'event_costs': event_cost_schedule(years, life_events) if include_events else 0.0,
+                 'savings_rate_base': savings_rate, 'tax_rate': tax_rate, 'start_age': start_age}
+    n_samples = int(n_samples)
+    n_chunks = max(1, -(-n_samples // chunk_size))
+    sizes = [min(chunk_size, n_samples - i * chunk_size) for i in range(n_chunks)]
+    seeds = block_seeds(seed, n_chunks)
+    tasks = ((model, sizes[start:start + CHUNKS_PER_BLOCK], seeds[start:start + CHUNKS_PER_BLOCK], sample,
+              ages, start_age, cash_flow, initial)
+             for start in range(0, n_chunks, CHUNKS_PER_BLOCK))
+    return parallel_reduce(_joint_block, tasks, JointResult.merge, workers)
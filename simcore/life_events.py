@@ -0,0 +1,162 @@
+# simcore/life_events.py
+# ライフイベント込み資産シミュレーションのバッチ版
+#
+# capitalSimulation.simulate_with_life_events() は1つの年収カーブ・1つの積立率しか
+# 扱えなかったため、（シナリオ数 × 年数）の2次元配列でまとめて計算できるようにした。
+# 各シナリオの計算順序は元の関数と同じなので、1シナリオの結果はビット単位で一致する。
+
+import numpy as np
+
+from .compact import COMPACT_FLOAT, COMPACT_YEN, to_fixed_yen
+from .payroll import take_home_path
+
+# 結果の構造化配列（単位はすべて万円、元の関数の戻り値と同じ）
+LIFE_EVENT_FIELDS = ('investment', 'savings', 'available_cash', 'events_cost', 'monthly_savings')
+LIFE_EVENT_DTYPE = np.dtype([(name, 'f8') for name in LIFE_EVENT_FIELDS])
+# compact=True のとき：残高は float32（万円）、キャッシュフローは円単位の int32（1件20バイト、通常の半分）
+BALANCE_FIELDS = ('investment', 'savings')
+COMPACT_LIFE_EVENT_DTYPE = np.dtype([(name, COMPACT_FLOAT if name in BALANCE_FIELDS else COMPACT_YEN)
+                                     for name in LIFE_EVENT_FIELDS])
+
+# 基本生活費（月額・万円）：勤続年数がしきい値以下ならその金額
+LIVING_COST_THRESHOLDS = np.array([3, 7, 15])
+LIVING_COST_MONTHLY = np.array([20, 23, 25, 28])
+
+
+def living_cost_schedule(years, recurring_costs=None):
+    """勤続年数ごとの年間生活費（万円）を返す
+
+    recurring_costs は {開始年: {'annual_cost': 年額万円}} 形式（capitalSimulation.py と同じ）。
+    """
+    years = np.asarray(years)
+    idx = np.searchsorted(LIVING_COST_THRESHOLDS, years, side='left')
+    living_cost = LIVING_COST_MONTHLY[idx] * 12
+    for start_year, cost_info in (recurring_costs or {}).items():
+        living_cost = living_cost + np.where(years >= start_year, cost_info['annual_cost'], 0)
+    return living_cost
+
+
+def event_cost_schedule(years, life_events):
+    """勤続年数ごとの単発ライフイベント費用（万円）を返す"""
+    years = np.asarray(years)
+    costs = np.zeros(years.shape)
+    for year, event in life_events.items():
+        costs = np.where(years == year, event['cost'], costs)
+    return costs
+
+
+def take_home_income(salaries, tax_rate=None, start_age=22):
+    """年収（万円、最後の軸が勤続1年目から順の年）に対する手取り（万円）
+
+    tax_rate が None なら simcore.payroll.take_home_path() で社会保険料・所得税・住民税を計算する
+    （最後の軸を start_age 歳入社からの年として、40歳からの介護保険料と1年遅れの住民税を含む。
+    スカラーは入社1年目の年収として扱う）。数値なら年収 × (1 - tax_rate) の一律の控除にする。
+    """
+    salaries = np.asarray(salaries, dtype=float)
+    if tax_rate is None:
+        return take_home_path(np.atleast_1d(salaries), start_age).reshape(salaries.shape)
+    return salaries * (1 - tax_rate)
+
+
+def affordable_monthly(salaries, living_costs, event_costs=0.0, tax_rate=None, start_age=22):
+    """各年に積立へ回せる月額の上限（万円）を返す
+
+    手取り（take_home_income()）から生活費とライフイベント費用を差し引いた残り（負なら0）を12で割った値。
+    """
+    take_home = take_home_income(salaries, tax_rate, start_age)
+    return np.maximum(0, take_home - living_costs - event_costs) / 12
+
+
+def _annual_savings(take_home, available, event_cost, savings_rate_base):
+    """手取り・生活費を引いた残り・イベント費用（円）から年間の積立額（円）を決める"""
+    # 実際の貯蓄可能額
+    actual_savings = np.maximum(0, available - event_cost)
+
+    # 貯蓄率の調整（ライフイベント時は貯蓄率を下げる）
+    with np.errstate(divide='ignore', invalid='ignore'):
+        affordable_rate = np.where(take_home > 0, actual_savings / take_home, 0.0)
+    rate_cap = np.where(event_cost > 0, 0.1, savings_rate_base)
+    adjusted_rate = np.minimum(rate_cap, affordable_rate)
+
+    return take_home * adjusted_rate
+
+
+def monthly_savings_schedule(salaries, living_costs, event_costs=0.0, savings_rate_base=0.25, tax_rate=None,
+                             start_age=22):
+    """各年の毎月の積立額（万円）を全年分まとめて計算する
+
+    simulate_life_events_batch() の monthly_savings と同じ規則（手取りから生活費・イベント費用を引いた範囲で
+    手取りの savings_rate_base まで、ライフイベントの年は10%まで）。積立額は残高によらないので、
+    運用リターンを確率的にするシミュレーションの積立額にもそのまま使える。
+    """
+    salaries, living_costs, event_costs, savings_rate_base = np.broadcast_arrays(
+        np.asarray(salaries, dtype=float), living_costs, event_costs, savings_rate_base)
+    take_home = take_home_income(salaries, tax_rate, start_age) * 10000
+    available = take_home - living_costs * 10000
+    return _annual_savings(take_home, available, event_costs * 10000, savings_rate_base) / 12 / 10000
+
+
+def simulate_life_events_batch(salaries, living_costs, event_costs=0.0, savings_rate_base=0.25,
+                               tax_rate=None, investment_return=0.05, savings_rate=0.0001,
+                               chunk_size=65536, compact=False, start_age=22):
+    """複数シナリオのライフイベント込み資産推移をまとめて計算する
+
+    salaries, living_costs, event_costs, savings_rate_base は
+    （シナリオ数, 年数）にブロードキャスト可能な配列（金額は万円、生活費・イベント費用は年額）。
+    シナリオごとの値は (S, 1) の形で渡す。手取りは take_home_income(salaries, tax_rate, start_age)。
+    戻り値は LIFE_EVENT_DTYPE の構造化配列（形状は (S, 年数)）。
+    chunk_size ごとにシナリオを分割して計算し、作業用配列のメモリを一定に保つ。
+    compact=True なら COMPACT_LIFE_EVENT_DTYPE で保持する（計算はチャンク内で float64 のまま行い、
+    記録するときだけ丸める。キャッシュフローのフィールドは円単位）。
+    """
+    salaries, living_costs, event_costs, savings_rate_base = np.broadcast_arrays(
+        np.atleast_2d(salaries), living_costs, event_costs, savings_rate_base)
+    n_scenarios, n_years = salaries.shape
+    result = np.empty((n_scenarios, n_years), dtype=COMPACT_LIFE_EVENT_DTYPE if compact else LIFE_EVENT_DTYPE)
+
+    monthly_growth = 1 + investment_return / 12
+    savings_growth = 1 + savings_rate
+
+    for start in range(0, n_scenarios, chunk_size):
+        stop = min(start + chunk_size, n_scenarios)
+        out = result[start:stop]
+
+        investment_balance = np.zeros(stop - start)
+        savings_balance = np.zeros(stop - start)
+        total_event_cost = np.zeros(stop - start)
+        take_home_chunk = take_home_income(salaries[start:stop], tax_rate, start_age) * 10000
+
+        for i in range(n_years):
+            # 手取り計算
+            take_home = take_home_chunk[:, i]
+
+            # 利用可能額
+            available = take_home - living_costs[start:stop, i] * 10000
+
+            # ライフイベントの支出
+            event_cost = event_costs[start:stop, i] * 10000
+            total_event_cost += event_cost
+
+            annual_savings = _annual_savings(take_home, available, event_cost, savings_rate_base[start:stop, i])
+            monthly_savings = annual_savings / 12
+
+            # 積立投資
+            for month in range(12):
+                investment_balance = investment_balance * monthly_growth + monthly_savings
+
+            # 貯金
+            savings_balance = savings_balance * savings_growth + annual_savings
+
+            # 記録
+            out['investment'][:, i] = investment_balance / 10000
+            out['savings'][:, i] = savings_balance / 10000
+            if compact:
+                out['available_cash'][:, i] = to_fixed_yen(available, unit=1)
+                out['events_cost'][:, i] = to_fixed_yen(total_event_cost, unit=1)
+                out['monthly_savings'][:, i] = to_fixed_yen(monthly_savings, unit=1)
+            else:
+                out['available_cash'][:, i] = available / 10000
+                out['events_cost'][:, i] = total_event_cost / 10000
+                out['monthly_savings'][:, i] = monthly_savings / 10000
+
+    return result
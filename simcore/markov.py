@@ -0,0 +1,114 @@
+# simcore/markov.py
+# グレード昇進のマルコフ連鎖モデル
+#
+# 状態は12グレード（B2〜D1）と「退職」の13個。1年ごとの遷移は
+#   在籍したまま昇進: (1 - 離職率) × 昇進確率
+#   在籍したまま据え置き: (1 - 離職率) × (1 - 昇進確率)
+#   退職（吸収状態）: 離職率
+# で、離職率が勤続年数で変わるので遷移行列は年ごとに異なる（時間非斉次）。
+# 確率は simcore.cohort の CohortModel（層ごとの昇進確率・離職率）から作り、
+# 層ごとに行列の積で状態分布を進めて構成比で平均する（層の混合はマルコフ連鎖ではないため）。
+# 20年分の到達確率でも（層数 × 年数）回の小さな行列積で済むので、昇進率を変えて即座に再計算できる。
+
+import numpy as np
+
+from .cohort import DEFAULT_COHORT_MODEL
+from .salary import GRADES
+
+LEFT = len(GRADES)
+STATES = GRADES + ['退職']
+
+
+def transition_matrices(model=DEFAULT_COHORT_MODEL, years=20, stay=False):
+    """層ごと・年ごとの遷移行列（形状は (層数, years, 13, 13)）
+
+    year 番目の行列は勤続 year+1 年目の年度末の遷移。stay=True なら離職しない場合。
+    """
+    promotion = model.promotion_matrix()
+    attrition = model.attrition_matrix()[:, np.minimum(np.arange(years), model.attrition_matrix().shape[1] - 1)]
+    if stay:
+        attrition = np.zeros_like(attrition)
+    n_tiers, n_grades = promotion.shape
+    promotion = promotion.copy()
+    promotion[:, -1] = 0
+    grades = np.arange(n_grades)
+
+    matrices = np.zeros((n_tiers, years, n_grades + 1, n_grades + 1))
+    kept = 1 - attrition[:, :, np.newaxis]
+    matrices[:, :, grades, grades] = kept * (1 - promotion[:, np.newaxis, :])
+    matrices[:, :, grades[:-1], grades[:-1] + 1] = kept * promotion[:, np.newaxis, :-1]
+    matrices[:, :, grades, LEFT] = attrition[:, :, np.newaxis]
+    matrices[:, :, LEFT, LEFT] = 1
+    return matrices
+
+
+def _state_paths(model, years, stay):
+    """層ごとの勤続1〜years 年目の状態分布（形状は (層数, years, 13)）と遷移行列"""
+    matrices = transition_matrices(model, years, stay)
+    n_tiers, _, n_states, _ = matrices.shape
+    distribution = np.zeros((n_tiers, n_states))
+    distribution[:, 0] = 1
+    paths = np.empty((n_tiers, years, n_states))
+    for year in range(years):
+        paths[:, year] = distribution
+        distribution = np.einsum('ts,tsu->tu', distribution, matrices[:, year])
+    return paths, matrices
+
+
+def occupancy(model=DEFAULT_COHORT_MODEL, years=20, stay=False):
+    """勤続1〜years 年目に各状態（12グレード + 退職）にいる確率（形状は (years, 13)）"""
+    paths, _ = _state_paths(model, years, stay)
+    return np.einsum('t,tys->ys', np.asarray(model.shares) / sum(model.shares), paths)
+
+
+def reach_probability(model=DEFAULT_COHORT_MODEL, years=20, stay=False):
+    """勤続 y 年目までに各グレード以上に到達している確率（形状は (years, 12)）
+
+    stay=False なら途中で退職した社員は退職時のグレードまでで数える（在籍中に到達した確率）。
+    stay=True なら退職しないと仮定した場合。
+    """
+    paths, matrices = _state_paths(model, years, stay)
+    at_least = np.cumsum(paths[..., :LEFT][..., ::-1], axis=-1)[..., ::-1]
+    # 各年度末に退職した人の退職時のグレードの分布を累積して足す
+    left = paths[:, :-1, :LEFT] * matrices[:, :-1, :LEFT, LEFT]
+    left = np.cumsum(np.cumsum(left[..., ::-1], axis=-1)[..., ::-1], axis=1)
+    at_least[:, 1:] += left
+    return np.einsum('t,tyg->yg', np.asarray(model.shares) / sum(model.shares), at_least)
+
+
+def first_passage(model=DEFAULT_COHORT_MODEL, attrition=None):
+    """入社時（B2）から各グレードに到達する確率と、到達する場合の平均年数（層ごと）
+
+    基本行列 N = (I - Q)^-1（Q は目標より下のグレード間の遷移）を使う時間斉次の近似で、
+    離職率は attrition（年率）を全期間に使う。省略時は層ごとの勤続20年間の平均。
+    戻り値は {'probability': (層数, 12), 'expected_years': (層数, 12)}。到達しないグレードは nan 年。
+    attrition=0 でも、途中に昇進確率 0 のグレードがある目標は確率 0・nan 年になる。
+    """
+    promotion = model.promotion_matrix()
+    n_tiers, n_grades = promotion.shape
+    if attrition is None:
+        attrition = model.attrition_matrix()[:, :20].mean(axis=1)
+    attrition = np.broadcast_to(np.asarray(attrition, dtype=float), (n_tiers,))
+
+    probability = np.zeros((n_tiers, n_grades))
+    expected = np.full((n_tiers, n_grades), np.nan)
+    probability[:, 0], expected[:, 0] = 1, 0
+    for tier in range(n_tiers):
+        kept = 1 - attrition[tier]
+        for target in range(1, n_grades):
+            if kept <= 0 or np.any(promotion[tier, :target] <= 0):
+                # 昇進の経路が1段でも途切れると B2 からは到達できない（I - Q が特異になる場合も含む）
+                continue
+            # 目標より下のグレードが一時状態、目標への到達と退職が吸収状態
+            transient = np.arange(target)
+            q = np.diag(kept * (1 - promotion[tier, transient]))
+            q[transient[:-1], transient[:-1] + 1] = kept * promotion[tier, transient[:-1]]
+            reach = np.zeros(target)
+            reach[-1] = kept * promotion[tier, target - 1]
+            identity = np.eye(target)
+            absorbed = np.linalg.solve(identity - q, reach)
+            probability[tier, target] = absorbed[0]
+            if absorbed[0] > 0:
+                # 到達を条件とした平均ステップ数：(N b)_0 / b_0（b は到達の吸収確率）
+                expected[tier, target] = np.linalg.solve(identity - q, absorbed)[0] / absorbed[0]
+    return {'probability': probability, 'expected_years': expected}
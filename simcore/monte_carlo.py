@@ -0,0 +1,372 @@
+# simcore/monte_carlo.py
+# 市場リターンのモンテカルロ・シミュレーション
+#
+# INVESTMENT_RETURN = 0.05 の決定論的な1本線の代わりに、月次リターンの経路を
+# 多数生成して資産推移の分布（パーセンタイル帯・目標到達確率・不足額）を求める。
+# 経路は chunk_size 本ずつ生成して年末残高を分位点スケッチ（simcore.sketch）に流し込み、
+# すぐ捨てるので、1億経路 × 480か月でも使うメモリは chunk_size × 月数 の作業配列と
+# 年ごとのスケッチ（数MB）だけで済む。
+#
+# 乱数はルートのシードから SeedSequence.spawn でチャンクごとに独立した系列を作る。
+# チャンクは CHUNKS_PER_BLOCK 個ずつブロックにまとめてワーカープロセスに配り、
+# ブロックの集計を順番に合算するので、結果はワーカー数によらずビット単位で一致する。
+#
+# 分散低減: 乱数（ショック）の作り方を擬似乱数・対称変量・スクランブル Sobol 列から選べ、
+# 目標到達確率と不足額には決定論的な期待残高を使った制御変量法をかけられる。
+# 標準誤差はチャンクごとの推定値のばらつき（バッチ平均法）から求めるので、
+# 経路間に相関がある対称変量法や準モンテカルロでも正しく評価できる。
+#
+# compact=True ではチャンク内の経路と残高を float32 で持つ（simcore.compact）。
+
+import functools
+from statistics import NormalDist
+
+import numpy as np
+
+from .compact import COMPACT_FLOAT, precision_report
+from .parallel import block_seeds, parallel_reduce
+from .recurrence import solve_linear_recurrence
+from .sketch import QuantileSketch, RunningMoments
+
+
+def pseudo_random_shocks(rng, shape):
+    """通常の擬似乱数（標準正規分布）"""
+    return rng.standard_normal(shape)
+
+
+def antithetic_shocks(rng, shape):
+    """対称変量法: 前半の経路の乱数の符号を反転して後半の経路に使う"""
+    half = rng.standard_normal(((shape[0] + 1) // 2,) + tuple(shape[1:]))
+    return np.concatenate([half, -half])[:shape[0]]
+
+
+def sobol_shocks(rng, shape):
+    """スクランブルした Sobol 列による標準正規乱数（準モンテカルロ、scipy が必要）
+
+    次元が月、点が経路。チャンクごとに独立にスクランブルする（ランダム化QMC）ので、
+    チャンク単位の推定値は互いに独立で、標準誤差をバッチ平均法で求められる。
+    chunk_size は2のべき乗にすると点集合の均等性が保たれる。
+    """
+    try:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+    except ImportError as exc:
+        raise ImportError('Sobol 列を使うには scipy が必要です') from exc
+    n_paths, n_months = shape
+    sobol = qmc.Sobol(d=n_months, scramble=True, seed=rng)
+    points = sobol.random_base2(int(np.ceil(np.log2(max(n_paths, 2)))))[:n_paths]
+    return ndtri(points)
+
+
+SHOCK_GENERATORS = {'pseudo': pseudo_random_shocks, 'antithetic': antithetic_shocks, 'sobol': sobol_shocks}
+
+
+def _shock_generator(shocks):
+    if callable(shocks):
+        return shocks
+    if shocks not in SHOCK_GENERATORS:
+        raise ValueError(f'未対応の乱数の生成方法です: {shocks}')
+    return SHOCK_GENERATORS[shocks]
+
+
+def _normal_sample(monthly_mean, monthly_vol, shocks, rng, shape):
+    return monthly_mean + monthly_vol * shocks(rng, shape)
+
+
+def _lognormal_sample(drift, monthly_vol, shocks, rng, shape):
+    return np.expm1(drift + monthly_vol * shocks(rng, shape))
+
+
+def normal_returns(mean=0.05, vol=0.15, shocks='pseudo'):
+    """月次リターンが正規分布（年率 mean・ボラティリティ vol）に従うサンプラー
+
+    vol=0 のとき月次リターンは mean/12 で、決定論的シミュレーションと一致する。
+    shocks は 'pseudo' / 'antithetic' / 'sobol' または shocks(rng, shape) 関数。
+    """
+    return functools.partial(_normal_sample, mean / 12, vol / np.sqrt(12), _shock_generator(shocks))
+
+
+def lognormal_returns(mean=0.05, vol=0.15, shocks='pseudo'):
+    """月次の対数リターンが正規分布に従うサンプラー（元本割れが -100% を超えない）
+
+    月次グロス (1+r) の期待値が 1 + mean/12 になるようにドリフトを補正する。
+    """
+    monthly_vol = vol / np.sqrt(12)
+    return functools.partial(_lognormal_sample, np.log1p(mean / 12) - monthly_vol ** 2 / 2, monthly_vol,
+                             _shock_generator(shocks))
+
+
+RETURN_SAMPLERS = {'normal': normal_returns, 'lognormal': lognormal_returns}
+
+
+def return_sampler(sampler='normal', mean=0.05, vol=0.15, shocks='pseudo'):
+    """名前（'normal' / 'lognormal'）またはサンプラー関数からサンプラーを返す
+
+    サンプラーは sample(rng, (経路数, 月数)) で月次の単利リターンを返す関数。
+    マルチプロセスで使う場合は pickle できること（モジュール直下の関数や functools.partial）。
+    """
+    if callable(sampler):
+        return sampler
+    if sampler not in RETURN_SAMPLERS:
+        raise ValueError(f'未対応のリターン分布です: {sampler}')
+    return RETURN_SAMPLERS[sampler](mean, vol, shocks)
+
+
+class MonteCarloResult:
+    """年末残高の集計値（経路ごとの値は保持しない）
+
+    同じ条件の集計どうしは merge() で足し合わせられる。
+    expected_balance（年ごとの期待残高）を渡すと、到達確率と不足額の推定に
+    年末残高を制御変量とする制御変量法を使う。
+    """
+
+    def __init__(self, n_years, targets=(), relative_accuracy=0.005, expected_balance=None,
+                 tail_quantile=0.05):
+        self.targets = np.asarray(targets, dtype=float)
+        self.expected_balance = None if expected_balance is None else np.asarray(expected_balance, dtype=float)
+        self.tail_quantile = tail_quantile
+        self.sketch = QuantileSketch(n_years, relative_accuracy)
+        self.reached = np.zeros((len(self.targets), n_years), dtype=np.int64)
+        self.shortfall_total = np.zeros((len(self.targets), n_years))
+        # チャンクごとの推定値 [平均, 下側分位点, 到達確率, 期待不足額] のバッチ統計
+        self.batches = RunningMoments(n_years * (2 + 2 * len(self.targets)))
+
+    @property
+    def n_paths(self):
+        return self.sketch.count
+
+    @property
+    def n_batches(self):
+        return self.batches.count
+
+    @property
+    def years(self):
+        return np.arange(1, self.reached.shape[1] + 1)
+
+    def _chunk_estimates(self, balances):
+        """1チャンク分の推定値を1本のベクトルにまとめる"""
+        mean = balances.mean(axis=0)
+        estimates = [mean, np.quantile(balances, self.tail_quantile, axis=0)]
+        hits = [balances >= target for target in self.targets]
+        shortfalls = [np.maximum(target - balances, 0) for target in self.targets]
+        if self.expected_balance is None:
+            estimates += [hit.mean(axis=0) for hit in hits] + [gap.mean(axis=0) for gap in shortfalls]
+        else:
+            # 制御変量: 残高 X の期待値は既知なので、Y の平均を β(X̄ - E[X]) だけ補正する
+            deviation = balances - mean
+            variance = np.maximum(np.square(deviation).sum(axis=0), np.finfo(float).tiny)
+            for values in hits + shortfalls:
+                values = values.astype(float)
+                beta = (deviation * (values - values.mean(axis=0))).sum(axis=0) / variance
+                estimates.append(values.mean(axis=0) - beta * (mean - self.expected_balance))
+        return np.concatenate(estimates)
+
+    def _unpack(self, vector):
+        n_targets, n_years = self.reached.shape
+        return {'mean': vector[:n_years],
+                'tail': vector[n_years:2 * n_years],
+                'reach': vector[2 * n_years:(2 + n_targets) * n_years].reshape(n_targets, n_years),
+                'shortfall': vector[(2 + n_targets) * n_years:].reshape(n_targets, n_years)}
+
+    def add(self, balances):
+        """(経路数, 年数) の1チャンク分の年末残高（万円）を集計に加える"""
+        self.sketch.add(balances)
+        for i, target in enumerate(self.targets):
+            self.reached[i] += np.count_nonzero(balances >= target, axis=0)
+            self.shortfall_total[i] += np.maximum(target - balances, 0).sum(axis=0)
+        self.batches.add(self._chunk_estimates(balances)[np.newaxis])
+        return self
+
+    def merge(self, other):
+        """別のチャンク・ワーカーの集計を加える"""
+        self.sketch.merge(other.sketch)
+        self.reached += other.reached
+        self.shortfall_total += other.shortfall_total
+        self.batches.merge(other.batches)
+        return self
+
+    def mean(self):
+        return self.sketch.moments.mean
+
+    def std(self):
+        return self.sketch.moments.std()
+
+    def minimum(self):
+        return self.sketch.moments.min
+
+    def maximum(self):
+        return self.sketch.moments.max
+
+    def percentiles(self, q):
+        """年ごとのパーセンタイル（q は0〜100、戻り値の形状は (len(q), 年数)、相対誤差0.5%以内）"""
+        return self.sketch.percentiles(q)
+
+    def tail(self):
+        """年ごとの tail_quantile の分位点（チャンクごとの正確な分位点の平均）
+
+        standard_error()['tail'] と stop_on='tail' の打ち切りはこの推定値についてのもの。
+        percentiles() はスケッチ全体から引く別の推定値（相対誤差0.5%の丸めを含む）なので、
+        打ち切りで決めた精度の分位点を示すときはこちらを使う。
+        """
+        return self._unpack(self.batches.mean)['tail']
+
+    def reach_probability(self):
+        """目標額ごと・年ごとの到達確率（形状は (目標数, 年数)）"""
+        if self.expected_balance is not None:
+            return np.clip(self._unpack(self.batches.mean)['reach'], 0, 1)
+        return self.reached / self.n_paths
+
+    def standard_error(self):
+        """バッチ平均法による標準誤差（'mean' / 'tail' / 'reach' / 'shortfall'）
+
+        'tail' は tail() の推定値（チャンクごとの tail_quantile の分位点の平均）の標準誤差で、
+        percentiles() のスケッチの分位点の誤差ではない。
+        チャンクが2つ未満のときは nan。
+        """
+        if self.n_batches < 2:
+            return self._unpack(np.full(self.batches.mean.shape, np.nan))
+        return self._unpack(self.batches.std(ddof=1) / np.sqrt(self.n_batches))
+
+    def shortfall(self, year):
+        """year 年目末の目標ごとの不足統計
+
+        probability: 目標に届かない確率
+        expected: 不足額の期待値（届いた経路は0として平均）
+        conditional: 届かなかった経路だけの平均不足額
+        """
+        probability = 1 - self.reach_probability()[:, year - 1]
+        if self.expected_balance is not None:
+            expected = np.maximum(self._unpack(self.batches.mean)['shortfall'][:, year - 1], 0)
+        else:
+            expected = self.shortfall_total[:, year - 1] / self.n_paths
+        with np.errstate(divide='ignore', invalid='ignore'):
+            conditional = np.where(probability > 0, expected / probability, 0.0)
+        return {'target': self.targets, 'probability': probability,
+                'expected': expected, 'conditional': conditional}
+
+
+def _accumulate_balances(growth, monthly_contributions, initial, dtype=float):
+    """月次グロス (n_paths, 月数) から年末残高 (n_paths, 年数) を求める（dtype の精度で積み上げる）"""
+    n_paths, n_months = growth.shape
+    contributions = monthly_contributions.astype(dtype)
+    balance = np.full(n_paths, initial, dtype=dtype)
+    year_end = np.empty((n_paths, n_months // 12), dtype=dtype)
+    for month in range(n_months):
+        balance *= growth[:, month]
+        balance += contributions[month]
+        if month % 12 == 11:
+            year_end[:, month // 12] = balance
+    return year_end
+
+
+# compact モードでリターンを生成するときの1回あたりの経路数
+COMPACT_SLAB = 1024
+
+
+def _compact_growth(sample, rng, n_paths, n_months):
+    """月次グロスを float32 の配列に経路 COMPACT_SLAB 本ずつ生成する
+
+    float64 の作業配列は1スラブ分だけなので、チャンク全体のメモリは通常の約半分になる。
+    """
+    growth = np.empty((n_paths, n_months), dtype=COMPACT_FLOAT)
+    for start in range(0, n_paths, COMPACT_SLAB):
+        stop = min(start + COMPACT_SLAB, n_paths)
+        growth[start:stop] = sample(rng, (stop - start, n_months))
+    growth += 1
+    return growth
+
+
+def _simulate_chunk(monthly_contributions, n_paths, sample, rng, initial, compact=False):
+    """1チャンク分の経路を生成して年末残高 (n_paths, 年数) を返す"""
+    n_months = monthly_contributions.shape[0]
+    if compact:
+        return _accumulate_balances(_compact_growth(sample, rng, n_paths, n_months),
+                                    monthly_contributions, initial, COMPACT_FLOAT)
+    growth = sample(rng, (n_paths, n_months))
+    growth += 1
+    return _accumulate_balances(growth, monthly_contributions, initial)
+
+
+def compact_precision_report(monthly_contributions, n_paths=8192, sampler='normal', mean=0.05, vol=0.15,
+                             seed=None, initial=0.0):
+    """compact モード（float32）の年末残高が float64 の計算からどれだけずれるか
+
+    同じ月次リターンの経路を float64 と float32 の両方で積み上げて比べる。
+    戻り値は simcore.compact.precision_report() と同じ形式（単位は万円）。
+    """
+    monthly_contributions = np.asarray(monthly_contributions, dtype=float)
+    growth = return_sampler(sampler, mean, vol)(np.random.default_rng(seed),
+                                                 (n_paths, monthly_contributions.shape[0]))
+    growth += 1
+    reference = _accumulate_balances(growth, monthly_contributions, initial)
+    compact = _accumulate_balances(growth.astype(COMPACT_FLOAT), monthly_contributions, initial, COMPACT_FLOAT)
+    return precision_report(reference, compact)['value']
+
+
+# 1ブロック（ワーカーに渡す仕事の単位、適応的停止の判定単位）のチャンク数
+CHUNKS_PER_BLOCK = 16
+
+
+def _simulate_block(task):
+    """1ブロック分のチャンクを順に計算して集計を返す（ワーカープロセスで実行）"""
+    monthly_contributions, sizes, seeds, sample, initial, compact, settings = task
+    result = MonteCarloResult(monthly_contributions.shape[0] // 12, **settings)
+    for size, chunk_seed in zip(sizes, seeds):
+        balances = _simulate_chunk(monthly_contributions, size, sample,
+                                   np.random.default_rng(chunk_seed), initial, compact)
+        # 集計は float64 で行う（年末残高は経路数 × 年数なので変換しても小さい）
+        result.add(balances.astype(float, copy=False))
+    return result
+
+
+def simulate_market_paths(monthly_contributions, n_paths, sampler='normal', mean=0.05, vol=0.15,
+                          targets=(500, 1000), seed=None, initial=0.0, chunk_size=8192, workers=1,
+                          shocks='pseudo', control_variate=False, tail_quantile=0.05,
+                          ci_width=None, stop_on='mean', confidence=0.95, compact=False):
+    """月次積立額の系列に対して市場リターンの経路を n_paths 本シミュレーションする
+
+    monthly_contributions は月ごとの積立額（万円、長さは12の倍数）。
+    各月は「前月残高 × (1 + 月次リターン) + 積立額」で、決定論的な計算と同じ順序。
+    workers はプロセス数（None なら全コア）。同じ seed と chunk_size なら
+    workers の値にかかわらず結果はビット単位で一致する。
+
+    shocks: 'pseudo'（擬似乱数）/ 'antithetic'（対称変量法）/ 'sobol'（準モンテカルロ）
+    control_variate: 年率 mean の決定論的な期待残高を制御変量にする（名前付きサンプラーのみ）
+    ci_width: 指定すると最終年の stop_on（'mean' / 'tail' / 'reach' / 'shortfall'）の
+        信頼区間の幅（両側、confidence 水準）がこの値以下になった時点で打ち切る。
+        このとき n_paths は経路数の上限になる。stop_on='tail' で精度を保証するのは
+        MonteCarloResult.tail() の値（percentiles() ではない）。
+    compact: リターンの経路と残高を float32 で持ち、チャンクの作業メモリを約半分にする
+        （同じメモリで chunk_size を2倍にできる）。精度の低下は compact_precision_report() で確認できる。
+    戻り値は MonteCarloResult（年末残高の分布の集計）。
+    """
+    monthly_contributions = np.asarray(monthly_contributions, dtype=float)
+    if monthly_contributions.shape[0] % 12:
+        raise ValueError('積立額の系列は12か月単位で指定してください')
+    sample = return_sampler(sampler, mean, vol, shocks)
+    settings = {'targets': targets, 'tail_quantile': tail_quantile}
+    if control_variate:
+        if callable(sampler):
+            raise ValueError('制御変量法には名前付きのサンプラー（期待リターンが既知のもの）が必要です')
+        # 月次グロスの期待値は 1 + mean/12 なので、期待残高は決定論的な漸化式の解
+        expected = solve_linear_recurrence(np.full(monthly_contributions.shape, mean / 12),
+                                           monthly_contributions, initial)
+        settings['expected_balance'] = expected[11::12]
+
+    n_paths = int(n_paths)
+    n_chunks = -(-n_paths // chunk_size)
+    sizes = [min(chunk_size, n_paths - i * chunk_size) for i in range(n_chunks)]
+    seeds = block_seeds(seed, n_chunks)
+
+    until = None
+    if ci_width is not None:
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        def until(result):
+            error = result.standard_error()[stop_on][..., -1]
+            return result.n_batches >= 2 and bool(np.all(2 * z * error <= ci_width))
+
+    tasks = ((monthly_contributions, sizes[start:start + CHUNKS_PER_BLOCK],
+              seeds[start:start + CHUNKS_PER_BLOCK], sample, initial, compact, settings)
+             for start in range(0, n_chunks, CHUNKS_PER_BLOCK))
+    return parallel_reduce(_simulate_block, tasks, MonteCarloResult.merge, workers, until)
@@ -0,0 +1,156 @@
+# simcore/organization.py
+# 複数の新卒コホートを重ねた組織全体の将来推計
+#
+# gradeUpSim.py の組織ピラミッド（org_data）は現時点の固定値で、コホートモデルも
+# 新卒54人の1学年しか追っていなかった。ここでは毎年の採用計画に沿って入社年ごとのコホートを重ね、
+# 人数を（入社年 × パフォーマンス層 × グレード）の人数配列で持って1年ずつ進める。
+# 1人ずつのオブジェクトを持たないので、10万人規模の組織でも30年分の推計は数ミリ秒で終わる。
+# 昇進確率・離職率は simcore.cohort の CohortModel を使う（離職率は入社年ごとの勤続年数で決まる）。
+# seed を省略すると期待値（小数の人数）、指定すると二項分布で人数を整数のまま抽選する。
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cohort import DEFAULT_COHORT_MODEL
+from .salary import GRADE_SALARIES, GRADES
+
+# 職位レベルとグレードの対応（gradeUpSim.py の組織ピラミッドの区分）
+ORG_LEVELS = {
+    'Director (D1-D3)': ('D3', 'D2', 'D1'),
+    'Manager (M1-M3)': ('M3', 'M2', 'M1'),
+    'Professional (P1-P4)': ('P4', 'P3', 'P2', 'P1'),
+    'Basic (B1-B2)': ('B2', 'B1'),
+}
+
+# 現在の組織構成（推定、全378名）
+CURRENT_ORGANIZATION = {
+    'Director (D1-D3)': 10,
+    'Manager (M1-M3)': 42,
+    'Professional (P1-P4)': 160,
+    'Basic (B1-B2)': 166,
+}
+
+# 新卒採用人数（今年54人・去年80人）
+HIRING_THIS_YEAR = 54
+HIRING_LAST_YEAR = 80
+
+
+def level_counts_to_grades(levels=CURRENT_ORGANIZATION):
+    """職位レベルごとの人数をレベル内のグレードに均等に割り振る（長さ12の配列）"""
+    counts = np.zeros(len(GRADES))
+    for level, count in levels.items():
+        grades = [GRADES.index(grade) for grade in ORG_LEVELS[level]]
+        counts[grades] += count / len(grades)
+    return counts
+
+
+def hiring_schedule(hiring, years):
+    """採用計画を1〜years 年目の採用人数の配列にする
+
+    hiring は毎年の人数（整数）、年ごとの人数の列、または {年: 人数}（書かれていない年は0人）。
+    """
+    if isinstance(hiring, dict):
+        schedule = np.zeros(years)
+        for year, count in hiring.items():
+            if 1 <= year <= years:
+                schedule[year - 1] = count
+        return schedule
+    schedule = np.asarray(hiring, dtype=float)
+    if schedule.ndim == 0:
+        return np.full(years, float(schedule))
+    if schedule.shape != (years,):
+        raise ValueError(f'採用計画は {years} 年分必要です')
+    return schedule
+
+
+@dataclass
+class OrganizationProjection:
+    """0〜years 年目の（入社年 × グレード）の人数と人件費
+
+    counts[y, c, g]: y 年目末に在籍する入社年 c（0 は現在の社員）・グレード g の人数
+    """
+    counts: np.ndarray
+    hires: np.ndarray
+    leavers: np.ndarray
+
+    @property
+    def years(self):
+        return np.arange(self.counts.shape[0])
+
+    def grade_counts(self):
+        """年ごとのグレード別人数（形状は (年数+1, 12)）"""
+        return self.counts.sum(axis=1)
+
+    def headcount(self):
+        return self.counts.sum(axis=(1, 2))
+
+    def level_counts(self):
+        """年ごとの職位レベル別人数 {レベル: 配列}"""
+        grade_counts = self.grade_counts()
+        return {level: grade_counts[:, [GRADES.index(grade) for grade in grades]].sum(axis=1)
+                for level, grades in ORG_LEVELS.items()}
+
+    def payroll(self, salaries=GRADE_SALARIES):
+        """年ごとの人件費（グレードの想定年収の合計、万円）"""
+        return self.grade_counts() @ np.asarray(salaries, dtype=float)
+
+    def cohort_headcount(self):
+        """入社年ごとの在籍人数（形状は (年数+1, 入社年数+1)）"""
+        return self.counts.sum(axis=2)
+
+
+def project_organization(hiring=HIRING_THIS_YEAR, years=30, model=DEFAULT_COHORT_MODEL,
+                         initial=CURRENT_ORGANIZATION, initial_tenure=3, seed=None):
+    """採用計画に沿って組織の人数構成を years 年先まで推計する
+
+    initial は現在の職位レベル別人数（dict）またはグレード別人数（長さ12）。
+    現在の社員は勤続 initial_tenure 年目の1つのコホートとして扱う。
+    毎年、年度末に離職と昇進を判定してから、翌年度の新卒を B2 で迎える。
+    """
+    promotion = model.promotion_matrix().copy()
+    promotion[:, -1] = 0
+    attrition = model.attrition_matrix()
+    shares = np.asarray(model.shares) / sum(model.shares)
+    schedule = hiring_schedule(hiring, years)
+    rng = None if seed is None else np.random.default_rng(seed)
+    n_tiers, n_grades = promotion.shape
+
+    grades = level_counts_to_grades(initial) if isinstance(initial, dict) else np.asarray(initial, dtype=float)
+    state = np.zeros((years + 1, n_tiers, n_grades))
+    state[0] = shares[:, np.newaxis] * grades
+    if rng is not None:
+        state[0] = rng.multinomial(int(round(grades.sum())), (shares[:, np.newaxis] * grades / grades.sum()).ravel()
+                                   ).reshape(n_tiers, n_grades)
+    # 入社年 c の勤続年数（0年目時点、未入社のコホートは後で上書きされるので値は使われない）
+    tenure = np.concatenate([[initial_tenure], np.zeros(years, dtype=int)])
+    alive = np.zeros(years + 1, dtype=bool)
+    alive[0] = True
+
+    counts = np.zeros((years + 1, years + 1, n_grades))
+    counts[0, 0] = state[0].sum(axis=0)
+    leavers = np.zeros(years + 1)
+    for year in range(1, years + 1):
+        current = state[alive]
+        rates = attrition[:, np.minimum(tenure[alive], attrition.shape[1]) - 1].T[:, :, np.newaxis]
+        if rng is None:
+            stayed = current * (1 - rates)
+            promoted = stayed * promotion
+        else:
+            stayed = current - rng.binomial(current.astype(np.int64), np.broadcast_to(rates, current.shape))
+            promoted = rng.binomial(stayed.astype(np.int64), promotion)
+        leavers[year] = current.sum() - stayed.sum()
+        stayed = stayed - promoted
+        stayed[..., 1:] += promoted[..., :-1]
+        state[alive] = stayed
+        tenure[alive] += 1
+
+        # 新卒の入社
+        if rng is None:
+            state[year, :, 0] = schedule[year - 1] * shares
+        else:
+            state[year, :, 0] = rng.multinomial(int(schedule[year - 1]), shares)
+        tenure[year] = 1
+        alive[year] = True
+        counts[year] = state.sum(axis=1)
+    return OrganizationProjection(counts, np.concatenate([[0], schedule]), leavers)
@@ -0,0 +1,74 @@
+# simcore/parallel.py
+# 確率的シミュレーションのマルチプロセス実行
+#
+# 仕事をワーカー数に関係なく固定サイズのブロックに分け、ブロック i には
+# ルートのシードから SeedSequence.spawn で作った i 番目の乱数系列を割り当てる。
+# 各ブロックの部分集計は親プロセスでブロック番号の順に足し合わせるので、
+# ワーカー数が1でも64でも浮動小数点の加算順序まで同じになり、結果はビット単位で一致する。
+#
+# 注意: Windows / macOS（spawn 方式）では子プロセスが呼び出し元のスクリプトを
+# import し直すため、workers に1以外を指定するのは if __name__ == '__main__': の中からにすること。
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def resolve_workers(workers):
+    """None なら全コア、それ以外は1以上の整数にする"""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def block_seeds(seed, n_blocks):
+    """ルートのシードからブロックごとに独立した乱数系列の種を作る"""
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return root.spawn(n_blocks)
+
+
+def ordered_map(func, tasks, workers=1, window=None):
+    """func(task) の結果を tasks の順番どおりに返すジェネレーター
+
+    workers=1 ならプロセスを起動せずにその場で計算する。同時に投入するタスクは
+    window 個（既定はワーカー数の2倍）までに抑え、未回収の結果でメモリが膨らまないようにする。
+    func と task は pickle できる必要がある（モジュール直下の関数など）。
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    window = window or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(executor.submit(func, task))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # 途中で打ち切られた場合、まだ始まっていないタスクは取り消す
+            for future in pending:
+                future.cancel()
+
+
+def parallel_reduce(func, tasks, merge, workers=1, until=None):
+    """各タスクの部分集計を tasks の順番に merge(acc, part) で足し合わせる
+
+    until(acc) が真になった時点で残りのタスクは打ち切る。判定は順番どおりに
+    統合した後で行うので、打ち切り位置もワーカー数によらず同じになる。
+    """
+    result = None
+    parts = ordered_map(func, tasks, workers)
+    for part in parts:
+        result = part if result is None else merge(result, part)
+        if until is not None and until(result):
+            parts.close()
+            break
+    return result
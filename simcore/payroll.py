@@ -0,0 +1,264 @@
+# simcore/payroll.py
+# 額面から手取りへの計算（社会保険料・所得税・住民税）
+#
+# これまでは「手取り = 額面 × (1 - TAX_RATE)」（TAX_RATE = 0.20）や「手取り75%」の一律の率で、
+# 図4の給与明細の社会保険料・所得税・住民税も手で書いた値だった。
+# ここでは会社員（単身・扶養なし）の1年分の
+#   健康保険・介護保険（40〜64歳）・厚生年金: 標準報酬月額・標準賞与額 × 料率の本人負担分
+#   雇用保険: 支給額 × 本人負担の料率
+#   所得税（復興特別所得税を含む）・住民税（所得割 + 均等割）: 給与所得控除・基礎控除・社会保険料控除の後の税額表
+# を計算する。標準報酬月額の等級表・控除額や税率の区分はすべて (上限, 率, 定数) の表にしてあり、
+# 1,000円刻みに前もって引いておいた区分番号の表で区分を決めるので、数百万人分の額面を配列演算でまとめて計算できる。
+# 料率・税率は2024年度（協会けんぽ東京支部）の値。住民税は前年の所得にかかるが、
+# take_home_pay() は同じ年の所得から計算した額（毎年同じ年収なら一致）を返し、
+# 年収が年ごとに変わる場合は take_home_path() で1年ずらす。
+
+import numpy as np
+
+# 健康保険の標準報酬月額（円、第1〜50級）と各等級の下限（第2級以降、円）
+STANDARD_MONTHLY_REMUNERATION = np.array([
+    58_000, 68_000, 78_000, 88_000, 98_000, 104_000, 110_000, 118_000, 126_000, 134_000,
+    142_000, 150_000, 160_000, 170_000, 180_000, 190_000, 200_000, 220_000, 240_000, 260_000,
+    280_000, 300_000, 320_000, 340_000, 360_000, 380_000, 410_000, 440_000, 470_000, 500_000,
+    530_000, 560_000, 590_000, 620_000, 650_000, 680_000, 710_000, 750_000, 790_000, 830_000,
+    880_000, 930_000, 980_000, 1_030_000, 1_090_000, 1_150_000, 1_210_000, 1_270_000, 1_330_000, 1_390_000,
+], dtype=float)
+REMUNERATION_BOUNDS = np.array([
+    63_000, 73_000, 83_000, 93_000, 101_000, 107_000, 114_000, 122_000, 130_000, 138_000,
+    146_000, 155_000, 165_000, 175_000, 185_000, 195_000, 210_000, 230_000, 250_000, 270_000,
+    290_000, 310_000, 330_000, 350_000, 370_000, 395_000, 425_000, 455_000, 485_000, 515_000,
+    545_000, 575_000, 605_000, 635_000, 665_000, 695_000, 730_000, 770_000, 810_000, 855_000,
+    905_000, 955_000, 1_005_000, 1_055_000, 1_115_000, 1_175_000, 1_235_000, 1_295_000, 1_355_000,
+], dtype=float)
+
+# 厚生年金の標準報酬月額は健康保険の第4級（88,000円）〜第35級（650,000円）の範囲
+PENSION_REMUNERATION_RANGE = (88_000, 650_000)
+
+# 料率（労使合計、雇用保険は本人負担分）
+HEALTH_INSURANCE_RATE = 0.0998
+NURSING_CARE_RATE = 0.0160
+PENSION_RATE = 0.183
+EMPLOYMENT_INSURANCE_RATE = 0.006
+NURSING_CARE_AGES = (40, 65)
+
+# 標準賞与額の上限（健康保険は年度の累計、厚生年金は1回あたり）
+HEALTH_BONUS_CAP = 5_730_000
+PENSION_BONUS_CAP = 1_500_000
+
+# 控除額・税額の表: 各行は (給与収入・所得の上限, 率, 定数)、その区分の額は 率 × 金額 + 定数
+EMPLOYMENT_INCOME_DEDUCTION = (
+    (1_625_000, 0.0, 550_000),
+    (1_800_000, 0.4, -100_000),
+    (3_600_000, 0.3, 80_000),
+    (6_600_000, 0.2, 440_000),
+    (8_500_000, 0.1, 1_100_000),
+    (np.inf, 0.0, 1_950_000),
+)
+INCOME_TAX_BASIC_DEDUCTION = (
+    (24_000_000, 0.0, 480_000),
+    (24_500_000, 0.0, 320_000),
+    (25_000_000, 0.0, 160_000),
+    (np.inf, 0.0, 0),
+)
+RESIDENT_TAX_BASIC_DEDUCTION = (
+    (24_000_000, 0.0, 430_000),
+    (24_500_000, 0.0, 290_000),
+    (25_000_000, 0.0, 150_000),
+    (np.inf, 0.0, 0),
+)
+INCOME_TAX_BRACKETS = (
+    (1_949_000, 0.05, 0),
+    (3_299_000, 0.10, -97_500),
+    (6_949_000, 0.20, -427_500),
+    (8_999_000, 0.23, -636_000),
+    (17_999_000, 0.33, -1_536_000),
+    (39_999_000, 0.40, -2_796_000),
+    (np.inf, 0.45, -4_796_000),
+)
+RECONSTRUCTION_SURTAX_RATE = 0.021
+
+# 住民税（所得割10%、均等割は森林環境税を含む）と非課税になる所得の上限（単身、東京23区）
+RESIDENT_TAX_RATE = 0.10
+RESIDENT_PER_CAPITA_TAX = 5_000
+RESIDENT_NONTAXABLE_INCOME = 450_000
+
+PAYROLL_FIELDS = ('gross', 'health_insurance', 'nursing_care', 'pension', 'employment_insurance',
+                  'social_insurance', 'income_tax', 'resident_tax', 'take_home')
+PAYROLL_DTYPE = np.dtype([(name, 'f8') for name in PAYROLL_FIELDS])
+
+# 年収を月給と賞与に分けるときの賞与の月数（0 なら年収を12か月の月給とみなす）
+DEFAULT_BONUS_MONTHS = 0.0
+
+
+def bracket_table(rows, side='left'):
+    """(上限, 率, 定数) の行を区分の表にする
+
+    上限はすべて1,000円の倍数なので、金額を1,000円単位に切り上げた（side='right' なら切り捨てた）値で
+    searchsorted と同じ区分になる。その区分番号を1,000円刻みで前もって計算しておき、
+    金額ごとの二分探索を配列の添字引き1回で済ませる。
+    """
+    bounds, rates, constants = (np.array(column, dtype=float) for column in zip(*rows))
+    n_keys = int(bounds[np.isfinite(bounds)].max() // 1000) + 2
+    index = np.searchsorted(bounds, np.arange(n_keys) * 1000.0, side=side).astype(np.intp)
+    return {'bounds': bounds, 'rates': rates, 'constants': constants, 'index': index, 'side': side}
+
+
+_TABLES = {name: bracket_table(rows) for name, rows in (
+    ('employment_income_deduction', EMPLOYMENT_INCOME_DEDUCTION),
+    ('income_tax_basic_deduction', INCOME_TAX_BASIC_DEDUCTION),
+    ('resident_tax_basic_deduction', RESIDENT_TAX_BASIC_DEDUCTION),
+    ('income_tax', INCOME_TAX_BRACKETS),
+)}
+_REMUNERATION_TABLE = bracket_table(zip(np.append(REMUNERATION_BOUNDS, np.inf), STANDARD_MONTHLY_REMUNERATION,
+                                        np.zeros(STANDARD_MONTHLY_REMUNERATION.size)), side='right')
+
+
+def bracket_index(table, amount):
+    """金額の区分番号（side='left' なら上限以下の最初の行、'right' なら上限を超えない最後の行の次）"""
+    table = _TABLES[table] if isinstance(table, str) else table
+    amount = np.asarray(amount, dtype=float)
+    keys = np.floor(amount * 1e-3) if table['side'] == 'right' else np.ceil(amount * 1e-3)
+    return table['index'][np.clip(keys, 0, table['index'].size - 1).astype(np.intp)]
+
+
+def apply_brackets(table, amount, index=None):
+    """金額の区分の 率 × 金額 + 定数（index を渡すとその区分番号を使う）"""
+    table = _TABLES[table] if isinstance(table, str) else table
+    amount = np.asarray(amount, dtype=float)
+    index = bracket_index(table, amount) if index is None else index
+    return table['rates'][index] * amount + table['constants'][index]
+
+
+def _round_premium(amount):
+    """保険料の本人負担分の端数処理（50銭以下切り捨て、50銭超切り上げ）"""
+    return np.maximum(np.ceil(amount - 0.5), 0)
+
+
+def _floor(amount, unit):
+    return np.floor(amount / unit) * unit
+
+
+def standard_monthly_remuneration(monthly_pay):
+    """報酬月額（円）に対する健康保険の標準報酬月額"""
+    return STANDARD_MONTHLY_REMUNERATION[bracket_index(_REMUNERATION_TABLE, monthly_pay)]
+
+
+def _payroll_chunk(monthly_salary, bonuses, care, nontaxable, out):
+    """1チャンク分（1次元配列）の社会保険料・税金を out（PAYROLL_DTYPE）に書き込む"""
+    health_rate = HEALTH_INSURANCE_RATE / 2
+    care_rate = np.where(care, NURSING_CARE_RATE / 2, 0.0) if care.any() else 0.0
+    pension_rate = PENSION_RATE / 2
+
+    # 月給分（標準報酬月額 × 料率 × 12か月）
+    standard = standard_monthly_remuneration(monthly_salary)
+    health = 12 * _round_premium(standard * health_rate)
+    nursing = 12 * _round_premium(standard * care_rate)
+    pension = 12 * _round_premium(np.clip(standard, *PENSION_REMUNERATION_RANGE) * pension_rate)
+    employment = 12 * _round_premium(monthly_salary * EMPLOYMENT_INSURANCE_RATE)
+    gross = 12 * monthly_salary
+
+    # 賞与分（千円未満切り捨ての標準賞与額、健康保険は年度の累計で上限）
+    health_bonus_total = 0.0
+    for bonus in bonuses:
+        standard_bonus = _floor(bonus, 1000)
+        health_base = np.clip(HEALTH_BONUS_CAP - health_bonus_total, 0, standard_bonus)
+        health_bonus_total = health_bonus_total + health_base
+        health += _round_premium(health_base * health_rate)
+        nursing += _round_premium(health_base * care_rate)
+        pension += _round_premium(np.minimum(standard_bonus, PENSION_BONUS_CAP) * pension_rate)
+        employment += _round_premium(bonus * EMPLOYMENT_INSURANCE_RATE)
+        gross += bonus
+    social = health + nursing + pension + employment
+
+    # 所得税（年末調整後）: 給与所得 - 社会保険料控除 - 基礎控除 の千円未満切り捨てに税率表、
+    # 復興特別所得税を加えて百円未満切り捨て
+    salary_income = gross - 12 * nontaxable
+    employment_income = np.maximum(salary_income - apply_brackets('employment_income_deduction', salary_income), 0)
+    # 所得税と住民税の基礎控除は区分の境目が同じなので区分番号を共有する
+    basic = bracket_index('income_tax_basic_deduction', employment_income)
+    taxable = _floor(np.maximum(employment_income - social
+                                - apply_brackets('income_tax_basic_deduction', employment_income, basic), 0), 1000)
+    income_tax = _floor(apply_brackets('income_tax', taxable) * (1 + RECONSTRUCTION_SURTAX_RATE), 100)
+
+    # 住民税: 所得割（調整控除を引いて百円未満切り捨て）+ 均等割、所得が非課税限度額以下なら0
+    resident_taxable = _floor(np.maximum(employment_income - social
+                                         - apply_brackets('resident_tax_basic_deduction', employment_income, basic),
+                                         0),
+                              1000)
+    adjustment = np.where(resident_taxable <= 2_000_000, 0.05 * np.minimum(50_000, resident_taxable),
+                          np.maximum(0.05 * (50_000 - (resident_taxable - 2_000_000)), 2_500))
+    resident_tax = _floor(np.maximum(resident_taxable * RESIDENT_TAX_RATE - adjustment, 0), 100)
+    resident_tax = np.where(employment_income > RESIDENT_NONTAXABLE_INCOME,
+                            resident_tax + RESIDENT_PER_CAPITA_TAX, 0.0)
+
+    for name, values in (('gross', gross), ('health_insurance', health), ('nursing_care', nursing),
+                         ('pension', pension), ('employment_insurance', employment), ('social_insurance', social),
+                         ('income_tax', income_tax), ('resident_tax', resident_tax)):
+        out[name] = values
+    out['take_home'] = gross - social - income_tax - resident_tax
+
+
+def take_home_pay(monthly_salary, bonuses=(0.0, 0.0), age=30, nontaxable=0.0, chunk_size=65536):
+    """月給と賞与（年2回）から1年分の社会保険料・税金・手取りを計算する（単位は円）
+
+    monthly_salary は毎月の総支給額（通勤手当などの非課税手当 nontaxable を含む）、
+    bonuses は賞与の額の列（既定は2回）。引数は互いにブロードキャストできる配列でよい。
+    戻り値は PAYROLL_DTYPE の構造化配列（年額）。resident_tax はその年の所得に対する住民税
+    （実際に払うのは翌年）で、take_home は毎年同じ収入が続く場合の手取り。
+    chunk_size 人ずつ計算して作業用配列をキャッシュに収める。
+    """
+    # 0円の賞与（スカラー）は計算を省く
+    bonuses = [bonus for bonus in bonuses if np.ndim(bonus) or bonus]
+    arrays = np.broadcast_arrays(np.asarray(monthly_salary, dtype=float), np.asarray(age),
+                                 np.asarray(nontaxable, dtype=float), *[np.asarray(b, dtype=float) for b in bonuses])
+    shape = arrays[0].shape
+    monthly_salary, age, nontaxable, *bonuses = [array.ravel() for array in arrays]
+    care = (age >= NURSING_CARE_AGES[0]) & (age < NURSING_CARE_AGES[1])
+
+    result = np.empty(monthly_salary.shape, dtype=PAYROLL_DTYPE)
+    for start in range(0, max(result.size, 1), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        _payroll_chunk(monthly_salary[chunk], [bonus[chunk] for bonus in bonuses], care[chunk],
+                       nontaxable[chunk], result[chunk])
+    return result.reshape(shape)
+
+
+def split_annual_salary(annual_salary, bonus_months=DEFAULT_BONUS_MONTHS):
+    """年収（万円）を月給（円）と2回分の賞与（円）に分ける（賞与がなければ賞与は空）"""
+    monthly = np.asarray(annual_salary, dtype=float) * 10000 / (12 + bonus_months)
+    if not bonus_months:
+        return monthly, ()
+    bonus = monthly * bonus_months / 2
+    return monthly, (bonus, bonus)
+
+
+def annual_take_home(annual_salary, bonus_months=DEFAULT_BONUS_MONTHS, age=30):
+    """年収（万円、配列可）に対する手取り（万円、毎年同じ年収が続く場合）"""
+    monthly, bonuses = split_annual_salary(annual_salary, bonus_months)
+    return take_home_pay(monthly, bonuses, age)['take_home'] / 10000
+
+
+def take_home_path(annual_salaries, start_age=22, bonus_months=DEFAULT_BONUS_MONTHS, first_resident_tax=0.0):
+    """年ごとの年収（万円、最後の軸が年）に対する年ごとの手取り（万円）
+
+    住民税は前年の所得にかかるので1年ずらす（1年目は first_resident_tax 万円、新卒なら0）。
+    介護保険料は start_age 歳から数えた年齢で判定する。
+    """
+    annual_salaries = np.asarray(annual_salaries, dtype=float)
+    ages = start_age + np.arange(annual_salaries.shape[-1])
+    monthly, bonuses = split_annual_salary(annual_salaries, bonus_months)
+    payroll = take_home_pay(monthly, bonuses, ages)
+    resident_tax = np.concatenate([np.broadcast_to(first_resident_tax * 10000, payroll.shape[:-1] + (1,)),
+                                   payroll['resident_tax'][..., :-1]], axis=-1)
+    return (payroll['gross'] - payroll['social_insurance'] - payroll['income_tax'] - resident_tax) / 10000
+
+
+def gross_for_take_home(take_home, bonus_months=DEFAULT_BONUS_MONTHS, age=30, max_salary=5000, step=1.0):
+    """手取り（万円）を得るのに必要な年収（万円）
+
+    0〜max_salary 万円を step 万円刻みで計算した手取りの表を逆に引く（標準報酬月額の等級の境目で
+    手取りがわずかに減る区間があるので、その手前までの最大値で単調にしてから補間する）。
+    """
+    grid = np.arange(0, max_salary + step, step)
+    table = np.maximum.accumulate(annual_take_home(grid, bonus_months, age))
+    return np.interp(take_home, table, grid)
@@ -0,0 +1,28 @@
+# simcore/plotting.py
+# 図表スクリプト共通の描画設定
+#
+# simcore の他のモジュールは matplotlib に依存しない。描画設定が必要な
+# スクリプトだけがこのモジュールの setup_japanese_font() を呼ぶ。
+
+# 日本語フォントの候補（Mac: Hiragino Sans、Windows: Yu Gothic / Meiryo / MS Gothic、Linux: IPA・Noto等）
+JAPANESE_FONTS = ['Hiragino Sans', 'Yu Gothic', 'Meiryo', 'MS Gothic', 'Takao', 'IPAexGothic',
+                  'IPAPGothic', 'VL PGothic', 'Noto Sans CJK JP']
+
+# カラーパレット設定（visualization_part1-3 共通）
+COLORS = {
+    'primary': '#2E86AB',
+    'secondary': '#A23B72',
+    'accent': '#F18F01',
+    'positive': '#2ECC71',
+    'negative': '#E74C3C',
+    'neutral': '#95A5A6'
+}
+
+
+def setup_japanese_font(fonts=None):
+    """matplotlib の日本語フォントとマイナス記号の設定"""
+    import matplotlib.pyplot as plt
+
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = list(fonts or JAPANESE_FONTS)
+    plt.rcParams['axes.unicode_minus'] = False
@@ -0,0 +1,170 @@
+# simcore/probability.py
+# 目標達成確率の推定（信頼区間付き・セルごとの早期打ち切り）
+#
+# 「t年目までに資産が目標額に届く確率」を（目標額 × 年数）の格子全体について
+# 1回のモンテカルロでまとめて推定する。各セルは二項分布の比率なので、
+# Wilson 区間または Clopper–Pearson 区間で信頼区間を付ける。
+# 区間の幅が ci_width 以下になったセルは集計を止め、まだ続いているセルが必要とする
+# 年数までしか経路を伸ばさないので、対話的な問い合わせでもすぐに結果が返る。
+
+from dataclasses import dataclass
+from math import lgamma
+from statistics import NormalDist
+
+import numpy as np
+
+from .monte_carlo import _simulate_chunk, return_sampler
+from .parallel import block_seeds
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """Wilson スコア区間（下限, 上限）"""
+    successes = np.asarray(successes, dtype=float)
+    trials = np.maximum(np.asarray(trials, dtype=float), 1)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return np.clip(center - half, 0, 1), np.clip(center + half, 0, 1)
+
+
+def _beta_continued_fraction(a, b, x, max_iter=5000, eps=1e-15):
+    """正則化不完全ベータ関数の連分数部分（修正 Lentz 法、要素ごとに収束判定）"""
+    tiny = 1e-300
+    c = np.ones_like(x)
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+    h = d.copy()
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        for numerator in (m * (b - m) * x / ((a + m2 - 1) * (a + m2)),
+                          -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1))):
+            d = 1 + numerator * d
+            d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1 + numerator / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            delta = c * d
+            h = h * delta
+        if np.all(np.abs(delta - 1) < eps):
+            break
+    return h
+
+
+def regularized_incomplete_beta(a, b, x):
+    """I_x(a, b)（scipy があれば scipy.special.betainc を使う）"""
+    try:
+        from scipy.special import betainc
+        return betainc(a, b, x)
+    except ImportError:
+        pass
+    a, b, x = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, x)))
+    x = np.clip(x, 0, 1)
+    xs = np.where((x > 0) & (x < 1), x, 0.5)
+    log_gamma = np.vectorize(lgamma)
+    log_beta = log_gamma(a + b) - log_gamma(a) - log_gamma(b)
+    front = np.exp(log_beta + a * np.log(xs) + b * np.log1p(-xs))
+    # 連分数は x < (a+1)/(a+b+2) で速く収束するので、それ以外は対称性 I_x(a,b) = 1 - I_{1-x}(b,a) を使う
+    direct = xs < (a + 1) / (a + b + 2)
+    aa, bb, xx = np.where(direct, a, b), np.where(direct, b, a), np.where(direct, xs, 1 - xs)
+    fraction = front * _beta_continued_fraction(aa, bb, xx) / aa
+    value = np.where(direct, fraction, 1 - fraction)
+    return np.where(x <= 0, 0.0, np.where(x >= 1, 1.0, value))
+
+
+def _beta_quantile(a, b, probability, iterations=60):
+    """I_x(a, b) = probability となる x（二分法、scipy があれば betaincinv）"""
+    try:
+        from scipy.special import betaincinv
+        return betaincinv(a, b, probability)
+    except ImportError:
+        pass
+    a, b, probability = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, probability)))
+    low, high = np.zeros(a.shape), np.ones(a.shape)
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        below = regularized_incomplete_beta(a, b, middle) < probability
+        low, high = np.where(below, middle, low), np.where(below, high, middle)
+    return (low + high) / 2
+
+
+def clopper_pearson_interval(successes, trials, confidence=0.95):
+    """Clopper–Pearson（正確）区間（下限, 上限）"""
+    successes = np.asarray(successes, dtype=float)
+    trials = np.asarray(trials, dtype=float)
+    alpha = 1 - confidence
+    lower = np.where(successes > 0,
+                     _beta_quantile(np.maximum(successes, 1), np.maximum(trials - successes + 1, 1), alpha / 2), 0.0)
+    upper = np.where(successes < trials,
+                     _beta_quantile(successes + 1, np.maximum(trials - successes, 1), 1 - alpha / 2), 1.0)
+    return lower, upper
+
+
+INTERVALS = {'wilson': wilson_interval, 'clopper-pearson': clopper_pearson_interval}
+
+
+@dataclass
+class TargetProbabilityGrid:
+    """目標額 × 年数の格子の成功回数・試行回数"""
+    targets: np.ndarray
+    years: np.ndarray
+    successes: np.ndarray
+    trials: np.ndarray
+    confidence: float = 0.95
+    interval_method: str = 'wilson'
+
+    def probability(self):
+        """到達確率の推定値（形状は (目標数, 年数)）"""
+        return self.successes / np.maximum(self.trials, 1)
+
+    def interval(self, method=None):
+        """信頼区間（下限, 上限）"""
+        return INTERVALS[method or self.interval_method](self.successes, self.trials, self.confidence)
+
+    def width(self, method=None):
+        lower, upper = self.interval(method)
+        return upper - lower
+
+
+def target_probability_grid(monthly_contributions, targets, years, max_paths=1_000_000,
+                            sampler='normal', mean=0.05, vol=0.15, seed=None, initial=0.0,
+                            batch_size=8192, ci_width=0.01, interval='wilson', confidence=0.95,
+                            by_year=True, compact=False):
+    """P(資産 ≥ 目標額, t年目まで) を目標額 × 年数の格子で推定する
+
+    monthly_contributions は月ごとの積立額（万円、少なくとも max(years) 年分）。
+    by_year=True なら「t年目までのどこかの年末で届いた」確率、False なら「t年目末に届いている」確率。
+    batch_size 本ごとに区間の幅を調べ、ci_width 以下になったセルはそこで集計を止める。
+    全セルが止まるか max_paths 本に達したら終了する。乱数はバッチごとに独立した系列なので、
+    同じ引数なら結果は再現する。compact=True なら経路を float32 で持つ（simcore.compact）。
+    """
+    targets = np.asarray(targets, dtype=float)
+    years = np.asarray(years, dtype=int)
+    monthly_contributions = np.asarray(monthly_contributions, dtype=float)
+    if monthly_contributions.shape[0] < 12 * years.max():
+        raise ValueError('積立額の系列が max(years) 年分に足りません')
+    if interval not in INTERVALS:
+        raise ValueError(f'未対応の信頼区間です: {interval}')
+    sample = return_sampler(sampler, mean, vol)
+
+    grid = TargetProbabilityGrid(targets, years, np.zeros((len(targets), len(years)), dtype=np.int64),
+                                 np.zeros((len(targets), len(years)), dtype=np.int64), confidence, interval)
+    active = np.ones(grid.successes.shape, dtype=bool)
+    seeds = block_seeds(seed, -(-int(max_paths) // batch_size))
+    for i, batch_seed in enumerate(seeds):
+        # まだ続いているセルが必要とする年数までだけ経路を伸ばす
+        horizon = int(years[active.any(axis=0)].max())
+        size = min(batch_size, int(max_paths) - i * batch_size)
+        balances = _simulate_chunk(monthly_contributions[:12 * horizon], size, sample,
+                                   np.random.default_rng(batch_seed), initial, compact)
+        if by_year:
+            balances = np.maximum.accumulate(balances, axis=1)
+        columns = np.minimum(years, horizon) - 1
+        hits = (balances[:, columns] >= targets[:, np.newaxis, np.newaxis]).sum(axis=1)
+        grid.successes[active] += hits[active]
+        grid.trials[active] += size
+
+        active &= grid.width() > ci_width
+        if not active.any():
+            break
+    return grid
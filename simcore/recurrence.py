@@ -0,0 +1,45 @@
+# simcore/recurrence.py
+# 時変リターン・時変キャッシュフローの残高漸化式ソルバー
+#
+#     b_t = b_{t-1} * (1 + r_t) + c_t
+#
+# を Python のループなしで解く。各期を一次関数 x -> a*x + c とみなし、
+# 関数合成（結合則を満たす）を倍々に適用するスキャン（Hillis-Steele）で累積する。
+# 割り算や対数を使わないので、-100%のリターンや長期間でも桁あふれ・ゼロ除算が起きない。
+
+import numpy as np
+
+
+def solve_linear_recurrence(returns, contributions, initial=0.0, axis=-1):
+    """b_t = b_{t-1} * (1 + r_t) + c_t の全期間の残高を返す
+
+    returns, contributions はブロードキャスト可能な配列で、axis が期間の軸。
+    シナリオ方向（それ以外の軸）にもブロードキャストされるので、
+    決定論的な5%のケースも乱数・過去データのリターン経路も同じコストで計算できる。
+    initial は期間軸を除いた形状にブロードキャスト可能な初期残高。
+    """
+    growth = 1 + np.asarray(returns, dtype=float)
+    contributions = np.asarray(contributions, dtype=float)
+    growth, contributions = np.broadcast_arrays(growth, contributions)
+    growth = np.moveaxis(growth, axis, -1).copy()
+    balance = np.moveaxis(contributions, axis, -1).copy()
+
+    # shift 期ずつ離れた区間を合成する：(a1, c1) の後に (a2, c2) -> (a1*a2, c1*a2 + c2)
+    n_periods = growth.shape[-1]
+    shift = 1
+    while shift < n_periods:
+        balance[..., shift:] += balance[..., :-shift] * growth[..., shift:]
+        growth[..., shift:] *= growth[..., :-shift]
+        shift *= 2
+
+    # growth は累積成長率になっているので、初期残高はそれを掛けるだけでよい
+    balance += np.asarray(initial, dtype=float)[..., np.newaxis] * growth
+    return np.moveaxis(balance, -1, axis)
+
+
+def returns_from_prices(prices, axis=-1):
+    """価格系列から期間リターンを計算する（先頭の期は0）"""
+    prices = np.moveaxis(np.asarray(prices, dtype=float), axis, -1)
+    returns = np.zeros_like(prices)
+    returns[..., 1:] = prices[..., 1:] / prices[..., :-1] - 1
+    return np.moveaxis(returns, -1, axis)
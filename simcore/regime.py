@@ -0,0 +1,145 @@
+# simcore/regime.py
+# 相場局面（強気・弱気・暴落）が切り替わるマルコフ・レジームスイッチング・モデル
+#
+# fig20・fig22 は暴落を「10年間 -2% の後 7%」のような1つの形で描いていたが、
+# 局面の遷移確率と局面ごとのリターン分布から月次の経路を大量に生成し、
+# 暴落が「いつ」「どれだけ深く」起き「何か月で回復するか」の分布を求められるようにする。
+# 局面の遷移は全経路まとめて1か月ずつ進める（月数回のループ、経路方向はベクトル化）。
+
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+
+from .parallel import block_seeds, ordered_map
+
+
+@dataclass(frozen=True)
+class RegimeModel:
+    """局面の遷移行列（月次）と局面ごとの年率リターン・ボラティリティ"""
+    states: tuple
+    transition: tuple
+    mean: tuple
+    vol: tuple
+    initial: tuple = None
+
+    def transition_matrix(self):
+        matrix = np.asarray(self.transition, dtype=float)
+        if matrix.shape != (len(self.states),) * 2 or not np.allclose(matrix.sum(axis=1), 1):
+            raise ValueError('遷移行列は局面数×局面数で、各行の和が1である必要があります')
+        return matrix
+
+    def stationary_distribution(self):
+        """長期的に各局面にいる割合"""
+        values, vectors = np.linalg.eig(self.transition_matrix().T)
+        vector = np.real(vectors[:, np.argmin(np.abs(values - 1))])
+        return vector / vector.sum()
+
+    def initial_distribution(self):
+        if self.initial is None:
+            return self.stationary_distribution()
+        return np.asarray(self.initial, dtype=float)
+
+    def long_run_return(self):
+        """定常状態での年率の期待リターン"""
+        return float(self.stationary_distribution() @ np.asarray(self.mean, dtype=float))
+
+    def expected_duration(self):
+        """各局面に入ってから抜けるまでの平均月数"""
+        return 1 / (1 - np.diag(self.transition_matrix()))
+
+
+# 既定のモデル：長期の幾何平均は年率約5%・ボラティリティ約15%、
+# 暴落は平均3か月続き年率-35%相当で下落（40年間の最大下落率の中央値は約-50%）
+DEFAULT_REGIMES = RegimeModel(
+    states=('bull', 'bear', 'crash'),
+    transition=((0.978, 0.018, 0.004),
+                (0.070, 0.915, 0.015),
+                (0.080, 0.250, 0.670)),
+    mean=(0.10, -0.05, -0.35),
+    vol=(0.13, 0.18, 0.30),
+    initial=(1.0, 0.0, 0.0),
+)
+
+REGIME_LABELS = {'bull': '強気相場', 'bear': '弱気相場', 'crash': '暴落'}
+
+
+def sample_regime_paths(model, rng, n_paths, n_months):
+    """局面の経路と月次リターンを返す（どちらも形状は (n_paths, n_months)）"""
+    cumulative = np.cumsum(model.transition_matrix(), axis=1)
+    cumulative[:, -1] = 1.0
+    monthly_mean = np.asarray(model.mean, dtype=float) / 12
+    monthly_vol = np.asarray(model.vol, dtype=float) / np.sqrt(12)
+
+    # 月方向に連続したメモリで1か月ずつ進める（(月数, 経路数) で作って最後に転置）
+    states = np.empty((n_months, n_paths), dtype=np.int8)
+    initial = np.cumsum(model.initial_distribution())
+    state = np.minimum(np.searchsorted(initial, rng.random(n_paths), side='right'), len(initial) - 1)
+    uniforms = rng.random((n_months, n_paths))
+    thresholds = cumulative[:, :-1].T
+    for month in range(n_months):
+        if month:
+            # 現在の局面の行の累積確率を一様乱数が何個超えたかが次の局面
+            u = uniforms[month]
+            state = sum((u >= threshold[state]).astype(np.int8) for threshold in thresholds)
+        states[month] = state
+    states = np.ascontiguousarray(states.T)
+    returns = monthly_mean[states] + monthly_vol[states] * rng.standard_normal((n_paths, n_months))
+    return states, returns
+
+
+def _regime_sample(model, rng, shape):
+    return sample_regime_paths(model, rng, *shape)[1]
+
+
+def regime_returns(model=DEFAULT_REGIMES):
+    """レジームスイッチング・モデルによるサンプラー（simulate_market_paths 用）"""
+    return functools.partial(_regime_sample, model)
+
+
+def crash_statistics(returns, states=None, crash_state=None):
+    """経路ごとの暴落の時期・深さ・回復期間
+
+    timing:   最初に暴落局面に入った月（0始まり、入らなければ -1。states が必要）
+    depth:    最大下落率（%、高値からの指数の下落）
+    trough:   最大下落の底の月（経路の開始時点を0とした指数の位置）
+    recovery: 底から元の高値に戻るまでの月数（期間内に戻らなければ nan）
+    """
+    returns = np.asarray(returns, dtype=float)
+    n_paths = returns.shape[0]
+    levels = np.concatenate([np.ones((n_paths, 1)), np.cumprod(1 + returns, axis=1)], axis=1)
+    peaks = np.maximum.accumulate(levels, axis=1)
+    drawdowns = levels / peaks - 1
+    trough = np.argmin(drawdowns, axis=1)
+    rows = np.arange(n_paths)
+    depth = drawdowns[rows, trough] * 100
+
+    after_trough = np.arange(levels.shape[1]) >= trough[:, np.newaxis]
+    recovered = after_trough & (levels >= peaks[rows, trough][:, np.newaxis])
+    first = np.argmax(recovered, axis=1)
+    recovery = np.where(recovered.any(axis=1), first - trough, np.nan)
+
+    timing = np.full(n_paths, -1)
+    if states is not None and crash_state is not None:
+        in_crash = np.asarray(states) == crash_state
+        timing = np.where(in_crash.any(axis=1), np.argmax(in_crash, axis=1), -1)
+    return {'timing': timing, 'depth': depth, 'trough': trough, 'recovery': recovery}
+
+
+def _crash_block(task):
+    model, size, seed, n_months = task
+    states, returns = sample_regime_paths(model, np.random.default_rng(seed), size, n_months)
+    return crash_statistics(returns, states, model.states.index('crash') if 'crash' in model.states else None)
+
+
+def simulate_crash_statistics(n_paths, n_months=480, model=DEFAULT_REGIMES, seed=None,
+                              chunk_size=16384, workers=1):
+    """n_paths 本の経路について crash_statistics() を計算して連結する
+
+    chunk_size 本ずつ独立した乱数系列で生成するので、workers を変えても結果は同じ。
+    """
+    n_chunks = -(-int(n_paths) // chunk_size)
+    tasks = [(model, min(chunk_size, int(n_paths) - i * chunk_size), chunk_seed, n_months)
+             for i, chunk_seed in enumerate(block_seeds(seed, n_chunks))]
+    parts = list(ordered_map(_crash_block, tasks, workers))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
@@ -0,0 +1,317 @@
+# simcore/retention.py
+# 社員ごとの在籍記録（勤続年数・退職したかどうか）からの残存率（生存時間）の推定
+#
+# gradeUpSim.py の残存率はキャリアパスの数値（UPPER_PATH.retention など）を手で書いたもので、
+# 実際の退職データから推定する手段がなかった。ここでは在籍記録のファイルを読み込んで
+#   カプラン・マイヤー推定（Greenwood の分散による信頼帯つき）
+#   ワイブル分布の最尤推定
+#   区分ごとに一定のハザード（区分指数モデル）
+# を当てはめる。在籍中の社員は「その勤続年数までは辞めていない」打ち切りデータとして扱う。
+# どの推定も並べ替え・bincount・累積和だけで計算するので、数十万件でも1秒前後で終わる。
+# 推定した曲線は annual_attrition() で勤続年数ごとの離職率にし、cohort_model_from_survival() で
+# simcore.cohort の CohortModel の離職率として使える。
+
+import os
+from dataclasses import dataclass, replace
+from statistics import NormalDist
+
+import numpy as np
+
+from .cohort import DEFAULT_COHORT_MODEL
+from .io import pick_column, read_table
+
+# 既定の在籍記録ファイル（環境変数 SIMCORE_TENURE_RECORDS で変更できる）
+DEFAULT_TENURE_RECORDS = os.environ.get('SIMCORE_TENURE_RECORDS', os.path.join('data', 'tenure_records.csv'))
+
+# 列名の候補（大文字小文字は区別しない）
+TENURE_COLUMNS = ('tenure', 'years', 'duration', '勤続年数')
+EVENT_COLUMNS = ('event', 'exit', 'left', 'status', '退職')
+TIER_COLUMNS = ('tier', 'group', '層', 'グループ')
+
+# 退職とみなす値（それ以外は在籍中＝打ち切り）
+EXIT_VALUES = {'1', '1.0', 'true', 'yes', 'y', 'exit', 'left', '退職'}
+
+# 区分指数モデルの既定の区切り（勤続年数）
+DEFAULT_HAZARD_BREAKS = (0, 1, 2, 3, 4, 5, 7, 10, 15, 20, 30)
+
+
+@dataclass(frozen=True)
+class TenureRecords:
+    """在籍記録（勤続年数、退職したか、層）"""
+    tenure: np.ndarray
+    event: np.ndarray
+    tier: np.ndarray = None
+    source: str = ''
+
+    def __len__(self):
+        return self.tenure.shape[0]
+
+    def subset(self, tier):
+        """層 tier の記録だけ"""
+        if self.tier is None:
+            raise ValueError('層の列がない記録では層を指定できません')
+        mask = self.tier == tier
+        return replace(self, tenure=self.tenure[mask], event=self.event[mask], tier=self.tier[mask])
+
+
+def load_tenure_records(path=DEFAULT_TENURE_RECORDS, tenure_column=None, event_column=None, tier_column=None):
+    """在籍記録の CSV / Parquet を読み込む
+
+    1行が社員1人で、勤続年数（年、小数可）と退職したかどうか（1 / 0、true / false、退職 / 在籍）の列、
+    あれば層（upper / standard / lower など）の列を持つ。列名は省略すると候補から探す。
+    """
+    header, columns = read_table(path)
+
+    def find(name, candidates, required=True):
+        index = list(header).index(name) if name is not None else pick_column(header, candidates)
+        if index is None and required:
+            raise ValueError(f'{path}: {candidates[0]} の列が見つかりません（列: {header}）')
+        return index
+
+    tenure = np.array([float(v) for v in columns[find(tenure_column, TENURE_COLUMNS)]])
+    event = np.array([str(v).strip().lower() in EXIT_VALUES for v in columns[find(event_column, EVENT_COLUMNS)]])
+    tier_index = find(tier_column, TIER_COLUMNS, required=False)
+    tier = np.array([str(v).strip() for v in columns[tier_index]]) if tier_index is not None else None
+    if np.any(tenure < 0):
+        raise ValueError(f'{path}: 勤続年数に負の値があります')
+    return TenureRecords(tenure, event, tier, path)
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _log_hazard_band(cumulative_hazard, log_se, z):
+    """累積ハザード H の対数に ±z × 標準誤差をとった生存率の帯（下限, 上限）"""
+    with np.errstate(over='ignore', invalid='ignore'):
+        lower = np.exp(-cumulative_hazard * np.exp(z * log_se))
+        upper = np.exp(-cumulative_hazard * np.exp(-z * log_se))
+    return np.where(cumulative_hazard > 0, lower, 1.0), np.where(cumulative_hazard > 0, upper, 1.0)
+
+
+class SurvivalCurve:
+    """残存率の曲線の共通部分（survival(t) を持つクラスに継承させる）"""
+
+    def annual_attrition(self, horizon=40):
+        """勤続1〜horizon 年目の1年ごとの離職率（simcore.cohort の離職率と同じ並び）
+
+        k 年目の離職率は 1 - S(k) / S(k - 1)（S は勤続年数 t 年まで在籍している確率）。
+        """
+        survival = self.survival(np.arange(horizon + 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(survival[:-1] > 0, 1 - survival[1:] / survival[:-1], 1.0)
+        return np.clip(rates, 0, 1)
+
+    def retention(self, years):
+        """キャリアパスと同じ数え方（1年目 = 100%）の残存率（%）"""
+        return 100 * self.survival(np.asarray(years, dtype=float) - 1)
+
+
+@dataclass
+class KaplanMeier(SurvivalCurve):
+    """カプラン・マイヤー推定（times の各時点の直後の残存率と信頼帯）"""
+    times: np.ndarray
+    survival_at: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    at_risk: np.ndarray
+    events: np.ndarray
+    confidence: float = 0.95
+
+    def _step(self, values, t, before=1.0):
+        index = np.searchsorted(self.times, t, side='right') - 1
+        return np.where(index >= 0, values[np.maximum(index, 0)], before)
+
+    def survival(self, t):
+        """勤続 t 年まで在籍している確率（右連続の階段関数）"""
+        return self._step(self.survival_at, t)
+
+    def confidence_band(self, t):
+        """t での信頼帯（下限, 上限）"""
+        return self._step(self.lower, t), self._step(self.upper, t)
+
+    def annual_attrition(self, horizon=40):
+        """1年ごとの離職率（観測された最長の勤続年数より先は、最後の1年の率を使う）"""
+        rates = super().annual_attrition(horizon)
+        observed = int(np.floor(self.times[-1])) if self.times.size else 0
+        if 1 <= observed < horizon:
+            rates[observed:] = rates[observed - 1]
+        return rates
+
+
+def kaplan_meier(tenure, event, confidence=0.95):
+    """カプラン・マイヤー推定量と Greenwood の分散による log(-log) 変換の信頼帯"""
+    tenure = np.asarray(tenure, dtype=float)
+    event = np.asarray(event, dtype=bool)
+    times, inverse = np.unique(tenure, return_inverse=True)
+    exits = np.bincount(inverse, weights=event, minlength=times.size)
+    counts = np.bincount(inverse, minlength=times.size)
+    at_risk = counts[::-1].cumsum()[::-1]
+    survival = np.cumprod(1 - exits / at_risk)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greenwood = np.cumsum(np.where(at_risk > exits, exits / (at_risk * (at_risk - exits)), np.inf))
+        log_se = np.sqrt(greenwood) / np.abs(np.log(survival))
+    lower, upper = _log_hazard_band(-np.log(np.maximum(survival, np.finfo(float).tiny)),
+                                    np.nan_to_num(log_se, nan=0.0, posinf=np.inf), _z(confidence))
+    lower = np.where(survival > 0, lower, 0.0)
+    upper = np.where(survival > 0, upper, 0.0)
+    return KaplanMeier(times, survival, lower, upper, at_risk, exits.astype(np.int64), confidence)
+
+
+@dataclass
+class WeibullFit(SurvivalCurve):
+    """ワイブル分布 S(t) = exp(-(t / scale) ** shape) の最尤推定
+
+    covariance は (log scale, log shape) の共分散行列（観測情報量の逆行列）。
+    shape < 1 なら勤続が長いほど辞めにくく、> 1 なら辞めやすくなる。
+    """
+    scale: float
+    shape: float
+    covariance: np.ndarray
+    log_likelihood: float
+    n_records: int
+    n_events: int
+
+    def cumulative_hazard(self, t):
+        return (np.maximum(np.asarray(t, dtype=float), 0) / self.scale) ** self.shape
+
+    def survival(self, t):
+        return np.exp(-self.cumulative_hazard(t))
+
+    def hazard(self, t):
+        """瞬間の離職率（1年あたり）"""
+        t = np.maximum(np.asarray(t, dtype=float), np.finfo(float).tiny)
+        return self.shape / self.scale * (t / self.scale) ** (self.shape - 1)
+
+    def confidence_band(self, t, confidence=0.95):
+        """t での信頼帯（下限, 上限）：log H(t) = shape (log t - log scale) のデルタ法"""
+        t = np.maximum(np.asarray(t, dtype=float), np.finfo(float).tiny)
+        z = self.shape * (np.log(t) - np.log(self.scale))
+        gradient = np.stack([np.full_like(z, -self.shape), z], axis=-1)
+        log_se = np.sqrt(np.einsum('...i,ij,...j->...', gradient, self.covariance, gradient))
+        return _log_hazard_band(self.cumulative_hazard(t), log_se, _z(confidence))
+
+
+def fit_weibull(tenure, event, bracket=(1e-3, 1e2), tolerance=1e-10, max_iter=200):
+    """打ち切りのあるデータにワイブル分布を最尤推定で当てはめる
+
+    shape を決めると scale の最尤解は閉じた式になるので、shape についての
+    スコア方程式（shape の単調関数）を対数スケールの二分法で解く。勤続0年の記録は微小な値に置き換える。
+    """
+    t = np.maximum(np.asarray(tenure, dtype=float), 1e-6)
+    event = np.asarray(event, dtype=bool)
+    n_events = int(event.sum())
+    if n_events == 0:
+        raise ValueError('退職の記録がないとワイブル分布は推定できません')
+    log_t = np.log(t)
+    shift = log_t.max()
+    mean_log_exit = log_t[event].mean()
+
+    def score(shape):
+        # t ** shape は桁あふれしないよう最大値で割ってから計算する
+        weights = np.exp(shape * (log_t - shift))
+        return (weights * log_t).sum() / weights.sum() - 1 / shape - mean_log_exit
+
+    low, high = np.log(bracket[0]), np.log(bracket[1])
+    for _ in range(max_iter):
+        middle = (low + high) / 2
+        if score(np.exp(middle)) > 0:
+            high = middle
+        else:
+            low = middle
+        if high - low < tolerance:
+            break
+    shape = float(np.exp((low + high) / 2))
+    log_scale = shift + np.log(np.exp(shape * (log_t - shift)).sum() / n_events) / shape
+
+    # (log scale, log shape) についての対数尤度のヘッセ行列
+    u = log_t - log_scale
+    zs = shape * u
+    w = np.exp(zs)
+    sum_w = w.sum()
+    hessian = np.array([
+        [-shape ** 2 * sum_w, shape * (sum_w - n_events) + shape * (w * zs).sum()],
+        [0.0, shape * u[event].sum() - (w * zs * (1 + zs)).sum()],
+    ])
+    hessian[1, 0] = hessian[0, 1]
+    log_likelihood = (n_events * np.log(shape) + (shape - 1) * log_t[event].sum()
+                      - n_events * shape * log_scale - sum_w)
+    return WeibullFit(float(np.exp(log_scale)), shape, np.linalg.inv(-hessian), float(log_likelihood),
+                      t.size, n_events)
+
+
+@dataclass
+class PiecewiseExponential(SurvivalCurve):
+    """区分ごとに一定のハザード（breaks[j] 〜 breaks[j + 1] 年の年率 rates[j]、最後の区分は無限大まで）"""
+    breaks: np.ndarray
+    rates: np.ndarray
+    exposure: np.ndarray
+    events: np.ndarray
+
+    def _widths(self, t):
+        """t までに各区分で過ごした年数（形状は t の形状 + (区分数,)）"""
+        t = np.asarray(t, dtype=float)[..., np.newaxis]
+        upper = np.append(self.breaks[1:], np.inf)
+        return np.clip(np.minimum(t, upper) - self.breaks, 0, None)
+
+    def cumulative_hazard(self, t):
+        return self._widths(t) @ self.rates
+
+    def survival(self, t):
+        return np.exp(-self.cumulative_hazard(t))
+
+    def confidence_band(self, t, confidence=0.95):
+        """t での信頼帯（下限, 上限）：区分ごとの率の分散 events / exposure² から log H(t) の標準誤差を求める"""
+        widths = self._widths(t)
+        cumulative = widths @ self.rates
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.square(widths) @ np.where(self.exposure > 0, self.events / np.square(self.exposure), 0)
+            log_se = np.sqrt(variance) / cumulative
+        return _log_hazard_band(cumulative, np.nan_to_num(log_se, nan=0.0), _z(confidence))
+
+
+def fit_piecewise_exponential(tenure, event, breaks=DEFAULT_HAZARD_BREAKS):
+    """区分指数モデルの最尤推定（区分ごとの 退職数 / 延べ在籍年数）"""
+    tenure = np.asarray(tenure, dtype=float)
+    event = np.asarray(event, dtype=bool)
+    breaks = np.asarray(breaks, dtype=float)
+    upper = np.append(breaks[1:], np.inf)
+    exposure = np.zeros(breaks.size)
+    # 区分ごとの延べ在籍年数（記録 × 区分の作業配列を作らないよう区分ごとに足す）
+    for j in range(breaks.size):
+        exposure[j] = np.clip(np.minimum(tenure, upper[j]) - breaks[j], 0, None).sum()
+    interval = np.searchsorted(breaks, tenure[event], side='right') - 1
+    events = np.bincount(np.maximum(interval, 0), minlength=breaks.size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(exposure > 0, events / exposure, 0.0)
+    return PiecewiseExponential(breaks, rates, exposure, events.astype(np.int64))
+
+
+SURVIVAL_MODELS = {'kaplan-meier': kaplan_meier, 'weibull': fit_weibull, 'piecewise': fit_piecewise_exponential}
+
+
+def fit_by_tier(records, method='kaplan-meier', tiers=None, **kwargs):
+    """層ごとに残存率を推定する {層: 曲線}（tiers を省略すると記録にある全ての層）"""
+    fit = method if callable(method) else SURVIVAL_MODELS[method]
+    if records.tier is None:
+        raise ValueError('層の列がない記録です（全体の推定は fit 関数を直接使ってください）')
+    curves = {}
+    for tier in tiers or sorted(set(records.tier.tolist())):
+        subset = records.subset(tier)
+        curves[tier] = fit(subset.tenure, subset.event, **kwargs)
+    return curves
+
+
+def cohort_model_from_survival(curves, model=DEFAULT_COHORT_MODEL):
+    """推定した残存率の曲線を離職率にした CohortModel（昇進確率などは model のまま）
+
+    curves は {層: 曲線}（書かれていない層は model の離職率のまま）または全層共通の1つの曲線。
+    """
+    attrition = model.attrition_matrix()
+    horizon = attrition.shape[1]
+    for i, tier in enumerate(model.tiers):
+        curve = curves.get(tier) if isinstance(curves, dict) else curves
+        if curve is not None:
+            attrition[i] = curve.annual_attrition(horizon)
+    return replace(model, attrition=tuple(map(tuple, np.clip(attrition, 0, 1))))
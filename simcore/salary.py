@@ -0,0 +1,178 @@
+# simcore/salary.py
+# グレード体系と年収カーブ（キャリアパス）の定義
+#
+# gradeUpSim.py・rg_grapg.py・capitalSimulation.py・create_diagram.py に
+# それぞれ書かれていた年収データをここに集約した。
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# グレードと想定年収（万円）
+GRADES = ['B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3', 'D2', 'D1']
+GRADE_SALARIES = [340, 390, 430, 480, 520, 590, 700, 800, 900, 980, 1100, 1300]
+GRADE_SALARY = dict(zip(GRADES, GRADE_SALARIES))
+
+
+@dataclass(frozen=True)
+class CareerPath:
+    """パフォーマンスグループ別のキャリアパス（勤続年数ごとのグレード・年収・残存率）"""
+    name: str
+    years: tuple
+    salary: tuple
+    grade: tuple
+    retention: tuple
+
+
+# 上位予想（上位10%）
+UPPER_PATH = CareerPath(
+    name='上位10%',
+    years=(1, 2, 3, 4, 5, 7, 9, 11, 13, 16),
+    salary=(340, 390, 430, 480, 520, 590, 700, 800, 900, 980),
+    grade=('B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3'),
+    retention=(100, 92, 85, 80, 75, 68, 60, 55, 50, 45),
+)
+
+# 標準予想（中央50%）
+STANDARD_PATH = CareerPath(
+    name='標準50%',
+    years=(1, 2, 3, 4, 6, 8, 11, 14, 17),
+    salary=(340, 340, 390, 430, 480, 520, 590, 700, 800),
+    grade=('B2', 'B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2'),
+    retention=(100, 95, 90, 85, 75, 65, 55, 45, 40),
+)
+
+# 下位予想（下位25%）
+LOWER_PATH = CareerPath(
+    name='下位25%',
+    years=(1, 3, 5, 7, 10, 13, 16),
+    salary=(340, 340, 390, 430, 480, 520, 590),
+    grade=('B2', 'B2', 'B1', 'P4', 'P3', 'P2', 'P1'),
+    retention=(100, 90, 80, 70, 55, 45, 35),
+)
+
+CAREER_PATHS = {'upper': UPPER_PATH, 'standard': STANDARD_PATH, 'lower': LOWER_PATH}
+
+# 資産シミュレーション用の標準グループ年収（標準パスに20年目のM1を加えたもの）
+STANDARD_SALARY_YEARS = [1, 2, 3, 4, 6, 8, 11, 14, 17, 20]
+STANDARD_SALARY = [340, 340, 390, 430, 480, 520, 590, 700, 800, 900]
+
+# 年齢別の年収カーブ（セミナー資料用、万円）
+AGE_SALARY_CURVES = {
+    'age':       [22, 25, 28, 33, 38, 46, 65],
+    'std_salary': [344, 402, 506, 686, 850, 1144, 1144],
+    'high_salary':[344, 441, 605, 850, 1079, 1144, 1144],
+    'low_salary': [344, 362, 417, 522, 686, 1144, 1144]
+}
+
+
+@dataclass(frozen=True)
+class GradeLadder:
+    """勤続年数（入社年を0年目とする）からグレードを引く昇格テーブル
+
+    breakpoints[i] 年目から grades[i + 1] に上がる（breakpoints は昇順）。
+    salaries を省略するとグレードの想定年収（GRADE_SALARY）を使う。
+    """
+    name: str
+    breakpoints: tuple
+    grades: tuple
+    salaries: tuple = None
+
+    def grade_salaries(self):
+        return self.salaries if self.salaries is not None else tuple(GRADE_SALARY[grade] for grade in self.grades)
+
+    def lookup(self, tenure):
+        """勤続年数（スカラーまたは配列）に対するグレード名と年収（万円）の配列"""
+        step = np.searchsorted(self.breakpoints, tenure, side='right')
+        return np.asarray(self.grades)[step], np.asarray(self.grade_salaries())[step]
+
+
+# キャリアパス別の昇格テーブル（新しいパスは1行追加するだけ）
+GRADE_LADDERS = {
+    # 11年目でD2想定の早期昇進モデル（rg_grapg.py）
+    'early': GradeLadder('早期昇進', (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 15),
+                         ('B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3', 'D2', 'D1')),
+    # セミナー資料の上位20%・標準・保守的パス（visualization_part1.create_fig8）
+    'top': GradeLadder('上位20%パス', (3, 5, 7, 10, 13, 17, 22, 27, 32),
+                       ('B2', 'B1', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1', 'D3', 'D2')),
+    'standard': GradeLadder('標準パス', (3, 6, 9, 13, 17, 22, 28, 35),
+                            ('B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1')),
+    'conservative': GradeLadder('保守的パス', (4, 8, 13, 18, 25, 35),
+                                ('B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3')),
+    # 標準パスで初年度を年齢別年収カーブの22歳（344万円）にしたもの（visualization_part3.create_fig16）
+    'seminar': GradeLadder('標準パス（セミナー）', (3, 6, 9, 13, 17, 22, 28, 35),
+                           ('B2', 'B1', 'P4', 'P3', 'P2', 'P1', 'M3', 'M2', 'M1'),
+                           (344, 390, 430, 480, 520, 590, 700, 800, 900)),
+}
+
+# 勤続年数の上限（これ以上は同じグレードとして扱う）
+MAX_TENURE = 1000
+
+
+class GradeLadderTable:
+    """複数の昇格テーブルをまとめて引く（(パス, 勤続年数) の組を1回の searchsorted で処理する）
+
+    各パスの breakpoints をパス番号 × 2 × MAX_TENURE ずらして1本の昇順配列につなげ、
+    勤続年数も同じだけずらして探す。
+    """
+
+    def __init__(self, ladders=GRADE_LADDERS):
+        self.names = list(ladders)
+        ladders = list(ladders.values())
+        width = max(len(ladder.grades) for ladder in ladders)
+        self.offset = 2 * MAX_TENURE
+        breakpoints = np.full((len(ladders), width - 1), MAX_TENURE, dtype=float)
+        self.grade_index = np.zeros((len(ladders), width), dtype=np.int8)
+        self.salary = np.zeros((len(ladders), width))
+        for row, ladder in enumerate(ladders):
+            steps = len(ladder.grades)
+            breakpoints[row, :steps - 1] = ladder.breakpoints
+            # 最後のグレードより先は最後のグレードのまま
+            padded_grades = list(ladder.grades) + [ladder.grades[-1]] * (width - steps)
+            padded_salaries = list(ladder.grade_salaries()) + [ladder.grade_salaries()[-1]] * (width - steps)
+            self.grade_index[row] = [GRADES.index(grade) for grade in padded_grades]
+            self.salary[row] = padded_salaries
+        self.width = width
+        self._flat = (breakpoints + self.offset * np.arange(len(ladders))[:, np.newaxis]).ravel()
+
+    def path_index(self, paths):
+        """パス名（または番号）の配列をパス番号の配列にする
+
+        登録されていないパス名は KeyError、範囲外の番号は ValueError（GRADE_LADDERS[name] と同じく黙って別のパスにしない）。
+        """
+        paths = np.asarray(paths)
+        if paths.dtype.kind in 'iu':
+            if np.any((paths < 0) | (paths >= len(self.names))):
+                raise ValueError(f'パス番号は 0〜{len(self.names) - 1} で指定してください')
+            return paths
+        known = np.isin(paths, self.names)
+        if not np.all(known):
+            raise KeyError(f'未登録のキャリアパスです: {sorted(set(np.asarray(paths)[~known].tolist()))}')
+        order = np.argsort(self.names)
+        return order[np.searchsorted(np.asarray(self.names)[order], paths)]
+
+    def lookup(self, paths, tenure):
+        """(パス, 勤続年数) の組ごとのグレード番号（GRADES の位置）と年収（万円）
+
+        paths はパス名またはパス番号（self.names の位置）で、tenure とブロードキャストできる形。
+        """
+        rows = self.path_index(paths)
+        tenure = np.clip(np.asarray(tenure, dtype=float), 0, MAX_TENURE - 1)
+        rows, tenure = np.broadcast_arrays(rows, tenure)
+        position = np.searchsorted(self._flat, tenure + self.offset * rows, side='right')
+        step = position - rows * (self.width - 1)
+        return self.grade_index[rows, step], self.salary[rows, step]
+
+
+def grade_ladder_salaries(name, tenure):
+    """昇格テーブル name の勤続年数ごとの年収（万円）"""
+    return GRADE_LADDERS[name].lookup(tenure)[1]
+
+
+# 勤続年数とグレードのマッピング（11年目でD2想定の早期昇進モデル）
+def get_grade_and_salary(years_of_service):
+    """勤続 years_of_service 年目（1始まり）のグレードと年収（配列も可）"""
+    grades, salaries = GRADE_LADDERS['early'].lookup(np.asarray(years_of_service) - 1)
+    if np.ndim(grades) == 0:
+        return str(grades), int(salaries)
+    return grades, salaries
@@ -0,0 +1,110 @@
+# simcore/scenarios.py
+# ライフイベント込み資産シミュレーションの前提条件とシナリオ型
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .life_events import event_cost_schedule, living_cost_schedule, simulate_life_events_batch
+from .monte_carlo import simulate_market_paths
+from .salary import STANDARD_SALARY, STANDARD_SALARY_YEARS
+
+# ライフイベントの定義（入社年齢23歳想定）
+life_events = {
+    3: {'name': '一人暮らし開始', 'cost': 50, 'type': 'single'},  # 引越し・家具等
+    5: {'name': '車購入', 'cost': 200, 'type': 'single'},
+    7: {'name': '結婚', 'cost': 300, 'type': 'single'},
+    8: {'name': '新婚旅行', 'cost': 80, 'type': 'single'},
+    10: {'name': '住宅購入頭金', 'cost': 500, 'type': 'single'},
+    12: {'name': '第一子出産', 'cost': 50, 'type': 'single'},
+    15: {'name': '第二子出産', 'cost': 50, 'type': 'single'},
+    18: {'name': '車買い替え', 'cost': 250, 'type': 'single'},
+}
+
+# 継続的な支出の追加（年額）
+recurring_costs = {
+    10: {'name': '住宅ローン', 'annual_cost': 120},  # 月10万円
+    12: {'name': '子育て費用', 'annual_cost': 60},   # 月5万円
+    15: {'name': '子育て費用増', 'annual_cost': 120}, # 月10万円（2人分）
+}
+
+# 基本パラメータ
+# START_AGE は入社年齢（手取りの介護保険料の年齢判定に使う、ライフイベントの定義と同じ23歳）
+START_AGE = 23
+# TAX_RATE は None なら simcore.payroll で社会保険料・所得税・住民税を計算した手取りを使う
+# （以前の一律の控除率に戻すときは 0.20 などの数値にする）
+TAX_RATE = None
+INVESTMENT_RETURN = 0.05
+SAVINGS_RATE = 0.0001
+
+
+@dataclass(frozen=True)
+class LifeEventScenario:
+    """ライフイベント込みシミュレーションの1シナリオ"""
+    salary_years: tuple = tuple(STANDARD_SALARY_YEARS)
+    salary_amounts: tuple = tuple(STANDARD_SALARY)
+    max_years: int = 20
+    include_events: bool = True
+    savings_rate_base: float = 0.25
+    tax_rate: float = TAX_RATE
+    investment_return: float = INVESTMENT_RETURN
+    savings_rate: float = SAVINGS_RATE
+    start_age: int = START_AGE
+    life_events: dict = field(default_factory=lambda: life_events)
+    recurring_costs: dict = field(default_factory=lambda: recurring_costs)
+
+    @property
+    def years(self):
+        return np.arange(1, self.max_years + 1)
+
+    def salaries(self):
+        """各年の年収（万円、カーブの間は線形補間）"""
+        return np.interp(self.years, self.salary_years, self.salary_amounts)
+
+    def living_costs(self):
+        return living_cost_schedule(self.years, self.recurring_costs)
+
+    def event_costs(self):
+        return event_cost_schedule(self.years, self.life_events) if self.include_events else np.zeros(self.max_years)
+
+    def simulate(self):
+        """1シナリオ分の結果（LIFE_EVENT_DTYPE の構造化配列、形状は (年数,)）"""
+        return simulate_life_events_batch(self.salaries(), self.living_costs(), self.event_costs(),
+                                          self.savings_rate_base, tax_rate=self.tax_rate,
+                                          investment_return=self.investment_return,
+                                          savings_rate=self.savings_rate, start_age=self.start_age)[0]
+
+    def simulate_monte_carlo(self, n_paths, sampler='normal', vol=0.15, targets=(500, 1000),
+                             seed=None, **options):
+        """積立額は決定論的な計算と同じまま、運用リターンだけを確率的にした場合の分布
+
+        平均リターンは investment_return。options は simulate_market_paths にそのまま渡す
+        （chunk_size, workers, shocks, control_variate, ci_width など）。
+        戻り値は MonteCarloResult（投資残高、万円）。
+        """
+        monthly = np.repeat(self.simulate()['monthly_savings'], 12)
+        return simulate_market_paths(monthly, n_paths, sampler, self.investment_return, vol,
+                                     targets, seed, **options)
+
+
+def simulate_with_life_events(salary_years, salary_amounts, max_years=20,
+                              include_events=True, savings_rate_base=0.25,
+                              n_paths=None, sampler='normal', return_vol=0.15, seed=None):
+    """ライフイベント込みの資産シミュレーション（capitalSimulation.py の従来の戻り値形式）
+
+    n_paths を指定するとモンテカルロ版も計算し、'monte_carlo' に MonteCarloResult を入れる。
+    """
+    scenario = LifeEventScenario(tuple(salary_years), tuple(salary_amounts), max_years,
+                                 include_events, savings_rate_base)
+    result = scenario.simulate()
+    summary = {
+        'years': scenario.years,
+        'investment': result['investment'].tolist(),
+        'savings': result['savings'].tolist(),
+        'available_cash': result['available_cash'].tolist(),
+        'events_cost': result['events_cost'].tolist(),
+        'monthly_savings': result['monthly_savings'].tolist()
+    }
+    if n_paths is not None:
+        summary['monte_carlo'] = scenario.simulate_monte_carlo(n_paths, sampler, return_vol, seed=seed)
+    return summary
@@ -0,0 +1,106 @@
+# simcore/sensitivity.py
+# 多次元の感度分析エンジン
+#
+# リターン・月額・開始年齢・投資期間・信託報酬・インフレ率・税率の
+# 全組み合わせ（パラメータキューブ）について最終資産額を一度に計算する。
+# セル数が多い場合はメモリ上限に収まるように自動で分割して計算する。
+
+import numpy as np
+
+from .annuity import annuity_factor
+
+# キューブの軸（この順番で並ぶ）
+SENSITIVITY_AXES = ('annual_return', 'monthly', 'start_age', 'horizon', 'fee', 'inflation', 'tax_rate')
+
+# 指定しなかった軸の既定値（図19と同じ：22歳から65歳まで月5万円、年率5%）
+SENSITIVITY_DEFAULTS = {
+    'annual_return': 0.05,
+    'monthly': 50000,
+    'start_age': 22,
+    'horizon': np.inf,
+    'fee': 0.0,
+    'inflation': 0.0,
+    'tax_rate': 0.0,
+}
+
+# 1セルあたりの作業メモリの見積もり（インデックス・パラメータ・中間配列の合計）
+_BYTES_PER_CELL = 160
+
+
+def final_assets(annual_return, monthly, start_age, horizon, fee, inflation, tax_rate, end_age=65):
+    """最終資産額（円）を計算する
+
+    毎年末に月額×12を積み立て、年率リターンから信託報酬を差し引いて複利運用する。
+    投資年数は min(horizon, end_age - start_age)。
+    売却時に運用益へ課税し、インフレ率で投資開始時点の実質価値に割り引く。
+    """
+    years = np.clip(np.minimum(horizon, end_age - np.asarray(start_age, dtype=float)), 0, None)
+    net_return = (1 + np.asarray(annual_return, dtype=float)) * (1 - np.asarray(fee, dtype=float)) - 1
+    annual_amount = np.asarray(monthly, dtype=float) * 12
+    nominal = annual_amount * annuity_factor(net_return, years)
+    gain = np.maximum(nominal - annual_amount * years, 0)
+    after_tax = nominal - np.asarray(tax_rate, dtype=float) * gain
+    return after_tax / np.power(1 + np.asarray(inflation, dtype=float), years)
+
+
+class SensitivityCube:
+    """感度分析の結果（軸の値と最終資産額の配列）"""
+
+    def __init__(self, axes, values):
+        self.axes = axes
+        self.values = values
+
+    def index(self, name, value):
+        """軸 name で value に最も近いグリッドのインデックス"""
+        return int(np.argmin(np.abs(self.axes[name] - value)))
+
+    def plane(self, row, col, **at):
+        """2つの軸で切り出した2次元の平面（行: row, 列: col）を返す
+
+        それ以外の軸は at で値を指定する（最も近いグリッド点を使う、省略時は先頭）。
+        """
+        selector = []
+        for name in SENSITIVITY_AXES:
+            if name in (row, col):
+                selector.append(slice(None))
+            elif name in at:
+                selector.append(self.index(name, at[name]))
+            else:
+                selector.append(0)
+        plane = self.values[tuple(selector)]
+        if SENSITIVITY_AXES.index(row) > SENSITIVITY_AXES.index(col):
+            plane = plane.T
+        return plane
+
+    def lookup(self, **params):
+        """指定したパラメータに最も近いグリッド点の最終資産額"""
+        selector = tuple(self.index(name, params[name]) if name in params else 0
+                         for name in SENSITIVITY_AXES)
+        return self.values[selector]
+
+
+def evaluate_cube(end_age=65, memory_budget=64 * 2**20, **axes):
+    """パラメータキューブ全体の最終資産額を計算する
+
+    axes には SENSITIVITY_AXES の名前で値（スカラーまたは1次元配列）を渡す。
+    省略した軸は SENSITIVITY_DEFAULTS の値（長さ1の軸）になる。
+    作業メモリが memory_budget バイトを超えないようにセルを分割して計算する。
+    """
+    unknown = set(axes) - set(SENSITIVITY_AXES)
+    if unknown:
+        raise ValueError(f'未知のパラメータ: {sorted(unknown)}')
+
+    grid = {name: np.atleast_1d(np.asarray(axes.get(name, SENSITIVITY_DEFAULTS[name]), dtype=float))
+            for name in SENSITIVITY_AXES}
+    shape = tuple(len(grid[name]) for name in SENSITIVITY_AXES)
+    values = np.empty(shape)
+    flat = values.reshape(-1)
+
+    chunk = max(1, memory_budget // _BYTES_PER_CELL)
+    for start in range(0, flat.size, chunk):
+        stop = min(start + chunk, flat.size)
+        index = np.unravel_index(np.arange(start, stop), shape)
+        params = {name: grid[name][i] for name, i in zip(SENSITIVITY_AXES, index)}
+        flat[start:stop] = final_assets(end_age=end_age, **params)
+
+    return SensitivityCube(grid, values)
@@ -0,0 +1,130 @@
+# simcore/sketch.py
+# 時点ごとの分位点・統計量のストリーミング集計
+#
+# モンテカルロの資産推移は（経路数 × 時点数）の行列を持たずに、チャンクごとに
+# 流し込んで分位点（パーセンタイル帯）と平均・分散・最小・最大を求める。
+# 分位点は DDSketch 方式の対数バケット：値 x をバケット ceil(log_γ x) に数えるだけなので、
+# 別ワーカーのスケッチはバケットの足し算で統合でき、統合の順番によらず結果が同じになる。
+# 推定値の相対誤差は relative_accuracy 以内（既定0.5%）。
+# 1時点あたりのメモリは約 log(max_value / min_value) / relative_accuracy バケット分。
+
+import numpy as np
+
+
+class RunningMoments:
+    """時点ごとの件数・平均・分散・最小・最大（チャンク単位の更新と統合に対応）
+
+    分散はチャンクごとの偏差平方和を Chan らの式で統合するので、
+    大きな値どうしの引き算による桁落ちが起きない。
+    """
+
+    def __init__(self, n_steps):
+        self.count = 0
+        self.mean = np.zeros(n_steps)
+        self.m2 = np.zeros(n_steps)
+        self.min = np.full(n_steps, np.inf)
+        self.max = np.full(n_steps, -np.inf)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+    def add(self, values):
+        """(件数, 時点数) の値を加える"""
+        if values.shape[0] == 0:
+            return self
+        mean = values.mean(axis=0)
+        self._combine(values.shape[0], mean, np.square(values - mean).sum(axis=0))
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+            self.min = np.minimum(self.min, other.min)
+            self.max = np.maximum(self.max, other.max)
+        return self
+
+    def variance(self, ddof=0):
+        return self.m2 / max(self.count - ddof, 1)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.variance(ddof))
+
+
+class QuantileSketch:
+    """時点ごとの分位点スケッチ（相対誤差 relative_accuracy 以内）
+
+    絶対値が min_value 未満の値は0として数え、max_value を超える値は最上位のバケットに入れる。
+    推定値は常に実際の最小値・最大値の範囲に収める。
+    """
+
+    def __init__(self, n_steps, relative_accuracy=0.005, min_value=1e-2, max_value=1e9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self._offset = int(np.ceil(np.log(min_value) / self._log_gamma))
+        n_buckets = int(np.ceil(np.log(max_value) / self._log_gamma)) - self._offset + 1
+        self.positive = np.zeros((n_steps, n_buckets), dtype=np.int64)
+        self.negative = np.zeros((n_steps, n_buckets), dtype=np.int64)
+        self.zero = np.zeros(n_steps, dtype=np.int64)
+        self.moments = RunningMoments(n_steps)
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def _accumulate(self, counts, magnitudes, mask):
+        """mask の要素の絶対値 magnitudes を時点ごとのバケット件数 counts に加える"""
+        n_steps, n_buckets = counts.shape
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keys = np.ceil(np.log(magnitudes) / self._log_gamma)
+        keys = np.clip(np.where(mask, keys, self._offset), self._offset, self._offset + n_buckets - 1)
+        keys = keys.astype(np.int64) - self._offset + np.arange(n_steps) * n_buckets
+        counts += np.bincount(keys[mask], minlength=n_steps * n_buckets).reshape(n_steps, n_buckets)
+
+    def add(self, values):
+        """(件数, 時点数) の値を加える"""
+        values = np.asarray(values, dtype=float)
+        self.moments.add(values)
+        self.zero += np.count_nonzero(np.abs(values) < self.min_value, axis=0)
+        self._accumulate(self.positive, values, values >= self.min_value)
+        self._accumulate(self.negative, -values, values <= -self.min_value)
+        return self
+
+    def merge(self, other):
+        """同じ設定のスケッチを統合する"""
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zero += other.zero
+        self.moments.merge(other.moments)
+        return self
+
+    def _bucket_values(self):
+        """各バケットの代表値（相対誤差が最小になる点）"""
+        keys = np.arange(self.positive.shape[1]) + self._offset
+        return 2 * self.gamma ** keys / (self.gamma + 1)
+
+    def quantiles(self, q):
+        """時点ごとの分位点（q は0〜1、戻り値の形状は (len(q), 時点数)）"""
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        representative = self._bucket_values()
+        # 小さい順に 負のバケット（大きい絶対値から）→ 0 → 正のバケット
+        counts = np.concatenate([self.negative[:, ::-1], self.zero[:, np.newaxis], self.positive], axis=1)
+        values = np.concatenate([-representative[::-1], [0.0], representative])
+        cumulative = np.cumsum(counts, axis=1)
+        result = np.empty((len(q), counts.shape[0]))
+        for step in range(counts.shape[0]):
+            rank = q * (self.count - 1)
+            idx = np.searchsorted(cumulative[step], rank, side='right')
+            result[:, step] = values[np.minimum(idx, len(values) - 1)]
+        return np.clip(result, self.moments.min, self.moments.max)
+
+    def percentiles(self, q):
+        """quantiles() の百分率版（q は0〜100）"""
+        return self.quantiles(np.asarray(q, dtype=float) / 100)
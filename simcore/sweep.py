@@ -0,0 +1,94 @@
+# simcore/sweep.py
+# 採用人数・昇進率・離職率の組み合わせ（人事施策）をまとめて評価するスイープ
+#
+# 「毎年54人ではなく80人採用し、Mグレードへの昇進を2割絞ったら？」のような問いに、
+# gradeUpSim.py の定数を書き換えて全グラフを描き直す代わりに、格子上の全施策を
+# simcore.organization の推計で評価して1つの表（施策 × 年の1行ずつ）にまとめる。
+# 1施策の30年推計は数ミリ秒なので、施策をまとめてワーカープロセスに配れば数百通りでも数秒で終わる。
+
+import itertools
+
+import numpy as np
+
+from .calibration import apply_multipliers
+from .cohort import DEFAULT_COHORT_MODEL
+from .organization import CURRENT_ORGANIZATION, ORG_LEVELS, project_organization
+from .parallel import ordered_map
+from .salary import GRADES
+
+# 昇進率の倍率をかける既定の職位レベル（昇進先）
+DEFAULT_PROMOTION_LEVELS = ('Manager (M1-M3)',)
+MANAGER_LEVEL = 'Manager (M1-M3)'
+
+
+def policy_grid(hiring=(54, 80), promotion=(1.0,), attrition=(1.0,)):
+    """採用人数・昇進率の倍率・離職率の倍率の全組み合わせ（(hiring, promotion, attrition) のリスト）"""
+    return list(itertools.product(hiring, promotion, attrition))
+
+
+def _evaluate_policies(task):
+    """複数の施策をまとめて推計する（ワーカープロセスで実行）"""
+    policies, model, years, promotion_levels, initial = task
+    manager_columns = [GRADES.index(grade) for grade in ORG_LEVELS[MANAGER_LEVEL]]
+    rows = []
+    for hiring, promotion, attrition in policies:
+        multipliers = [promotion if level in promotion_levels else 1.0 for level in ORG_LEVELS]
+        policy_model = apply_multipliers(model, multipliers, [attrition] * len(model.tiers))
+        projection = project_organization(hiring, years, policy_model, initial)
+        grade_counts = projection.grade_counts()
+        headcount = grade_counts.sum(axis=1)
+        rows.append((grade_counts, headcount, projection.payroll(),
+                     grade_counts[:, manager_columns].sum(axis=1) / np.maximum(headcount, 1e-12)))
+    return rows
+
+
+def sweep_policies(policies, years=30, model=DEFAULT_COHORT_MODEL, promotion_levels=DEFAULT_PROMOTION_LEVELS,
+                   initial=CURRENT_ORGANIZATION, workers=1, batch_size=32):
+    """施策ごとの組織推計を1つの表にまとめる
+
+    policies は (毎年の採用人数, 昇進率の倍率, 離職率の倍率) の列（policy_grid() など）。
+    昇進率の倍率は promotion_levels（昇進先の職位レベル）への昇進にかけ、離職率の倍率は全層にかける。
+    戻り値は {列名: 配列} の表（施策 × 0〜years 年目の1行ずつ）。列は
+    policy, hiring, promotion, attrition, year, グレード名（人数）, headcount, payroll（人件費、万円）,
+    manager_ratio（Manager レベルの人数の割合）。pandas があれば sweep_table() で DataFrame にできる。
+    """
+    policies = [tuple(policy) for policy in policies]
+    if not policies:
+        raise ValueError('評価する施策がありません')
+    tasks = [(policies[start:start + batch_size], model, years, tuple(promotion_levels), initial)
+             for start in range(0, len(policies), batch_size)]
+    results = [row for rows in ordered_map(_evaluate_policies, tasks, workers) for row in rows]
+
+    n_years = years + 1
+    settings = np.repeat(np.asarray(policies, dtype=float), n_years, axis=0)
+    table = {
+        'policy': np.repeat(np.arange(len(policies)), n_years),
+        'hiring': settings[:, 0],
+        'promotion': settings[:, 1],
+        'attrition': settings[:, 2],
+        'year': np.tile(np.arange(n_years), len(policies)),
+    }
+    grade_counts = np.concatenate([result[0] for result in results])
+    for i, grade in enumerate(GRADES):
+        table[grade] = grade_counts[:, i]
+    for name, column in zip(('headcount', 'payroll', 'manager_ratio'), range(1, 4)):
+        table[name] = np.concatenate([result[column] for result in results])
+    return table
+
+
+def sweep_table(table):
+    """sweep_policies() の結果を pandas の DataFrame にする"""
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise ImportError('DataFrame への変換には pandas が必要です') from exc
+    return pd.DataFrame(table)
+
+
+def write_sweep_csv(table, path):
+    """sweep_policies() の結果を CSV に書き出す（pandas 不要）"""
+    columns = list(table)
+    data = np.column_stack([np.asarray(table[name], dtype=float) for name in columns])
+    integer = {'policy', 'year'}
+    formats = ['%d' if name in integer else '%.6g' for name in columns]
+    np.savetxt(path, data, fmt=formats, delimiter=',', header=','.join(columns), comments='', encoding='utf-8')
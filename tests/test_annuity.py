@@ -0,0 +1,64 @@
+# tests/test_annuity.py
+# 閉形式の積立計算が従来の「balance = balance * (1 + r/12) + monthly」のループと一致するか
+
+import numpy as np
+import pytest
+
+from simcore.annuity import annuity_factor, balance_path, future_value, yearly_contribution_path
+
+
+def loop_balance(monthly, annual_rate, months, initial=0.0):
+    balance = initial
+    history = []
+    for _ in range(months):
+        balance = balance * (1 + annual_rate / 12) + monthly
+        history.append(balance)
+    return np.array(history)
+
+
+@pytest.mark.parametrize('annual_rate', [0.0, 0.001, 0.03, 0.05, 0.1, -0.2])
+@pytest.mark.parametrize('months', [1, 12, 120, 480])
+def test_future_value_matches_loop(annual_rate, months):
+    expected = loop_balance(50000, annual_rate, months, initial=1_000_000)[-1]
+    assert future_value(50000, annual_rate, months, initial=1_000_000) == pytest.approx(expected, rel=1e-12)
+
+
+def test_future_value_broadcasts_over_all_arguments():
+    monthly = np.array([10000, 30000, 50000])[:, None, None]
+    rates = np.array([0.0, 0.03, 0.05, 0.07])[None, :, None]
+    months = np.array([12, 60, 120, 240, 360])[None, None, :]
+    values = future_value(monthly, rates, months)
+    assert values.shape == (3, 4, 5)
+    for i, m in enumerate(monthly.ravel()):
+        for j, r in enumerate(rates.ravel()):
+            for k, n in enumerate(months.ravel()):
+                assert values[i, j, k] == pytest.approx(loop_balance(m, r, n)[-1], rel=1e-12)
+
+
+def test_annuity_factor_known_values():
+    # r = 0 のときは期間数、1期なら1、(1.01^12 - 1) / 0.01
+    assert annuity_factor(0.0, 120) == 120
+    assert annuity_factor(0.05, 1) == pytest.approx(1.0)
+    assert annuity_factor(0.01, 12) == pytest.approx((1.01 ** 12 - 1) / 0.01, rel=1e-14)
+    # r が0に近くても桁落ちしない
+    assert annuity_factor(1e-12, 120) == pytest.approx(120, rel=1e-9)
+
+
+@pytest.mark.parametrize('step', [1, 12])
+def test_balance_path_matches_loop(step):
+    path = balance_path(30000, 0.05, 240, initial=500000, step=step)
+    expected = loop_balance(30000, 0.05, 240, initial=500000)[step - 1::step]
+    np.testing.assert_allclose(path, expected, rtol=1e-12)
+
+
+def test_yearly_contribution_path_matches_twelve_month_loop():
+    monthly_by_year = np.array([[20000, 25000, 30000, 0, 40000],
+                                [50000, 50000, 50000, 50000, 50000]], dtype=float)
+    result = yearly_contribution_path(monthly_by_year, 0.05, initial=100000)
+    for row, amounts in zip(result, monthly_by_year):
+        balance, expected = 100000.0, []
+        for monthly in amounts:
+            for _ in range(12):
+                balance = balance * (1 + 0.05 / 12) + monthly
+            expected.append(balance)
+        np.testing.assert_allclose(row, expected, rtol=1e-12)
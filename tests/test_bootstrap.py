@@ -0,0 +1,112 @@
+# tests/test_bootstrap.py
+# 過去リターンのブートストラップ: ファイルの読み込みと .npy キャッシュ、ブロックのインデックス、最大下落率
+
+import os
+
+import numpy as np
+import pytest
+
+from simcore import bootstrap
+from simcore.bootstrap import (bootstrap_returns, drawdown_statistics, load_index_returns, moving_block_indices,
+                               stationary_indices)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """変換結果を tmp_path に書かせ、プロセス内のキャッシュも空にする"""
+    directory = tmp_path / 'cache'
+    monkeypatch.setattr(bootstrap, 'CACHE_DIR', str(directory))
+    monkeypatch.setattr(bootstrap, '_loaded', {})
+    return directory
+
+
+def _write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_price_file_round_trips_through_npy_cache(tmp_path, cache_dir, monkeypatch):
+    path = _write(tmp_path / 'index.csv', 'Date,Close\n2020/01/31,100\n2020/02/29,110\n2020/03/31,99\n')
+    data = load_index_returns(path)
+    np.testing.assert_allclose(data.returns, [0.1, -0.1])
+    np.testing.assert_array_equal(data.months, np.array(['2020-02', '2020-03'], dtype='datetime64[M]'))
+    assert isinstance(data.returns, np.memmap)
+    # 元データのディレクトリには書かず、一時ファイルも残さない
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'index.csv']
+    assert all(name.endswith('.npy') for name in os.listdir(cache_dir))
+    assert load_index_returns(path) is data
+
+    # 別プロセス相当（プロセス内キャッシュなし）でも、解析し直さずに .npy から読む
+    monkeypatch.setattr(bootstrap, '_loaded', {})
+
+    def fail(*args, **kwargs):
+        raise AssertionError('キャッシュがあるのに元ファイルを解析した')
+
+    monkeypatch.setattr(bootstrap, '_parse_index_file', fail)
+    reloaded = load_index_returns(path)
+    np.testing.assert_array_equal(reloaded.returns, data.returns)
+    np.testing.assert_array_equal(reloaded.months, data.months)
+
+
+def test_percent_returns_and_changed_source(tmp_path, cache_dir):
+    path = _write(tmp_path / 'returns.csv', 'month,return\n2021-01,1.5\n2021-02,-2.0\n')
+    np.testing.assert_allclose(load_index_returns(path, percent=True).returns, [0.015, -0.02])
+    # 元データを差し替えると（更新時刻・サイズが変わるので）読み直す
+    _write(tmp_path / 'returns.csv', 'month,return\n2021-01,3.0\n2021-02,-2.0\n2021-03,0.5\n')
+    os.utime(path, ns=(0, 10 ** 18))
+    data = load_index_returns(path, percent=True)
+    np.testing.assert_allclose(data.returns, [0.03, -0.02, 0.005])
+    np.testing.assert_allclose(data.between('2021-02', '2021-03'), [-0.02, 0.005])
+
+
+def test_missing_columns_are_reported(tmp_path, cache_dir):
+    path = _write(tmp_path / 'bad.csv', 'foo,bar\n1,2\n')
+    with pytest.raises(ValueError):
+        load_index_returns(path)
+
+
+def test_moving_block_indices():
+    rng = np.random.default_rng(0)
+    indices = moving_block_indices(50, 200, 30, 12, rng)
+    assert indices.shape == (200, 30)
+    assert indices.min() >= 0 and indices.max() < 50
+    # 12か月のブロックの中は連続した月（最後のブロックは途中で切る）
+    for start in (0, 12, 24):
+        block = indices[:, start:start + 12]
+        np.testing.assert_array_equal(np.diff(block, axis=1), 1)
+    # ブロック長が履歴より長ければ履歴全体を1ブロックにする
+    np.testing.assert_array_equal(moving_block_indices(5, 3, 7, 12, rng), np.tile([0, 1, 2, 3, 4, 0, 1], (3, 1)))
+
+
+def test_stationary_indices_have_geometric_blocks():
+    n_history, block_length = 240, 6
+    indices = stationary_indices(n_history, 4000, 120, block_length, np.random.default_rng(1))
+    assert indices.min() >= 0 and indices.max() < n_history
+    # 前月の次の月（末尾の次は先頭）でない月が新しいブロックの始まり
+    breaks = (np.diff(indices, axis=1) % n_history) != 1
+    # 新しいブロックは確率 1/block_length（偶然前月の次から始まる分だけ少なく見える）
+    expected = (1 / block_length) * (1 - 1 / n_history)
+    assert breaks.mean() == pytest.approx(expected, rel=0.03)
+    # block_length=1 なら毎月独立
+    single = stationary_indices(n_history, 2000, 24, 1, np.random.default_rng(2))
+    assert ((np.diff(single, axis=1) % n_history) != 1).mean() == pytest.approx(1 - 1 / n_history, abs=0.01)
+
+
+def test_bootstrap_sampler_draws_from_history():
+    history = np.array([0.01, -0.02, 0.03, 0.0, 0.05])
+    sample = bootstrap_returns(history, 'moving', 3)(np.random.default_rng(3), (10, 9))
+    assert sample.shape == (10, 9)
+    assert np.isin(sample, history).all()
+    with pytest.raises(ValueError):
+        bootstrap_returns(history, 'circular')
+
+
+def test_drawdown_statistics_by_hand():
+    # 水準 1 → 1.1 → 0.55 → 0.66 → 1.32：高値 1.1 から 50% 下落し、底から2か月で回復
+    drawdown, recovery = drawdown_statistics([0.1, -0.5, 0.2, 1.0, 0.0])
+    assert drawdown == pytest.approx(-50.0)
+    assert recovery == 2
+    drawdown, recovery = drawdown_statistics([0.1, -0.5, 0.2])
+    assert drawdown == pytest.approx(-50.0) and np.isnan(recovery)
+    # 底を探すのを最初の1か月に限ると、下落はまだない
+    assert drawdown_statistics([0.1, -0.5, 0.2, 1.0], search_months=1) == (0.0, 0.0)
@@ -0,0 +1,60 @@
+# tests/test_cache.py
+# シナリオキャッシュ: キーの正規化、LRU、ディスク層（書き込みの原子性と容量上限）
+
+import os
+
+import numpy as np
+import pytest
+
+from simcore.cache import ScenarioCache, scenario_key
+
+
+def test_scenario_key_is_canonical():
+    assert scenario_key('fv', monthly=5, rate=0.05) == scenario_key('fv', rate=0.05, monthly=5.0)
+    assert scenario_key('fv', monthly=5) != scenario_key('fv', monthly=6)
+    assert scenario_key('fv', x=np.arange(3)) == scenario_key('fv', x=np.arange(3))
+    assert scenario_key('fv', x=np.arange(3)) != scenario_key('fv', x=np.arange(3.0))
+    with pytest.raises(TypeError):
+        scenario_key('fv', x=object())
+
+
+def test_memory_lru_and_memoize():
+    cache = ScenarioCache(max_entries=2)
+    calls = []
+
+    @cache.memoize('square')
+    def square(x):
+        calls.append(x)
+        return np.array([x * x])
+
+    assert square(3)[0] == 9 and square(x=3)[0] == 9
+    assert calls == [3]
+    # キャッシュした配列は読み取り専用
+    assert not square(3).flags.writeable
+    square(4), square(5)
+    square(3)
+    assert calls == [3, 4, 5, 3]
+    assert cache.stats()['memory_entries'] == 2
+
+
+def test_disk_layer_round_trip_and_eviction(tmp_path):
+    cache = ScenarioCache(directory=str(tmp_path), max_disk_bytes=3000)
+    for i in range(5):
+        cache.put(f'k{i}', np.zeros(100) + i)
+    names = os.listdir(tmp_path)
+    # 一時ファイルは残らず、容量上限に収まるまで古いものから消える
+    assert all(name.endswith('.pkl') for name in names)
+    assert sum(os.path.getsize(tmp_path / name) for name in names) <= 3000
+    assert 'k4.pkl' in names and 'k0.pkl' not in names
+
+    fresh = ScenarioCache(directory=str(tmp_path))
+    np.testing.assert_array_equal(fresh.get('k4'), np.zeros(100) + 4)
+    assert fresh.get('k0') is None
+    assert fresh.stats()['disk_hits'] == 1 and fresh.stats()['misses'] == 1
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    cache = ScenarioCache(directory=str(tmp_path))
+    with pytest.raises(Exception):
+        cache.put('bad', lambda: None)  # pickle できない値
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,67 @@
+# tests/test_calibration.py
+# 校正: 範囲制約付き Nelder–Mead と、既知の倍率で作った「観測値」からの倍率の復元
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from simcore.calibration import (apply_multipliers, calibrate_cohort_model, level_shares, minimize_bounded,
+                                 retention_curves)
+from simcore.cohort import DEFAULT_COHORT_MODEL
+from simcore.organization import ORG_LEVELS
+from simcore.salary import CAREER_PATHS
+
+
+def test_minimize_bounded_interior_quadratic():
+    center = np.array([0.7, -1.3, 2.0])
+    best, value, evals = minimize_bounded(lambda x: np.sum((x - center) ** 2) + 5.0, np.zeros(3),
+                                          [(-5, 5)] * 3, max_evals=5000, tolerance=1e-14)
+    np.testing.assert_allclose(best, center, atol=1e-5)
+    assert value == pytest.approx(5.0, abs=1e-9)
+    assert evals <= 5000
+
+
+def test_minimize_bounded_optimum_on_bound():
+    # 制約なしの最小は (3, -1) だが、範囲 [0, 2] × [0, 2] では角の (2, 0)
+    best, value, _ = minimize_bounded(lambda x: (x[0] - 3) ** 2 + 2 * (x[1] + 1) ** 2, [1.0, 1.0],
+                                      [(0, 2), (0, 2)], tolerance=1e-14)
+    np.testing.assert_allclose(best, [2.0, 0.0], atol=1e-6)
+    assert value == pytest.approx(3.0, abs=1e-6)
+    # 評価するのは常に範囲内の点
+    seen = []
+    minimize_bounded(lambda x: seen.append(x.copy()) or float(np.sum(x)), [0.5], [(0, 1)])
+    assert min(x[0] for x in seen) >= 0 and max(x[0] for x in seen) <= 1
+
+
+def test_calibration_recovers_known_multipliers():
+    promotion, attrition = (1.3, 0.8, 1.1, 0.9), (1.2, 0.9, 1.1)
+    truth = apply_multipliers(DEFAULT_COHORT_MODEL, promotion, attrition)
+    observed = dict(zip(ORG_LEVELS, level_shares(truth) * 1000))
+    retention = retention_curves(truth)
+    paths = {tier: replace(CAREER_PATHS[tier], retention=tuple(retention[tier])) for tier in truth.tiers}
+
+    result = calibrate_cohort_model(DEFAULT_COHORT_MODEL, observed, paths, max_evals=4000)
+    # 離職の倍率は層ごとの残存率だけで決まるので一意に戻る
+    np.testing.assert_allclose(list(result.attrition.values()), attrition, atol=1e-3)
+    # 昇進の倍率は4つに対して構成比の自由度が3つなので一意ではないが、観測値はそのまま再現する
+    assert result.objective < 1e-8
+    np.testing.assert_allclose(result.fitted_shares, level_shares(truth), atol=1e-4)
+    for tier, curve in retention_curves(result.model).items():
+        np.testing.assert_allclose(curve, retention[tier], atol=0.05)
+    np.testing.assert_allclose(level_shares(apply_multipliers(DEFAULT_COHORT_MODEL, list(result.promotion.values()),
+                                                              list(result.attrition.values()))),
+                               result.fitted_shares)
+    pyramid = result.pyramid(1000)
+    for level, (observed_count, fitted_count) in pyramid.items():
+        assert fitted_count == pytest.approx(observed[level], abs=0.1)
+
+
+def test_apply_multipliers_scales_the_right_cells():
+    model = apply_multipliers(DEFAULT_COHORT_MODEL, (1, 1, 1, 2), (1, 1, 0.5))
+    base = DEFAULT_COHORT_MODEL
+    # Basic の倍率は B2→B1 の昇進（列0）だけにかかる
+    np.testing.assert_allclose(model.promotion_matrix()[:, 0], np.clip(2 * base.promotion_matrix()[:, 0], 0, 1))
+    np.testing.assert_allclose(model.promotion_matrix()[:, 1:], base.promotion_matrix()[:, 1:])
+    np.testing.assert_allclose(model.attrition_matrix()[2], 0.5 * base.attrition_matrix()[2])
+    np.testing.assert_allclose(model.attrition_matrix()[:2], base.attrition_matrix()[:2])
@@ -0,0 +1,80 @@
+# tests/test_cohort.py
+# 新卒コホートのシミュレーション: 人数が多い極限で、残存率とグレード分布が
+# キャリアパスから作ったモデル（retention_curves・マルコフ連鎖の occupancy）と一致するか
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from simcore.calibration import retention_curves
+from simcore.cohort import DEFAULT_COHORT_MODEL, attrition_rates, promotion_rates, simulate_cohort
+from simcore.markov import occupancy
+from simcore.salary import CAREER_PATHS, GRADE_SALARIES, GRADES
+
+N = 300000
+YEARS = 20
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    return simulate_cohort(N, YEARS, seed=8, salary_year=10)
+
+
+def test_survival_matches_retention_curves(cohort):
+    survival = cohort.retention()
+    for i, (tier, curve) in enumerate(retention_curves(DEFAULT_COHORT_MODEL).items()):
+        years = np.asarray(CAREER_PATHS[tier].years)
+        years = years[years <= YEARS]
+        hired = cohort.tier_hired[i]
+        tolerance = 100 * 5 * np.sqrt(0.25 / hired)
+        np.testing.assert_allclose(survival[years - 1, i], curve[:len(years)], atol=tolerance, err_msg=tier)
+    # 層の構成比は COHORT_TIER_SHARES
+    np.testing.assert_allclose(cohort.tier_hired / N, DEFAULT_COHORT_MODEL.shares, atol=0.005)
+
+
+def test_retention_curves_reproduce_career_paths():
+    # 離職率は残存率の対数線形補間なので、パスの勤続年数では元の残存率に戻る
+    for tier, curve in retention_curves(DEFAULT_COHORT_MODEL).items():
+        np.testing.assert_allclose(curve, CAREER_PATHS[tier].retention, rtol=1e-10, err_msg=tier)
+
+
+def test_grade_counts_match_occupancy(cohort):
+    expected = occupancy(DEFAULT_COHORT_MODEL, YEARS)[:, :len(GRADES)]
+    np.testing.assert_allclose(cohort.grade_counts / N, expected, atol=5 * np.sqrt(0.25 / N))
+    np.testing.assert_array_equal(cohort.grade_counts.sum(axis=1), cohort.tier_alive.sum(axis=1))
+    np.testing.assert_allclose(cohort.scaled_grade_counts(54).sum(axis=1), cohort.grade_counts.sum(axis=1) * 54 / N)
+
+
+def test_salaries_of_staying_employees(cohort):
+    assert len(cohort.salaries) == cohort.grade_counts[9].sum()
+    expected_mean = cohort.grade_counts[9] @ np.asarray(GRADE_SALARIES, dtype=float) / cohort.grade_counts[9].sum()
+    # 個人差は平均1の正規分布なので、平均はグレードの想定年収の加重平均
+    assert cohort.salaries.mean() == pytest.approx(expected_mean, rel=0.002)
+
+
+def test_deterministic_limit_climbs_one_grade_per_year():
+    no_attrition = tuple((0.0,) * 40 for _ in DEFAULT_COHORT_MODEL.tiers)
+    certain = tuple((1.0,) * len(GRADES) for _ in DEFAULT_COHORT_MODEL.tiers)
+    model = replace(DEFAULT_COHORT_MODEL, attrition=no_attrition, promotion=certain, salary_spread=0.0)
+    result = simulate_cohort(500, 15, model=model, seed=1, chunk_size=128, salary_year=5)
+    expected = np.zeros((15, len(GRADES)))
+    expected[np.arange(15), np.minimum(np.arange(15), len(GRADES) - 1)] = 500
+    np.testing.assert_array_equal(result.grade_counts, expected)
+    np.testing.assert_array_equal(result.retention(), 100.0)
+    np.testing.assert_array_equal(result.salaries, GRADE_SALARIES[4])
+
+
+def test_rates_from_paths():
+    path = CAREER_PATHS['standard']
+    rates = promotion_rates(path)
+    # パスで d 年留まるグレードからは毎年 1/d で昇進、パスの最後のグレードからは昇進しない
+    first_year = {}
+    for year, grade in zip(path.years, path.grade):
+        first_year.setdefault(grade, year)
+    reached = list(first_year.items())
+    for (grade, year), (_, next_year) in zip(reached, reached[1:]):
+        assert rates[GRADES.index(grade)] == pytest.approx(1 / (next_year - year))
+    assert np.all(rates[GRADES.index(path.grade[-1]):] == 0)
+    attrition = attrition_rates(path, 40)
+    assert attrition.shape == (40,) and np.all((attrition >= 0) & (attrition < 1))
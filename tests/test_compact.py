@@ -0,0 +1,71 @@
+# tests/test_compact.py
+# compact モード: 固定小数点の円（int32）と float32 の残高が、float64 の結果から許容範囲内に収まるか
+
+import numpy as np
+import pytest
+
+from simcore.compact import COMPACT_FLOAT, COMPACT_YEN, from_fixed_yen, precision_report, to_fixed_yen
+from simcore.life_events import COMPACT_LIFE_EVENT_DTYPE, LIFE_EVENT_DTYPE, simulate_life_events_batch
+from simcore.monte_carlo import compact_precision_report, simulate_market_paths
+
+
+def test_fixed_yen_round_trip_and_overflow():
+    yen = to_fixed_yen([0.00004, 1.23456, -3.5, 214748.3647])
+    assert yen.dtype == COMPACT_YEN
+    np.testing.assert_array_equal(yen, [0, 12346, -35000, 2147483647])
+    np.testing.assert_allclose(from_fixed_yen(yen), [0, 1.2346, -3.5, 214748.3647])
+    np.testing.assert_array_equal(to_fixed_yen([1234.4, 2**31 - 1], unit=1), [1234, 2**31 - 1])
+    # int32 の範囲を超えたら丸めて飽和させずにエラー
+    with pytest.raises(ValueError):
+        to_fixed_yen([214748.3648])
+    with pytest.raises(ValueError):
+        to_fixed_yen([-214748.3649])
+    assert to_fixed_yen([]).dtype == COMPACT_YEN
+
+
+def test_compact_dtype_is_half_the_size():
+    assert COMPACT_LIFE_EVENT_DTYPE.names == LIFE_EVENT_DTYPE.names
+    assert COMPACT_LIFE_EVENT_DTYPE['investment'] == COMPACT_FLOAT
+    assert COMPACT_LIFE_EVENT_DTYPE['savings'] == COMPACT_FLOAT
+    assert all(COMPACT_LIFE_EVENT_DTYPE[name] == COMPACT_YEN
+               for name in ('available_cash', 'events_cost', 'monthly_savings'))
+    assert COMPACT_LIFE_EVENT_DTYPE.itemsize * 2 == LIFE_EVENT_DTYPE.itemsize
+
+
+def test_precision_report_fields():
+    reference = np.array([(100.0, 2.5)], dtype=[('balance', 'f8'), ('cash', 'f8')])
+    compact = np.array([(100.001, 25001)], dtype=[('balance', 'f4'), ('cash', 'i4')])
+    report = precision_report(reference, compact)
+    assert report['balance']['max_abs'] == pytest.approx(0.001, rel=1e-3)
+    assert report['balance']['max_rel'] == pytest.approx(1e-5, rel=1e-3)
+    # 整数のフィールドは円単位として万円に換算して比べる
+    assert report['cash']['max_abs'] == pytest.approx(0.0001)
+    assert precision_report(np.zeros(3), np.zeros(3, dtype='f4'))['value'] == {
+        'max_abs': 0.0, 'max_rel': 0.0, 'rms_rel': 0.0}
+
+
+def test_compact_life_events_match_full_precision():
+    rng = np.random.default_rng(0)
+    salaries = rng.uniform(300, 1500, (500, 1)) * np.linspace(1, 2, 30)
+    living = np.full(30, 300.0)
+    events = np.where(np.arange(30) % 7 == 3, 200.0, 0.0)
+    full = simulate_life_events_batch(salaries, living, events, chunk_size=128)
+    compact = simulate_life_events_batch(salaries, living, events, chunk_size=128, compact=True)
+    assert compact.dtype == COMPACT_LIFE_EVENT_DTYPE
+    report = precision_report(full, compact)
+    # 残高は float32 の丸め1回分、キャッシュフローは円単位の丸め（0.5円 = 0.00005万円）以内
+    for name in ('investment', 'savings'):
+        assert report[name]['max_rel'] <= np.finfo(COMPACT_FLOAT).eps
+    for name in ('available_cash', 'events_cost', 'monthly_savings'):
+        assert report[name]['max_abs'] <= 0.5 / 10000 + 1e-12
+
+
+def test_compact_market_paths_match_full_precision():
+    monthly = np.full(480, 10.0)
+    report = compact_precision_report(monthly, n_paths=2048, seed=1)
+    # 40年の積み上げでも float32 の相対誤差は 1e-5 未満（1億円で数十円程度）
+    assert report['max_rel'] < 1e-5
+    full = simulate_market_paths(monthly, 4096, seed=2, chunk_size=2048)
+    compact = simulate_market_paths(monthly, 4096, seed=2, chunk_size=2048, compact=True)
+    np.testing.assert_allclose(compact.mean(), full.mean(), rtol=1e-5)
+    np.testing.assert_allclose(compact.percentiles([5, 50, 95]), full.percentiles([5, 50, 95]), rtol=0.011)
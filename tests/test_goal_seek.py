@@ -0,0 +1,45 @@
+# tests/test_goal_seek.py
+# 逆算した積立額・利回り・到達年が、順方向の積立計算に戻すと目標額と一致するか
+
+import numpy as np
+import pytest
+
+from simcore.annuity import future_value
+from simcore.goal_seek import (earliest_achievement_year, project_balances, required_monthly_contribution,
+                               required_return)
+
+
+def test_required_monthly_matches_closed_form():
+    targets = np.array([500, 1000, 3000])[:, None]
+    years = np.array([5, 10, 20])[None, :]
+    monthly = required_monthly_contribution(targets, years, 0.05)
+    # 積立可能額の上限がなければ年金終価係数で割るだけ
+    np.testing.assert_allclose(monthly, targets / future_value(1.0, 0.05, 12 * years), rtol=1e-8)
+
+
+def test_required_monthly_with_affordable_cap():
+    affordable = np.array([3.0] * 5 + [10.0] * 5)
+    monthly = required_monthly_contribution([300, 700, 5000], 10, 0.05, affordable=affordable)
+    assert np.isnan(monthly[2])
+    balances = project_balances(monthly[:2], 0.05, 10, affordable)[:, -1]
+    np.testing.assert_allclose(balances, [300, 700], rtol=1e-7)
+    # 上限より多く積み立てる必要がある年は上限で頭打ち
+    assert monthly[1] > 3.0
+
+
+def test_required_return_round_trips():
+    rates = required_return([700, 10000], 10, 5.0)
+    assert future_value(5.0, rates[0], 120) == pytest.approx(700, rel=1e-7)
+    assert future_value(5.0, rates[1], 120) == pytest.approx(10000, rel=1e-7)
+    # 元本だけで届く目標は下限、上限でも届かない目標は nan
+    rates = required_return([1, 10000], 10, 5.0, bracket=(-0.5, 0.2))
+    assert rates[0] == -0.5
+    assert np.isnan(rates[1])
+
+
+def test_earliest_achievement_year():
+    years = earliest_achievement_year([100, 776, 10000], 5.0, 0.05, max_years=40)
+    balances = project_balances(5.0, 0.05, 40)
+    for target, year in zip([100, 776], years[:2]):
+        assert balances[int(year) - 1] >= target > (balances[int(year) - 2] if year > 1 else 0)
+    assert np.isnan(years[2])
@@ -0,0 +1,77 @@
+# tests/test_joint.py
+# キャリア × 市場の同時シミュレーション: 確率を 0/1 にした決定論的なケースを
+# ライフイベント込みのキャッシュフローと simulate_market_paths（vol=0）に照らし合わせる
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from simcore.cohort import DEFAULT_COHORT_MODEL
+from simcore.joint import sample_career_paths, simulate_joint
+from simcore.life_events import event_cost_schedule, living_cost_schedule, monthly_savings_schedule
+from simcore.monte_carlo import simulate_market_paths
+from simcore.salary import GRADE_SALARIES, GRADES
+from simcore.scenarios import life_events, recurring_costs
+
+AGES = (30, 40)
+N_YEARS = AGES[-1] - 22 + 1
+
+
+def _model(promote, leave_year=None):
+    """全員が毎年確率 promote で昇進し、leave_year 年目の年度末に全員離職する1層のモデル"""
+    attrition = np.zeros(N_YEARS + 1)
+    if leave_year is not None:
+        attrition[leave_year - 1] = 1.0
+    return replace(DEFAULT_COHORT_MODEL, tiers=('only',), shares=(1.0,),
+                   promotion=((float(promote),) * len(GRADES),), attrition=(tuple(attrition),),
+                   salary_spread=0.0)
+
+
+def _expected(salaries, stop_after=None):
+    """年収の列から積立額を決め、vol=0 の simulate_market_paths で運用した年度末残高"""
+    years = np.arange(1, len(salaries) + 1)
+    monthly = monthly_savings_schedule(salaries, living_cost_schedule(years, recurring_costs),
+                                       event_cost_schedule(years, life_events))
+    if stop_after is not None:
+        monthly[stop_after:] = 0.0
+    result = simulate_market_paths(np.repeat(monthly, 12), 2, vol=0.0, seed=0)
+    return result.mean()[np.asarray(AGES) - 22]
+
+
+def test_no_promotion_matches_single_path():
+    result = simulate_joint(64, model=_model(0.0), vol=0.0, ages=AGES, seed=1, chunk_size=16)
+    expected = _expected(np.full(N_YEARS, GRADE_SALARIES[0], dtype=float))
+    np.testing.assert_allclose(result.mean(), expected, rtol=1e-9)
+    np.testing.assert_array_equal(result.retention(), [1.0, 1.0])
+
+
+def test_certain_promotion_climbs_the_ladder():
+    result = simulate_joint(32, model=_model(1.0), vol=0.0, ages=AGES, seed=2)
+    grades = np.minimum(np.arange(N_YEARS), len(GRADES) - 1)
+    expected = _expected(np.asarray(GRADE_SALARIES, dtype=float)[grades])
+    np.testing.assert_allclose(result.mean(), expected, rtol=1e-9)
+    assert result.grade_share()[0, grades[AGES[0] - 22]] == 1.0
+
+
+def test_attrition_stops_contributions():
+    leave_year = 5
+    result = simulate_joint(32, model=_model(0.0, leave_year), vol=0.0, ages=AGES, seed=3)
+    expected = _expected(np.full(N_YEARS, GRADE_SALARIES[0], dtype=float), stop_after=leave_year)
+    np.testing.assert_allclose(result.mean(), expected, rtol=1e-9)
+    np.testing.assert_array_equal(result.retention(), [0.0, 0.0])
+    # 在籍者がいない年齢のグレード別平均は nan
+    assert np.isnan(result.mean_by_grade()).all()
+
+
+def test_sample_career_paths_marks_leavers_from_next_year():
+    tier, history, employed = sample_career_paths(_model(1.0, 3), 4, 6, np.random.default_rng(0))
+    np.testing.assert_array_equal(employed[0], [True, True, True, False, False, False])
+    # 離職した年度末は昇進しないのでグレードは離職時のまま
+    np.testing.assert_array_equal(history[0], [0, 1, 2, 2, 2, 2])
+    assert (tier == 0).all()
+
+
+def test_ages_before_joining_are_rejected():
+    with pytest.raises(ValueError):
+        simulate_joint(10, ages=(20, 30))
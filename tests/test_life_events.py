@@ -0,0 +1,128 @@
+# tests/test_life_events.py
+# バッチ版のライフイベント込みシミュレーションが従来の1シナリオのループとビット単位で一致するか
+
+import numpy as np
+import pytest
+
+from simcore.life_events import (LIFE_EVENT_FIELDS, event_cost_schedule, living_cost_schedule,
+                                 monthly_savings_schedule, simulate_life_events_batch, take_home_income)
+from simcore.payroll import take_home_path
+from simcore.salary import STANDARD_SALARY, STANDARD_SALARY_YEARS
+from simcore.scenarios import INVESTMENT_RETURN, SAVINGS_RATE, LifeEventScenario, life_events, recurring_costs
+
+
+def reference_simulation(salaries, include_events=True, savings_rate_base=0.25, tax_rate=0.20, start_age=22):
+    """capitalSimulation.simulate_with_life_events() の元のループ（手取りだけ take_home_income に差し替え）"""
+    history = {name: [] for name in LIFE_EVENT_FIELDS}
+    investment_balance = savings_balance = total_event_cost = 0
+    take_home_by_year = take_home_income(salaries, tax_rate, start_age)
+    for i, year in enumerate(range(1, len(salaries) + 1)):
+        take_home = float(take_home_by_year[i]) * 10000
+        if year <= 3:
+            living_cost = 20 * 12 * 10000
+        elif year <= 7:
+            living_cost = 23 * 12 * 10000
+        elif year <= 15:
+            living_cost = 25 * 12 * 10000
+        else:
+            living_cost = 28 * 12 * 10000
+        for start_year, cost_info in recurring_costs.items():
+            if year >= start_year:
+                living_cost += cost_info['annual_cost'] * 10000
+        available = take_home - living_cost
+        event_cost = 0
+        if include_events and year in life_events:
+            event_cost = life_events[year]['cost'] * 10000
+            total_event_cost += event_cost
+        actual_savings = max(0, available - event_cost)
+        if event_cost > 0:
+            adjusted_rate = min(0.1, actual_savings / take_home)
+        else:
+            adjusted_rate = min(savings_rate_base, actual_savings / take_home)
+        annual_savings = take_home * adjusted_rate
+        monthly_savings = annual_savings / 12
+        for month in range(12):
+            investment_balance = investment_balance * (1 + INVESTMENT_RETURN / 12) + monthly_savings
+        savings_balance = savings_balance * (1 + SAVINGS_RATE) + annual_savings
+        history['investment'].append(investment_balance / 10000)
+        history['savings'].append(savings_balance / 10000)
+        history['available_cash'].append(available / 10000)
+        history['events_cost'].append(total_event_cost / 10000)
+        history['monthly_savings'].append(monthly_savings / 10000)
+    return {name: np.array(values) for name, values in history.items()}
+
+
+def standard_salaries(max_years=20):
+    return np.interp(np.arange(1, max_years + 1), STANDARD_SALARY_YEARS, STANDARD_SALARY)
+
+
+@pytest.mark.parametrize('tax_rate', [0.20, None])
+@pytest.mark.parametrize('include_events', [True, False])
+def test_scenario_matches_original_loop_exactly(tax_rate, include_events):
+    scenario = LifeEventScenario(include_events=include_events, tax_rate=tax_rate)
+    result = scenario.simulate()
+    expected = reference_simulation(standard_salaries(), include_events, tax_rate=tax_rate,
+                                    start_age=scenario.start_age)
+    for name in LIFE_EVENT_FIELDS:
+        np.testing.assert_array_equal(result[name], expected[name], err_msg=name)
+
+
+def test_batch_rows_match_single_scenarios():
+    rng = np.random.default_rng(0)
+    years = np.arange(1, 21)
+    salaries = standard_salaries() * rng.uniform(0.7, 1.6, (37, 1))
+    rates = rng.uniform(0.1, 0.35, (37, 1))
+    batch = simulate_life_events_batch(salaries, living_cost_schedule(years, recurring_costs),
+                                       event_cost_schedule(years, life_events), rates, chunk_size=8)
+    for row in (0, 8, 17, 36):
+        expected = reference_simulation(salaries[row], savings_rate_base=rates[row, 0], tax_rate=None)
+        for name in LIFE_EVENT_FIELDS:
+            np.testing.assert_array_equal(batch[row][name], expected[name], err_msg=name)
+
+
+def test_compact_mode_stays_close():
+    years = np.arange(1, 21)
+    args = (standard_salaries(), living_cost_schedule(years, recurring_costs), event_cost_schedule(years, life_events))
+    full = simulate_life_events_batch(*args)[0]
+    compact = simulate_life_events_batch(*args, compact=True)[0]
+    np.testing.assert_allclose(compact['investment'], full['investment'], rtol=1e-6)
+    # キャッシュフローは円単位の整数
+    np.testing.assert_allclose(compact['monthly_savings'] / 10000, full['monthly_savings'], atol=1e-4)
+
+
+def test_monthly_savings_schedule_matches_batch():
+    years = np.arange(1, 41)
+    salaries = np.linspace(300, 1200, 40) * np.array([[0.8], [1.0], [1.5]])
+    living_costs = living_cost_schedule(years, recurring_costs)
+    event_costs = event_cost_schedule(years, life_events)
+    batch = simulate_life_events_batch(salaries, living_costs, event_costs, 0.2)
+    np.testing.assert_array_equal(monthly_savings_schedule(salaries, living_costs, event_costs, 0.2),
+                                  batch['monthly_savings'])
+
+
+def test_take_home_follows_age():
+    # 22歳入社で年収が変わらなくても、2年目から住民税（前年の所得分）、40歳から介護保険料が引かれる
+    salaries = np.full(25, 600.0)
+    take_home = take_home_income(salaries, start_age=22)
+    assert take_home[0] > take_home[1]
+    np.testing.assert_allclose(take_home[1:18], take_home[1])
+    assert take_home[18] < take_home[17]
+    # 41歳からは住民税も介護保険料を控除した前年の所得にかかるので、わずかに戻ってそのまま
+    assert take_home[18] < take_home[19] < take_home[17]
+    np.testing.assert_allclose(take_home[19:], take_home[19])
+    np.testing.assert_array_equal(take_home_path(salaries, 22), take_home)
+    # 入社年齢をずらすと介護保険料がかかり始める年もずれる
+    later = take_home_income(salaries, start_age=30)
+    assert later[10] < later[9] and later[9] == take_home[1]
+    # スカラーは入社1年目、一律の控除率は年齢によらない
+    assert take_home_income(600.0) == take_home[0]
+    np.testing.assert_array_equal(take_home_income(salaries, 0.2, 22), 480.0)
+
+
+def test_batch_deducts_nursing_care_after_forty():
+    years = np.arange(1, 26)
+    salaries = np.full(25, 600.0)
+    result = simulate_life_events_batch(salaries, living_cost_schedule(years), start_age=22)[0]
+    available = result['available_cash'] + living_cost_schedule(years)
+    np.testing.assert_allclose(available, take_home_income(salaries, start_age=22))
+    assert available[18] < available[17]
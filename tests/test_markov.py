@@ -0,0 +1,61 @@
+# tests/test_markov.py
+# 昇進のマルコフ連鎖: 小さなモデルの手計算の閉じた式と、エージェント・ベースの頻度に照らし合わせる
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from simcore.cohort import DEFAULT_COHORT_MODEL, simulate_cohort
+from simcore.markov import first_passage, occupancy, reach_probability
+
+
+def _small_model(promotion, attrition):
+    return replace(DEFAULT_COHORT_MODEL, tiers=('only',), shares=(1.0,), promotion=(tuple(promotion),),
+                   attrition=((attrition,) * 20,))
+
+
+def test_first_passage_matches_closed_form():
+    p, a = (0.5, 0.25, 0.0), 0.1
+    kept = 1 - a
+    result = first_passage(_small_model(p, a))
+    # 各グレードで「昇進して抜ける」確率は kept p / (1 - kept (1 - p))、
+    # 抜けるまでの年数は（到達を条件として）幾何分布で平均 1 / (1 - kept (1 - p))
+    leave_up = [kept * q / (1 - kept * (1 - q)) for q in p[:2]]
+    stay = [1 / (1 - kept * (1 - q)) for q in p[:2]]
+    np.testing.assert_allclose(result['probability'][0], [1, leave_up[0], leave_up[0] * leave_up[1]])
+    np.testing.assert_allclose(result['expected_years'][0], [0, stay[0], stay[0] + stay[1]])
+
+
+def test_first_passage_without_attrition():
+    result = first_passage(_small_model((0.5, 0.0, 0.0), 0.0), attrition=0.0)
+    # 離職しなければ昇進確率が正のグレードには必ず届き、平均年数は 1/p
+    np.testing.assert_allclose(result['probability'][0], [1, 1, 0])
+    np.testing.assert_allclose(result['expected_years'][0, :2], [0, 2])
+    assert np.isnan(result['expected_years'][0, 2])
+
+    # 既定モデルでも特異行列にならず、到達確率は 0 か 1
+    passage = first_passage(attrition=0.0)
+    reached = passage['probability'] > 0
+    np.testing.assert_allclose(passage['probability'][reached], 1.0)
+    np.testing.assert_array_equal(np.isnan(passage['expected_years']), ~reached)
+
+
+def test_reach_probability_matches_simulated_cohort():
+    n, years = 200000, 15
+    no_attrition = replace(DEFAULT_COHORT_MODEL, attrition=tuple((0.0,) * 40 for _ in DEFAULT_COHORT_MODEL.tiers))
+    cohort = simulate_cohort(n, years, model=no_attrition, seed=5)
+    # 離職しなければ在籍者のグレード分布の上側累積が「そのグレード以上に到達した割合」
+    frequency = np.cumsum(cohort.grade_counts[:, ::-1], axis=1)[:, ::-1] / n
+    expected = reach_probability(no_attrition, years)
+    np.testing.assert_allclose(frequency, expected, atol=5 * np.sqrt(0.25 / n))
+    np.testing.assert_allclose(reach_probability(years=years, stay=True), expected)
+
+
+def test_occupancy_matches_simulated_cohort():
+    n, years = 200000, 15
+    cohort = simulate_cohort(n, years, seed=6)
+    states = occupancy(years=years)
+    np.testing.assert_allclose(states.sum(axis=1), 1.0)
+    np.testing.assert_allclose(cohort.grade_counts / n, states[:, :-1], atol=5 * np.sqrt(0.25 / n))
+    assert states[-1, -1] == pytest.approx(1 - cohort.grade_counts[-1].sum() / n, abs=0.005)
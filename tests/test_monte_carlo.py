@@ -0,0 +1,47 @@
+# tests/test_monte_carlo.py
+# 市場リターンのモンテカルロ: vol=0 で決定論的な計算に戻ること、
+# 平均残高が解析的な期待値に収束すること、分散低減の各モードが同じ期待値を推定すること
+
+import numpy as np
+import pytest
+
+from simcore.annuity import balance_path
+from simcore.monte_carlo import simulate_market_paths
+
+MONTHLY = np.full(120, 5.0)
+
+
+@pytest.mark.parametrize('sampler', ['normal', 'lognormal'])
+def test_zero_vol_matches_deterministic_path(sampler):
+    result = simulate_market_paths(MONTHLY, 100, sampler, vol=0.0, seed=0, targets=(700, 800))
+    expected = balance_path(5.0, 0.05, 120, step=12)
+    np.testing.assert_allclose(result.mean(), expected, rtol=1e-12)
+    np.testing.assert_allclose(result.std(), 0.0, atol=1e-9)
+    # 最終残高 776.4 万円は 700 には届き 800 には届かない
+    np.testing.assert_array_equal(result.reach_probability()[:, -1], [1.0, 0.0])
+
+
+@pytest.mark.parametrize('shocks', ['pseudo', 'antithetic', 'sobol'])
+@pytest.mark.parametrize('sampler', ['normal', 'lognormal'])
+def test_mean_converges_to_expected_balance(sampler, shocks):
+    if shocks == 'sobol':
+        pytest.importorskip('scipy')
+    # 月次グロスの期待値は 1 + mean/12 なので、平均残高の期待値は決定論的な残高と同じ
+    result = simulate_market_paths(MONTHLY, 32768, sampler, seed=1, shocks=shocks, chunk_size=4096)
+    expected = balance_path(5.0, 0.05, 120, step=12)
+    se = result.standard_error()['mean']
+    assert np.all(np.abs(result.mean() - expected) <= 5 * se + 1e-9)
+
+
+def test_control_variate_keeps_reach_probability_unbiased():
+    plain = simulate_market_paths(MONTHLY, 65536, seed=2, targets=(800,), chunk_size=4096)
+    controlled = simulate_market_paths(MONTHLY, 65536, seed=2, targets=(800,), chunk_size=4096,
+                                       control_variate=True)
+    se = np.hypot(plain.standard_error()['reach'][0, -1], controlled.standard_error()['reach'][0, -1])
+    assert abs(plain.reach_probability()[0, -1] - controlled.reach_probability()[0, -1]) <= 5 * se
+    assert controlled.standard_error()['reach'][0, -1] < plain.standard_error()['reach'][0, -1]
+
+
+def test_contributions_must_cover_whole_years():
+    with pytest.raises(ValueError):
+        simulate_market_paths(np.ones(13), 10)
@@ -0,0 +1,67 @@
+# tests/test_organization.py
+# 組織全体の推計: 人数の収支（前年 + 採用 - 離職 = 今年）、乱数の再現性、集計の形
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from simcore.cohort import DEFAULT_COHORT_MODEL
+from simcore.organization import CURRENT_ORGANIZATION, hiring_schedule, project_organization
+from simcore.salary import GRADE_SALARIES, GRADES
+
+
+@pytest.mark.parametrize('seed', [None, 11])
+def test_headcount_is_conserved(seed):
+    projection = project_organization(hiring={1: 54, 2: 80, 5: 120}, years=12, seed=seed)
+    headcount = projection.headcount()
+    assert headcount[0] == pytest.approx(sum(CURRENT_ORGANIZATION.values()))
+    np.testing.assert_allclose(headcount[1:], headcount[:-1] + projection.hires[1:] - projection.leavers[1:])
+    np.testing.assert_array_equal(projection.hires, [0, 54, 80, 0, 0, 120] + [0] * 7)
+    # 入社年ごとの人数も、入社後は減る一方
+    change = np.diff(projection.cohort_headcount(), axis=0)
+    joined = np.arange(12)[:, np.newaxis] >= np.arange(13)
+    assert np.all(change[joined] <= 1e-9)
+    if seed is not None:
+        np.testing.assert_array_equal(projection.counts, np.round(projection.counts))
+
+
+def test_same_seed_reproduces():
+    first = project_organization(years=10, seed=3)
+    np.testing.assert_array_equal(first.counts, project_organization(years=10, seed=3).counts)
+    assert not np.array_equal(first.counts, project_organization(years=10, seed=4).counts)
+
+
+def test_stochastic_mean_matches_expected_counts():
+    expected = project_organization(years=8).grade_counts()
+    draws = np.mean([project_organization(years=8, seed=seed).grade_counts() for seed in range(300)], axis=0)
+    np.testing.assert_allclose(draws.sum(axis=1), expected.sum(axis=1), rtol=0.01)
+    np.testing.assert_allclose(draws, expected, atol=1.5)
+
+
+def test_without_attrition_nobody_leaves():
+    model = replace(DEFAULT_COHORT_MODEL, attrition=tuple((0.0,) * 40 for _ in DEFAULT_COHORT_MODEL.tiers))
+    projection = project_organization(hiring=10, years=5, model=model)
+    np.testing.assert_allclose(projection.leavers, 0.0)
+    np.testing.assert_allclose(projection.headcount(), 378 + 10 * np.arange(6))
+
+
+def test_summary_shapes():
+    years = 7
+    projection = project_organization(years=years)
+    assert projection.counts.shape == (years + 1, years + 1, len(GRADES))
+    assert projection.grade_counts().shape == (years + 1, len(GRADES))
+    np.testing.assert_allclose(projection.payroll(), projection.grade_counts() @ np.asarray(GRADE_SALARIES))
+    assert projection.payroll().shape == (years + 1,)
+    assert projection.cohort_headcount().shape == (years + 1, years + 1)
+    levels = projection.level_counts()
+    np.testing.assert_allclose(sum(levels.values()), projection.headcount())
+    np.testing.assert_array_equal(projection.years, np.arange(years + 1))
+
+
+def test_hiring_schedule_forms():
+    np.testing.assert_array_equal(hiring_schedule(5, 3), [5, 5, 5])
+    np.testing.assert_array_equal(hiring_schedule({2: 7, 9: 1}, 3), [0, 7, 0])
+    np.testing.assert_array_equal(hiring_schedule([1, 2, 3], 3), [1, 2, 3])
+    with pytest.raises(ValueError):
+        hiring_schedule([1, 2], 3)
@@ -0,0 +1,78 @@
+# tests/test_parallel.py
+# ブロックごとのシードと順番どおりの統合で、結果がワーカー数によらずビット単位で一致するか
+
+import numpy as np
+import pytest
+
+from simcore.cohort import simulate_cohort
+from simcore.joint import simulate_joint
+from simcore.monte_carlo import simulate_market_paths
+from simcore.parallel import block_seeds, ordered_map, parallel_reduce
+from simcore.regime import simulate_crash_statistics
+from simcore.tail_risk import simulate_tail_risk
+
+CONTRIBUTIONS = np.full(10 * 12, 5.0)
+
+
+def square(x):
+    return x * x
+
+
+def test_ordered_map_keeps_task_order():
+    assert list(ordered_map(square, range(20), workers=3, window=2)) == [x * x for x in range(20)]
+
+
+def test_parallel_reduce_stops_at_the_same_task():
+    # 0² + ... + 14² = 1015 で初めて1000を超える
+    for workers in (1, 3):
+        total = parallel_reduce(square, range(100), lambda acc, part: acc + part, workers=workers,
+                                until=lambda acc: acc > 1000)
+        assert total == sum(x * x for x in range(15))
+
+
+def test_block_seeds_are_reproducible():
+    first = [seed.generate_state(2) for seed in block_seeds(7, 4)]
+    second = [seed.generate_state(2) for seed in block_seeds(7, 4)]
+    np.testing.assert_array_equal(first, second)
+    assert len({tuple(state) for state in first}) == 4
+
+
+@pytest.mark.parametrize('options', [{}, {'shocks': 'antithetic', 'control_variate': True},
+                                     {'ci_width': 5.0, 'stop_on': 'tail'}])
+def test_market_paths_do_not_depend_on_workers(options):
+    # 1024本 × 40チャンク = 3ブロック
+    one, three = (simulate_market_paths(CONTRIBUTIONS, 40_960, seed=3, chunk_size=1024, workers=workers, **options)
+                  for workers in (1, 3))
+    assert one.n_paths == three.n_paths
+    np.testing.assert_array_equal(one.mean(), three.mean())
+    np.testing.assert_array_equal(one.percentiles([1, 50, 99]), three.percentiles([1, 50, 99]))
+    np.testing.assert_array_equal(one.reach_probability(), three.reach_probability())
+    np.testing.assert_array_equal(one.tail(), three.tail())
+    np.testing.assert_array_equal(one.standard_error()['mean'], three.standard_error()['mean'])
+
+
+def test_joint_does_not_depend_on_workers():
+    one, three = (simulate_joint(20_000, ages=(30, 40), seed=5, chunk_size=512, workers=workers)
+                  for workers in (1, 3))
+    np.testing.assert_array_equal(one.mean(), three.mean())
+    np.testing.assert_array_equal(one.percentiles([5, 50, 95]), three.percentiles([5, 50, 95]))
+    np.testing.assert_array_equal(one.grade_counts, three.grade_counts)
+    np.testing.assert_array_equal(one.employed_counts, three.employed_counts)
+
+
+def test_cohort_does_not_depend_on_workers():
+    one, three = (simulate_cohort(50_000, years=15, seed=1, chunk_size=4096, workers=workers)
+                  for workers in (1, 3))
+    np.testing.assert_array_equal(one.grade_counts, three.grade_counts)
+    np.testing.assert_array_equal(one.salaries, three.salaries)
+
+
+def test_tail_risk_and_crashes_do_not_depend_on_workers():
+    one, three = (simulate_tail_risk(CONTRIBUTIONS, 20_000, seed=2, chunk_size=2048, workers=workers)
+                  for workers in (1, 3))
+    np.testing.assert_array_equal(one.balances, three.balances)
+    np.testing.assert_array_equal(one.log_weights, three.log_weights)
+    one, three = (simulate_crash_statistics(5_000, n_months=120, seed=4, chunk_size=1024, workers=workers)
+                  for workers in (1, 3))
+    for key in one:
+        np.testing.assert_array_equal(one[key], three[key])
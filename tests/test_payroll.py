@@ -0,0 +1,107 @@
+# tests/test_payroll.py
+# 手取り計算の区分表を公表されている区分の境目の値と手計算の給与明細で確かめる
+
+import numpy as np
+import pytest
+
+from simcore.payroll import (PAYROLL_FIELDS, annual_take_home, apply_brackets, bracket_index,
+                             gross_for_take_home, standard_monthly_remuneration, take_home_path,
+                             take_home_pay)
+
+
+@pytest.mark.parametrize('monthly_pay, standard', [
+    # 協会けんぽの標準報酬月額表（「以上〜未満」の境目）
+    (0, 58_000), (62_999, 58_000), (63_000, 68_000), (72_999, 68_000), (73_000, 78_000),
+    (209_999, 200_000), (210_000, 220_000), (343_500, 340_000), (349_999, 340_000), (350_000, 360_000),
+    (1_354_999, 1_330_000), (1_355_000, 1_390_000), (5_000_000, 1_390_000),
+])
+def test_standard_monthly_remuneration_edges(monthly_pay, standard):
+    assert standard_monthly_remuneration(monthly_pay) == standard
+
+
+@pytest.mark.parametrize('income, deduction', [
+    # 給与所得控除（2020年分以降）
+    (1_000_000, 550_000), (1_625_000, 550_000), (1_800_000, 620_000), (3_600_000, 1_160_000),
+    (6_600_000, 1_760_000), (8_500_000, 1_950_000), (20_000_000, 1_950_000),
+])
+def test_employment_income_deduction_edges(income, deduction):
+    assert apply_brackets('employment_income_deduction', income) == pytest.approx(deduction)
+
+
+@pytest.mark.parametrize('taxable, tax', [
+    # 所得税の速算表（課税所得は1,000円未満切り捨て済み）
+    (1_000, 50), (1_949_000, 97_450), (1_950_000, 97_500), (3_299_000, 232_400), (3_300_000, 232_500),
+    (6_950_000, 962_500), (9_000_000, 1_434_000), (18_000_000, 4_404_000), (40_000_000, 13_204_000),
+])
+def test_income_tax_brackets(taxable, tax):
+    assert apply_brackets('income_tax', taxable) == pytest.approx(tax)
+
+
+@pytest.mark.parametrize('income, income_tax, resident_tax', [
+    (24_000_000, 480_000, 430_000), (24_000_001, 320_000, 290_000), (24_500_001, 160_000, 150_000),
+    (25_000_001, 0, 0),
+])
+def test_basic_deduction_edges(income, income_tax, resident_tax):
+    assert apply_brackets('income_tax_basic_deduction', income) == income_tax
+    assert apply_brackets('resident_tax_basic_deduction', income) == resident_tax
+
+
+def test_index_table_matches_searchsorted():
+    # 1,000円刻みの区分番号の表が、境目の前後でも searchsorted と同じ区分を返すか
+    from simcore.payroll import _TABLES
+    amounts = np.concatenate([np.arange(0, 50_000_000, 997.0), [1_625_000, 1_625_000.5, 1_625_001]])
+    for table in _TABLES.values():
+        np.testing.assert_array_equal(bracket_index(table, amounts),
+                                      np.searchsorted(table['bounds'], amounts, side=table['side']))
+
+
+def test_first_year_payslip():
+    # 月給343,500円（うち非課税の通勤手当4,200円）、22歳、賞与なしの1年分を手計算した値
+    payslip = take_home_pay(343_500, age=22, nontaxable=4_200)
+    assert payslip['health_insurance'] == 12 * 16_966      # 340,000 × 4.99%
+    assert payslip['nursing_care'] == 0
+    assert payslip['pension'] == 12 * 31_110               # 340,000 × 9.15%
+    assert payslip['employment_insurance'] == 12 * 2_061   # 343,500 × 0.6%
+    assert payslip['social_insurance'] == 12 * 50_137
+    assert payslip['income_tax'] == 88_500
+    assert payslip['resident_tax'] == 181_000
+    assert payslip['take_home'] == 12 * 343_500 - 12 * 50_137 - 88_500 - 181_000
+
+
+def test_nursing_care_and_bonus_caps():
+    at_39, at_40, at_65 = take_home_pay(343_500, age=[39, 40, 65])
+    assert at_39['nursing_care'] == 0 and at_65['nursing_care'] == 0
+    assert at_40['nursing_care'] == 12 * 2_720             # 340,000 × 0.8%
+    # 厚生年金の標準賞与額は1回150万円、健康保険は年度の累計573万円が上限
+    payslip = take_home_pay(500_000, bonuses=(4_000_000, 4_000_000))
+    standard = standard_monthly_remuneration(500_000)
+    assert payslip['pension'] == 12 * round(standard * 0.0915) + 2 * round(1_500_000 * 0.0915)
+    assert payslip['health_insurance'] == (12 * round(standard * 0.0499) + round(4_000_000 * 0.0499)
+                                           + round(1_730_000 * 0.0499))
+
+
+def test_vectorized_matches_scalar_and_accepts_lists():
+    salaries = [180_000, 250_000, 343_500, 600_000, 1_500_000]
+    batch = take_home_pay(salaries, bonuses=(np.array(salaries) * 2, 0.0), age=45, chunk_size=2)
+    for row, salary in zip(batch, salaries):
+        single = take_home_pay(salary, bonuses=(salary * 2, 0.0), age=45)
+        for name in PAYROLL_FIELDS:
+            assert row[name] == single[name], name
+    np.testing.assert_array_equal(standard_monthly_remuneration([300_000, 400_000]), [300_000, 410_000])
+
+
+def test_take_home_path_lags_resident_tax_and_inverts():
+    salaries = np.array([344.0, 390.0, 430.0])
+    path = take_home_path(salaries)
+    steady = take_home_pay(salaries * 10000 / 12, age=22 + np.arange(3))
+    # 1年目は住民税なし、2年目以降は前年の所得の住民税
+    assert path[0] * 10000 == pytest.approx(steady['take_home'][0] + steady['resident_tax'][0])
+    assert path[1] * 10000 == pytest.approx(steady['take_home'][1] + steady['resident_tax'][1]
+                                            - steady['resident_tax'][0])
+    # 逆算した年収は元の年収以下（等級の境目で手取りが減る区間があるので、同じ手取りになる最小の年収）で、
+    # その年収の手取りは元の手取りとほぼ同じ
+    salaries = np.array([300.0, 500.0, 800.0])
+    take_home = annual_take_home(salaries)
+    gross = gross_for_take_home(take_home)
+    assert np.all(gross <= salaries + 1e-9)
+    np.testing.assert_allclose(annual_take_home(gross), take_home, atol=0.5)
@@ -0,0 +1,91 @@
+# tests/test_probability.py
+# 目標達成確率: Wilson / Clopper–Pearson 区間の参照値、scipy がないときの不完全ベータ関数、
+# セルごとの早期打ち切り
+
+import sys
+from math import comb
+
+import numpy as np
+import pytest
+
+from simcore.annuity import balance_path
+from simcore.probability import (clopper_pearson_interval, regularized_incomplete_beta, target_probability_grid,
+                                 wilson_interval)
+
+
+@pytest.fixture
+def without_scipy(monkeypatch):
+    """scipy.special の import を失敗させて、自前の連分数・二分法の経路を通す"""
+    monkeypatch.setitem(sys.modules, 'scipy.special', None)
+
+
+def _binomial_tail(n, k, p):
+    """P(Binomial(n, p) >= k)"""
+    return sum(comb(n, j) * p ** j * (1 - p) ** (n - j) for j in range(k, n + 1))
+
+
+def test_wilson_reference_values():
+    lower, upper = wilson_interval([0, 5, 10], [10, 10, 10])
+    # k=0 の上限は z^2 / (n + z^2)、k=n の下限は n / (n + z^2)
+    np.testing.assert_allclose(lower, [0.0, 0.236593, 0.722467], atol=1e-6)
+    np.testing.assert_allclose(upper, [0.277533, 0.763407, 1.0], atol=1e-6)
+    # 中間の値では、両端がスコア検定の境界 |p̂ - p| = z sqrt(p (1 - p) / n) になっている
+    z = 1.959964
+    for bound in wilson_interval(81, 263):
+        assert abs(81 / 263 - bound) == pytest.approx(z * np.sqrt(bound * (1 - bound) / 263), rel=1e-6)
+
+
+def test_clopper_pearson_reference_values(without_scipy):
+    lower, upper = clopper_pearson_interval([0, 5, 10], [10, 10, 10])
+    # k=0 の上限は 1 - (α/2)^(1/n)、k=n の下限は (α/2)^(1/n)
+    np.testing.assert_allclose(lower, [0.0, 0.187086, 0.025 ** 0.1], atol=1e-6)
+    np.testing.assert_allclose(upper, [1 - 0.025 ** 0.1, 0.812914, 1.0], atol=1e-6)
+    # 中間の値では、両端で二項分布の片側確率がちょうど α/2
+    lower, upper = clopper_pearson_interval(81, 263)
+    assert _binomial_tail(263, 81, float(lower)) == pytest.approx(0.025, rel=1e-6)
+    assert 1 - _binomial_tail(263, 82, float(upper)) == pytest.approx(0.025, rel=1e-6)
+    # 正確区間は Wilson 区間より保守的
+    wilson_lower, wilson_upper = wilson_interval(81, 263)
+    assert lower < wilson_lower and upper > wilson_upper
+
+
+def test_incomplete_beta_fallback_matches_binomial_tail(without_scipy):
+    # 整数の a, b では I_x(k, n-k+1) = P(Binomial(n, x) >= k)
+    n, x = 30, np.array([0.05, 0.3, 0.5, 0.71, 0.97])
+    for k in (1, 4, 15, 29, 30):
+        tail = [_binomial_tail(n, k, p) for p in x]
+        np.testing.assert_allclose(regularized_incomplete_beta(k, n - k + 1, x), tail, rtol=1e-10, atol=1e-14)
+    np.testing.assert_array_equal(regularized_incomplete_beta(2.0, 3.0, [0.0, 1.0]), [0.0, 1.0])
+
+
+def test_fallback_agrees_with_scipy(monkeypatch):
+    stats = pytest.importorskip('scipy.stats')
+    successes, trials = np.array([0, 3, 50, 199, 200]), np.array([200, 200, 200, 200, 200])
+    reference_lower = np.where(successes > 0, stats.beta.ppf(0.025, successes, trials - successes + 1), 0.0)
+    reference_upper = np.where(successes < trials, stats.beta.ppf(0.975, successes + 1, trials - successes), 1.0)
+    monkeypatch.setitem(sys.modules, 'scipy.special', None)
+    lower, upper = clopper_pearson_interval(successes, trials)
+    np.testing.assert_allclose(lower, reference_lower, atol=1e-9)
+    np.testing.assert_allclose(upper, reference_upper, atol=1e-9)
+
+
+def test_cells_stop_independently():
+    monthly = np.full(120, 5.0)
+    median = balance_path(5.0, 0.05, 120, step=12)[-1]
+    targets = [0.0, median, 1e9]
+    grid = target_probability_grid(monthly, targets, [10], max_paths=200000, seed=7, batch_size=1024,
+                                   ci_width=0.05, by_year=False)
+    trials = grid.trials[:, 0]
+    # 必ず届く・決して届かないセルは最初のバッチで止まり、確率が 0.5 前後のセルだけ続く
+    np.testing.assert_array_equal(trials[[0, 2]], [1024, 1024])
+    assert trials[1] > 1024 and trials[1] % 1024 == 0
+    assert trials[1] < 200000
+    np.testing.assert_array_equal(grid.probability()[[0, 2], 0], [1.0, 0.0])
+    assert np.all(grid.width() <= 0.05)
+
+
+def test_grid_validates_arguments():
+    with pytest.raises(ValueError):
+        target_probability_grid(np.ones(24), [100], [3])
+    with pytest.raises(ValueError):
+        target_probability_grid(np.ones(24), [100], [2], interval='jeffreys')
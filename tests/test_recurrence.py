@@ -0,0 +1,52 @@
+# tests/test_recurrence.py
+# 倍々スキャンの漸化式ソルバーが素朴なループと一致するか
+
+import numpy as np
+import pytest
+
+from simcore.recurrence import returns_from_prices, solve_linear_recurrence
+
+
+def loop_recurrence(returns, contributions, initial=0.0):
+    balance, history = initial, []
+    for r, c in zip(returns, contributions):
+        balance = balance * (1 + r) + c
+        history.append(balance)
+    return np.array(history)
+
+
+@pytest.mark.parametrize('n_periods', [1, 2, 3, 7, 8, 9, 480])
+def test_matches_loop_for_random_paths(n_periods):
+    rng = np.random.default_rng(n_periods)
+    returns = rng.normal(0.004, 0.04, (5, n_periods))
+    contributions = rng.uniform(0, 10, (5, n_periods))
+    initial = rng.uniform(0, 100, 5)
+    result = solve_linear_recurrence(returns, contributions, initial)
+    for row in range(5):
+        np.testing.assert_allclose(result[row], loop_recurrence(returns[row], contributions[row], initial[row]),
+                                   rtol=1e-12)
+
+
+def test_broadcasts_scenarios_and_axis():
+    # (2シナリオ) × 期間、期間を先頭の軸に置いた場合も同じ
+    returns = np.array([[0.05], [0.0]])
+    contributions = np.full(30, 12.0)
+    result = solve_linear_recurrence(returns, contributions)
+    np.testing.assert_allclose(result[0], loop_recurrence(np.full(30, 0.05), contributions), rtol=1e-12)
+    np.testing.assert_allclose(result[1], np.cumsum(contributions))
+    transposed = solve_linear_recurrence(returns.T, contributions[:, None], axis=0)
+    np.testing.assert_allclose(transposed.T, result)
+
+
+def test_total_loss_resets_balance():
+    # -100% の期で残高は0になり、以後はその後の積立だけが残る（割り算をしないので nan にならない）
+    returns = np.array([0.1, -1.0, 0.1, 0.1])
+    result = solve_linear_recurrence(returns, np.ones(4), initial=50.0)
+    np.testing.assert_allclose(result, loop_recurrence(returns, np.ones(4), 50.0))
+    assert result[1] == 1.0
+
+
+def test_returns_from_prices():
+    np.testing.assert_allclose(returns_from_prices([100, 110, 99]), [0.0, 0.1, -0.1])
+    prices = np.array([[100, 200], [150, 100]])
+    np.testing.assert_allclose(returns_from_prices(prices, axis=0), [[0, 0], [0.5, -0.5]])
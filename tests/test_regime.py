@@ -0,0 +1,66 @@
+# tests/test_regime.py
+# レジームスイッチング: 局面の占有率が定常分布に収束するか、暴落の時期・深さ・回復期間の集計
+
+import numpy as np
+import pytest
+
+from simcore.regime import (DEFAULT_REGIMES, RegimeModel, crash_statistics, sample_regime_paths,
+                            simulate_crash_statistics)
+
+
+def test_stationary_distribution_two_state_closed_form():
+    model = RegimeModel(('up', 'down'), ((0.9, 0.1), (0.3, 0.7)), (0.1, -0.1), (0.1, 0.2))
+    # 2局面なら π = (q, p) / (p + q)（p, q は局面を抜ける確率）
+    np.testing.assert_allclose(model.stationary_distribution(), [0.75, 0.25])
+    np.testing.assert_allclose(model.expected_duration(), [10, 10 / 3])
+    assert model.long_run_return() == pytest.approx(0.05)
+    with pytest.raises(ValueError):
+        RegimeModel(('a', 'b'), ((0.9, 0.2), (0.3, 0.7)), (0, 0), (0, 0)).transition_matrix()
+
+
+def test_state_occupancy_converges_to_stationary_distribution():
+    states, returns = sample_regime_paths(DEFAULT_REGIMES, np.random.default_rng(0), 4000, 600)
+    stationary = DEFAULT_REGIMES.stationary_distribution()
+    np.testing.assert_allclose(stationary @ DEFAULT_REGIMES.transition_matrix(), stationary)
+    # 強気相場から始めても、後半の月の局面の割合は定常分布に近づく
+    occupancy = np.bincount(states[:, 300:].ravel(), minlength=3) / states[:, 300:].size
+    np.testing.assert_allclose(occupancy, stationary, atol=0.01)
+    assert np.all(states[:, 0] == 0)
+    # 局面ごとの月次リターンの平均は年率 / 12
+    for state, mean in enumerate(DEFAULT_REGIMES.mean):
+        assert returns[states == state].mean() == pytest.approx(mean / 12, abs=0.002)
+
+
+def test_one_step_transitions_match_matrix():
+    states, _ = sample_regime_paths(DEFAULT_REGIMES, np.random.default_rng(1), 3000, 400)
+    pairs = states[:, :-1].astype(int) * 3 + states[:, 1:]
+    counts = np.bincount(pairs.ravel(), minlength=9).reshape(3, 3)
+    np.testing.assert_allclose(counts / counts.sum(axis=1, keepdims=True), DEFAULT_REGIMES.transition_matrix(),
+                               atol=0.01)
+
+
+def test_crash_timing_matches_markov_chain():
+    n_months = 120
+    stats = simulate_crash_statistics(40000, n_months=n_months, seed=2, chunk_size=8192)
+    # 暴落局面を吸収状態にした連鎖で「t か月目までに暴落に入っていない」確率を求める
+    matrix = DEFAULT_REGIMES.transition_matrix()
+    distribution = np.asarray(DEFAULT_REGIMES.initial, dtype=float)
+    no_crash = []
+    for _ in range(n_months):
+        no_crash.append(distribution[:2].sum())
+        distribution = distribution[:2] @ matrix[:2]
+        distribution = np.concatenate([distribution[:2], [0.0]])
+    timing = stats['timing']
+    empirical = [(timing == -1).mean() + (timing > t).mean() for t in range(n_months)]
+    np.testing.assert_allclose(empirical, no_crash, atol=0.01)
+
+
+def test_crash_statistics_by_hand():
+    # 指数 1 → 1.1 → 0.55 → 0.66 → 1.32：1か月目の高値から50%下落、2か月目が底、4か月目に回復
+    returns = np.array([[0.1, -0.5, 0.2, 1.0], [0.1, 0.1, -0.1, 0.0]])
+    states = np.array([[0, 2, 1, 0], [0, 0, 1, 1]])
+    stats = crash_statistics(returns, states, crash_state=2)
+    np.testing.assert_allclose(stats['depth'], [-50.0, -10.0])
+    np.testing.assert_array_equal(stats['trough'], [2, 3])
+    assert stats['recovery'][0] == 2 and np.isnan(stats['recovery'][1])
+    np.testing.assert_array_equal(stats['timing'], [1, -1])
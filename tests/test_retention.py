@@ -0,0 +1,108 @@
+# tests/test_retention.py
+# 残存率の推定（カプラン・マイヤー、ワイブル、区分指数）を教科書の例と既知の分布で確かめる
+
+import numpy as np
+import pytest
+
+from simcore.cohort import DEFAULT_COHORT_MODEL
+from simcore.retention import (TenureRecords, cohort_model_from_survival, fit_by_tier,
+                               fit_piecewise_exponential, fit_weibull, kaplan_meier)
+
+# Freireich ほか（1963）の白血病寛解期間データの 6-MP 群（週、event=0 は打ち切り）
+SIX_MP_TIMES = [6, 6, 6, 6, 7, 9, 10, 10, 11, 13, 16, 17, 19, 20, 22, 23, 25, 32, 32, 34, 35]
+SIX_MP_EVENTS = [1, 1, 1, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0]
+# 教科書・R の survfit(conf.type='log-log') の値：時点, 生存率, 95%信頼区間
+SIX_MP_TABLE = [
+    (6, 0.8571, 0.620, 0.952),
+    (7, 0.8067, 0.563, 0.923),
+    (10, 0.7529, 0.503, 0.889),
+    (13, 0.6902, 0.432, 0.849),
+    (16, 0.6275, 0.368, 0.805),
+    (22, 0.5378, 0.268, 0.747),
+    (23, 0.4482, 0.188, 0.680),
+]
+
+
+def test_kaplan_meier_textbook_example():
+    curve = kaplan_meier(SIX_MP_TIMES, SIX_MP_EVENTS)
+    for t, survival, lower, upper in SIX_MP_TABLE:
+        assert curve.survival(t) == pytest.approx(survival, abs=5e-5)
+        band = curve.confidence_band(t)
+        assert band[0] == pytest.approx(lower, abs=5e-4)
+        assert band[1] == pytest.approx(upper, abs=5e-4)
+    # 最初の退職より前は1、打ち切りだけの時点では下がらない、最後の観測以降は一定
+    assert curve.survival(5.9) == 1.0
+    assert curve.survival(9) == curve.survival(7)
+    assert curve.survival(100) == pytest.approx(0.4482, abs=5e-5)
+    np.testing.assert_array_equal(curve.at_risk[:4], [21, 17, 16, 15])
+
+
+def test_kaplan_meier_without_censoring_is_empirical_survival():
+    tenure = np.array([1, 2, 2, 3, 5, 8])
+    curve = kaplan_meier(tenure, np.ones(6))
+    for t in (0, 1, 2, 4, 5, 8):
+        assert curve.survival(t) == pytest.approx(np.mean(tenure > t))
+
+
+def sample_weibull(n, scale, shape, censor_at, seed):
+    rng = np.random.default_rng(seed)
+    exits = scale * rng.weibull(shape, n)
+    censor = rng.uniform(0, censor_at, n)
+    return np.minimum(exits, censor), exits <= censor
+
+
+def test_weibull_recovers_parameters():
+    tenure, event = sample_weibull(200_000, scale=12.0, shape=0.8, censor_at=30, seed=0)
+    fit = fit_weibull(tenure, event)
+    log_scale_se, log_shape_se = np.sqrt(np.diag(fit.covariance))
+    assert abs(np.log(fit.scale / 12.0)) < 4 * log_scale_se
+    assert abs(np.log(fit.shape / 0.8)) < 4 * log_shape_se
+    lower, upper = fit.confidence_band(np.array([1.0, 5.0, 20.0]))
+    truth = np.exp(-(np.array([1.0, 5.0, 20.0]) / 12.0) ** 0.8)
+    assert np.all((lower <= truth) & (truth <= upper))
+
+
+def test_weibull_is_a_likelihood_maximum():
+    tenure, event = sample_weibull(2_000, scale=5.0, shape=1.5, censor_at=10, seed=1)
+    fit = fit_weibull(tenure, event)
+
+    def log_likelihood(scale, shape):
+        z = tenure / scale
+        return (event * (np.log(shape / scale) + (shape - 1) * np.log(z))).sum() - (z ** shape).sum()
+
+    assert log_likelihood(fit.scale, fit.shape) == pytest.approx(fit.log_likelihood, rel=1e-9)
+    for d_scale, d_shape in ((1e-3, 0), (-1e-3, 0), (0, 1e-3), (0, -1e-3)):
+        assert log_likelihood(fit.scale * (1 + d_scale), fit.shape * (1 + d_shape)) < fit.log_likelihood
+
+
+def test_piecewise_exponential_hand_computed():
+    # 区分 [0, 2) と [2, ∞)：延べ在籍年数は 1+2+2+2 = 7 と 0+0+1+3 = 4
+    fit = fit_piecewise_exponential([1, 2, 3, 5], [1, 0, 1, 0], breaks=(0, 2))
+    np.testing.assert_allclose(fit.exposure, [7, 4])
+    np.testing.assert_array_equal(fit.events, [1, 1])
+    np.testing.assert_allclose(fit.rates, [1 / 7, 1 / 4])
+    assert fit.survival(3) == pytest.approx(np.exp(-2 / 7 - 1 / 4))
+
+
+def test_constant_hazard_gives_constant_attrition():
+    rng = np.random.default_rng(2)
+    exits = rng.exponential(1 / 0.1, 200_000)
+    censor = rng.uniform(0, 40, exits.size)
+    tenure, event = np.minimum(exits, censor), exits <= censor
+    expected = 1 - np.exp(-0.1)
+    for fit in (kaplan_meier, fit_weibull, fit_piecewise_exponential):
+        np.testing.assert_allclose(fit(tenure, event).annual_attrition(10), expected, atol=0.01)
+
+
+def test_fit_by_tier_feeds_cohort_model():
+    tenure, event = sample_weibull(20_000, scale=10.0, shape=1.0, censor_at=30, seed=3)
+    tiers = np.array(['upper', 'standard'])[np.arange(tenure.size) % 2]
+    curves = fit_by_tier(TenureRecords(tenure, event, tiers), 'piecewise')
+    assert sorted(curves) == ['standard', 'upper']
+    model = cohort_model_from_survival(curves, DEFAULT_COHORT_MODEL)
+    attrition = model.attrition_matrix()
+    for tier, curve in curves.items():
+        np.testing.assert_allclose(attrition[model.tiers.index(tier)], curve.annual_attrition(attrition.shape[1]))
+    # 記録のない層は元のモデルの離職率のまま
+    lower = model.tiers.index('lower')
+    np.testing.assert_array_equal(attrition[lower], DEFAULT_COHORT_MODEL.attrition_matrix()[lower])
@@ -0,0 +1,82 @@
+# tests/test_salary.py
+# 昇格テーブル（searchsorted）が各スクリプトにあった if の連鎖と同じ年収を返すか
+
+import numpy as np
+import pytest
+
+from simcore.salary import GRADES, GradeLadderTable, get_grade_and_salary, grade_ladder_salaries
+
+
+def old_grade_and_salary(years_of_service):
+    """rg_grapg.py の get_grade_and_salary()（勤続年数は1始まり）"""
+    for limit, grade, salary in ((1, 'B2', 340), (2, 'B1', 390), (3, 'P4', 430), (4, 'P3', 480),
+                                 (5, 'P2', 520), (6, 'P1', 590), (7, 'M3', 700), (8, 'M2', 800),
+                                 (9, 'M1', 900), (10, 'D3', 980), (15, 'D2', 1100)):
+        if years_of_service <= limit:
+            return grade, salary
+    return 'D1', 1300
+
+
+def old_path(starts, salaries, year):
+    """create_fig8 / create_fig16 の「year < しきい値 なら年収」の連鎖"""
+    for start, salary in zip(starts, salaries):
+        if year < start:
+            return salary
+    return salaries[-1]
+
+
+OLD_PATHS = {
+    'top': ((3, 5, 7, 10, 13, 17, 22, 27, 32), (340, 390, 480, 520, 590, 700, 800, 900, 980, 1100)),
+    'standard': ((3, 6, 9, 13, 17, 22, 28, 35), (340, 390, 430, 480, 520, 590, 700, 800, 900)),
+    'conservative': ((4, 8, 13, 18, 25, 35), (340, 390, 430, 480, 520, 590, 700)),
+    # create_fig16 は年齢（22歳入社）で分けていたので勤続年数に直したしきい値
+    'seminar': ((3, 6, 9, 13, 17, 22, 28, 35), (344, 390, 430, 480, 520, 590, 700, 800, 900)),
+}
+TENURE = np.arange(0, 61)
+
+
+@pytest.mark.parametrize('name', sorted(OLD_PATHS))
+def test_ladders_match_old_if_chains(name):
+    expected = [old_path(*OLD_PATHS[name], year) for year in TENURE]
+    np.testing.assert_array_equal(grade_ladder_salaries(name, TENURE), expected)
+
+
+def test_seminar_ladder_matches_age_based_chain():
+    ages = TENURE + 22
+    expected = [old_path((25, 28, 31, 35, 39, 44, 50, 57), OLD_PATHS['seminar'][1], age) for age in ages]
+    np.testing.assert_array_equal(grade_ladder_salaries('seminar', ages - 22), expected)
+
+
+def test_get_grade_and_salary_matches_old_function():
+    years = np.arange(1, 51)
+    grades, salaries = get_grade_and_salary(years)
+    expected = [old_grade_and_salary(year) for year in years]
+    assert list(grades) == [grade for grade, _ in expected]
+    np.testing.assert_array_equal(salaries, [salary for _, salary in expected])
+    # スカラーなら従来どおり (str, int)
+    assert get_grade_and_salary(12) == ('D2', 1100)
+    assert isinstance(get_grade_and_salary(1)[0], str)
+
+
+def test_table_lookup_mixes_paths_in_one_call():
+    table = GradeLadderTable()
+    names = ['top', 'standard', 'conservative']
+    grade_index, salaries = table.lookup(np.array(names)[:, None], TENURE)
+    for row, name in enumerate(names):
+        np.testing.assert_array_equal(salaries[row], grade_ladder_salaries(name, TENURE))
+    # 番号で指定しても同じ、グレード番号は GRADES の位置
+    np.testing.assert_array_equal(table.lookup(table.path_index(names)[:, None], TENURE)[1], salaries)
+    assert GRADES[grade_index[0, 0]] == 'B2' and GRADES[grade_index[0, -1]] == 'D2'
+
+
+def test_table_rejects_unknown_paths():
+    table = GradeLadderTable()
+    np.testing.assert_array_equal(table.path_index(['seminar', 'early']), [4, 0])
+    with pytest.raises(KeyError):
+        table.path_index(['zzz', 'aaa'])
+    with pytest.raises(KeyError):
+        table.lookup(['standard', 'zzz'], 5)
+    with pytest.raises(ValueError):
+        table.path_index([0, len(table.names)])
+    with pytest.raises(ValueError):
+        table.lookup(-1, 5)
@@ -0,0 +1,50 @@
+# tests/test_sensitivity.py
+# 感度分析のキューブが図19の年次ループと一致し、分割して計算しても結果が変わらないか
+
+import numpy as np
+import pytest
+
+from simcore.sensitivity import SENSITIVITY_AXES, evaluate_cube, final_assets
+
+
+def loop_final_assets(annual_return, monthly, years, fee=0.0, inflation=0.0, tax_rate=0.0):
+    total = 0.0
+    net_return = (1 + annual_return) * (1 - fee) - 1
+    for _ in range(years):
+        total = total * (1 + net_return) + monthly * 12
+    gain = max(total - monthly * 12 * years, 0)
+    return (total - tax_rate * gain) / (1 + inflation) ** years
+
+
+def test_fig19_grid_matches_yearly_loop():
+    returns = np.arange(3, 8) / 100
+    monthly = np.arange(3, 8) * 10000
+    cube = evaluate_cube(annual_return=returns, monthly=monthly)
+    plane = cube.plane('annual_return', 'monthly')
+    for i, rate in enumerate(returns):
+        for j, amount in enumerate(monthly):
+            assert plane[i, j] == pytest.approx(loop_final_assets(rate, amount, 43), rel=1e-12)
+
+
+def test_fee_tax_inflation_and_horizon():
+    value = final_assets(0.06, 30000, start_age=30, horizon=20, fee=0.002, inflation=0.01, tax_rate=0.20315)
+    assert value == pytest.approx(loop_final_assets(0.06, 30000, 20, 0.002, 0.01, 0.20315), rel=1e-12)
+    # 投資期間は65歳で打ち切り、65歳以降に始めると0
+    assert final_assets(0.05, 10000, 60, np.inf, 0, 0, 0) == pytest.approx(loop_final_assets(0.05, 10000, 5))
+    assert final_assets(0.05, 10000, 70, np.inf, 0, 0, 0) == 0
+
+
+def test_chunked_evaluation_matches_single_pass():
+    axes = {'annual_return': np.linspace(0.0, 0.08, 5), 'monthly': [10000, 50000], 'start_age': [22, 30, 40],
+            'fee': [0.0, 0.01], 'tax_rate': [0.0, 0.2]}
+    whole = evaluate_cube(**axes)
+    chunked = evaluate_cube(memory_budget=1000, **axes)
+    assert whole.values.shape == tuple(len(whole.axes[name]) for name in SENSITIVITY_AXES)
+    np.testing.assert_array_equal(whole.values, chunked.values)
+    assert whole.lookup(annual_return=0.04, monthly=50000, start_age=30) == pytest.approx(
+        final_assets(0.04, 50000, 30, np.inf, 0, 0, 0))
+
+
+def test_unknown_axis_is_rejected():
+    with pytest.raises(ValueError):
+        evaluate_cube(salary=[1, 2])
@@ -0,0 +1,48 @@
+# tests/test_sketch.py
+# ストリーミング集計: 分位点スケッチとモーメントを全データの numpy 計算と比べる
+
+import numpy as np
+
+from simcore.sketch import QuantileSketch, RunningMoments
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    return np.concatenate([rng.lognormal(3, 1, (40000, 4)), -rng.lognormal(1, 1, (8000, 4)),
+                           np.zeros((2000, 4))])
+
+
+def test_quantiles_within_relative_accuracy():
+    x = _data()
+    sketch = QuantileSketch(4, relative_accuracy=0.005)
+    for part in np.array_split(x, 7):
+        sketch.add(part)
+    q = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+    exact = np.quantile(x, q, axis=0)
+    # ゼロの塊に当たる分位点はちょうど 0、それ以外は相対誤差 relative_accuracy 以内（補間の差の分だけ余裕を見る）
+    estimate = sketch.quantiles(q)
+    np.testing.assert_allclose(estimate, exact, rtol=0.011, atol=1e-9)
+    assert sketch.count == len(x)
+
+
+def test_merge_equals_single_pass():
+    x = _data()
+    whole, left, right = QuantileSketch(4), QuantileSketch(4), QuantileSketch(4)
+    whole.add(x)
+    left.add(x[:17000])
+    right.add(x[17000:])
+    left.merge(right)
+    np.testing.assert_array_equal(left.quantiles([0.1, 0.5, 0.9]), whole.quantiles([0.1, 0.5, 0.9]))
+    np.testing.assert_allclose(left.moments.mean, x.mean(axis=0), rtol=1e-12)
+
+
+def test_running_moments_match_numpy():
+    x = _data()
+    moments = RunningMoments(4)
+    for part in np.array_split(x, 5):
+        moments.add(part)
+    np.testing.assert_allclose(moments.mean, x.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(moments.std(), x.std(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(moments.std(ddof=1), x.std(axis=0, ddof=1), rtol=1e-10)
+    np.testing.assert_array_equal(moments.min, x.min(axis=0))
+    np.testing.assert_array_equal(moments.max, x.max(axis=0))
@@ -0,0 +1,64 @@
+# tests/test_sweep.py
+# 人事施策のスイープ: 表の行数と列、ワーカー数によらない結果、CSV の書き出し
+
+import numpy as np
+import pytest
+
+from simcore.calibration import apply_multipliers
+from simcore.cohort import DEFAULT_COHORT_MODEL
+from simcore.organization import project_organization
+from simcore.salary import GRADES
+from simcore.sweep import policy_grid, sweep_policies, write_sweep_csv
+
+COLUMNS = ['policy', 'hiring', 'promotion', 'attrition', 'year'] + GRADES + ['headcount', 'payroll', 'manager_ratio']
+
+
+def test_table_shape_and_columns():
+    policies = policy_grid(hiring=(54, 80), promotion=(0.8, 1.0, 1.2), attrition=(1.0, 1.5))
+    assert len(policies) == 12
+    table = sweep_policies(policies, years=10, batch_size=5)
+    assert list(table) == COLUMNS
+    assert all(len(column) == 12 * 11 for column in table.values())
+    np.testing.assert_array_equal(table['policy'][:12], [0] * 11 + [1])
+    np.testing.assert_array_equal(table['year'][:12], list(range(11)) + [0])
+    np.testing.assert_allclose(sum(table[grade] for grade in GRADES), table['headcount'])
+
+
+def test_rows_match_single_projection():
+    table = sweep_policies([(54, 0.8, 1.2)], years=6, promotion_levels=('Manager (M1-M3)',))
+    model = apply_multipliers(DEFAULT_COHORT_MODEL, (1.0, 0.8, 1.0, 1.0), (1.2, 1.2, 1.2))
+    projection = project_organization(54, 6, model)
+    np.testing.assert_allclose(table['headcount'], projection.headcount())
+    np.testing.assert_allclose(table['payroll'], projection.payroll())
+    managers = projection.level_counts()['Manager (M1-M3)']
+    np.testing.assert_allclose(table['manager_ratio'], managers / projection.headcount())
+
+
+def test_workers_do_not_change_results():
+    policies = policy_grid(hiring=(40, 54, 80), promotion=(0.9, 1.1), attrition=(0.8, 1.0, 1.2))
+    one = sweep_policies(policies, years=8, workers=1, batch_size=4)
+    two = sweep_policies(policies, years=8, workers=2, batch_size=4)
+    assert list(one) == list(two)
+    for name in one:
+        np.testing.assert_array_equal(one[name], two[name])
+
+
+def test_csv_round_trip(tmp_path):
+    table = sweep_policies(policy_grid(promotion=(0.8, 1.0)), years=4)
+    path = tmp_path / 'sweep.csv'
+    write_sweep_csv(table, str(path))
+    with open(path, encoding='utf-8') as f:
+        assert f.readline().strip().split(',') == COLUMNS
+    data = np.loadtxt(path, delimiter=',', skiprows=1)
+    assert data.shape == (4 * 5, len(COLUMNS))
+    for i, name in enumerate(COLUMNS):
+        # %.6g なので有効数字6桁
+        np.testing.assert_allclose(data[:, i], table[name], rtol=5e-6, atol=1e-9)
+    np.testing.assert_array_equal(data[:, 0], table['policy'])
+    np.testing.assert_array_equal(data[:, 4], table['year'])
+
+
+def test_policy_grid_and_empty_sweep():
+    assert policy_grid((1,), (2, 3), (4,)) == [(1, 2, 4), (1, 3, 4)]
+    with pytest.raises(ValueError):
+        sweep_policies([], years=3)
@@ -0,0 +1,45 @@
+# tests/test_tail_risk.py
+# 重点サンプリングの VaR / CVaR が解析解と普通のモンテカルロに一致するか
+
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from simcore.tail_risk import simulate_tail_risk
+
+N_MONTHS = 120
+MONTHLY_VOL = 0.15 / np.sqrt(12)
+DRIFT = np.log1p(0.05 / 12) - MONTHLY_VOL ** 2 / 2
+
+
+@pytest.mark.parametrize('level', [0.01, 0.001])
+def test_lump_sum_matches_lognormal_closed_form(level):
+    # 積立なし・元本100だけなら最終残高は対数正規分布なので VaR / CVaR は閉形式
+    z = NormalDist().inv_cdf(level)
+    spread = np.sqrt(N_MONTHS) * MONTHLY_VOL
+    var = 100 * np.exp(N_MONTHS * DRIFT + spread * z)
+    cvar = 100 * np.exp(N_MONTHS * DRIFT + spread ** 2 / 2) * NormalDist().cdf(z - spread) / level
+    result = simulate_tail_risk(np.zeros(N_MONTHS), 20_000, tilt=level, seed=0, initial=100.0)
+    assert result.value_at_risk(level) == pytest.approx(var, rel=0.01)
+    assert result.conditional_value_at_risk(level) == pytest.approx(cvar, rel=0.01)
+    probability, error = result.probability_below(var)
+    assert abs(probability - level) < 4 * error
+
+
+def test_importance_sampling_matches_brute_force():
+    contributions = np.full(N_MONTHS, 5.0)
+    brute = simulate_tail_risk(contributions, 400_000, tilt=0, seed=1)
+    tilted = simulate_tail_risk(contributions, 50_000, tilt=0.01, seed=2)
+    assert tilted.value_at_risk(0.01) == pytest.approx(brute.value_at_risk(0.01), rel=0.01)
+    assert tilted.conditional_value_at_risk(0.01) == pytest.approx(brute.conditional_value_at_risk(0.01), rel=0.01)
+    assert tilted.value_at_risk(0.001) == pytest.approx(brute.value_at_risk(0.001), rel=0.02)
+    # 同じ経路数なら重点サンプリングの方が下位1%に入る経路がずっと多い
+    assert np.mean(tilted.balances <= tilted.value_at_risk(0.01)) > 0.2
+
+
+def test_no_tilt_is_plain_monte_carlo():
+    result = simulate_tail_risk(np.full(N_MONTHS, 5.0), 10_000, tilt=0, seed=3)
+    np.testing.assert_array_equal(result.weights(), 1.0)
+    assert result.effective_sample_size() == pytest.approx(10_000)
+    assert result.value_at_risk(0.01) == np.sort(result.balances)[99]
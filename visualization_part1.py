@@ -9,20 +9,14 @@ from matplotlib import font_manager
 import warnings
 warnings.filterwarnings('ignore')
 
-# 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['MS Gothic']
-plt.rcParams['axes.unicode_minus'] = False
+from simcore import PAYROLL_FIELDS, GradeLadderTable, solve_linear_recurrence, take_home_pay
+from simcore.plotting import COLORS, setup_japanese_font
 
+# 日本語フォント設定
+setup_japanese_font(['MS Gothic'])
 
-# カラーパレット設定
-colors = {
-    'primary': '#2E86AB',
-    'secondary': '#A23B72',
-    'accent': '#F18F01',
-    'positive': '#2ECC71',
-    'negative': '#E74C3C',
-    'neutral': '#95A5A6'
-}
+# カラーパレット設定（simcore.plotting 共通）
+colors = COLORS
 
 # 図を保存するディレクトリ
 import os
@@ -37,29 +31,10 @@ def create_fig1():
     monthly_investment = 30000  # 月3万円
     annual_return = 0.05  # 年率5%
     
-    # 22歳開始
-    age_22 = []
-    total = 0
-    for year in years:
-        if year <= 43:
-            total = total * (1 + annual_return) + monthly_investment * 12
-        age_22.append(total / 10000)  # 万円単位
-    
-    # 32歳開始
-    age_32 = []
-    total = 0
-    for year in years:
-        if 10 <= year <= 43:
-            total = total * (1 + annual_return) + monthly_investment * 12
-        age_32.append(total / 10000)
-    
-    # 42歳開始
-    age_42 = []
-    total = 0
-    for year in years:
-        if 20 <= year <= 43:
-            total = total * (1 + annual_return) + monthly_investment * 12
-        age_42.append(total / 10000)
+    # 22歳・32歳・42歳開始（開始前の積立額を0として一度に計算）
+    start_years = np.array([0, 10, 20])[:, np.newaxis]
+    contributions = np.where(years >= start_years, monthly_investment * 12, 0)
+    age_22, age_32, age_42 = solve_linear_recurrence(annual_return, contributions) / 10000  # 万円単位
     
     # プロット
     ages = 22 + years
@@ -172,6 +147,16 @@ def create_fig3():
     plt.savefig('figures/fig03_retirement_funds.png', dpi=300, bbox_inches='tight')
     plt.close()
 
+# 新卒1年目の給与明細（総支給額と、そのうち非課税の通勤手当、円）
+MONTHLY_GROSS = 343500
+COMMUTING_ALLOWANCE = 4200
+
+
+def monthly_payslip():
+    """図4・図5の給与明細（simcore.payroll で計算した年額を12か月で割った月額、円）"""
+    payslip = take_home_pay(MONTHLY_GROSS, age=22, nontaxable=COMMUTING_ALLOWANCE)
+    return {name: int(round(float(payslip[name]) / 12)) for name in PAYROLL_FIELDS}
+
 # ========== 図4: 給与明細の詳細解説図 ==========
 def create_fig4():
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
@@ -185,9 +170,11 @@ def create_fig4():
                                            startangle=90, textprops={'fontsize': 11})
     ax1.set_title('総支給額 343,500円の内訳', fontsize=14)
     
-    # 右側：手取り計算
+    # 右側：手取り計算（社会保険料は健康保険・厚生年金・雇用保険、税は年額の月割り）
+    payslip = monthly_payslip()
     categories = ['総支給額', '社会保険料', '所得税', '住民税', '手取り額']
-    values = [343500, -25000, -12000, -12059, 294441]
+    values = [payslip['gross'], -payslip['social_insurance'], -payslip['income_tax'], -payslip['resident_tax'],
+              payslip['take_home']]
     colors2 = [colors['positive'], colors['negative'], colors['negative'], colors['negative'], colors['primary']]
     
     bars = ax2.bar(categories, values, color=colors2, alpha=0.7)
@@ -201,7 +188,7 @@ def create_fig4():
     ax2.axhline(y=0, color='black', linewidth=0.5)
     ax2.set_ylabel('金額（円）', fontsize=14)
     ax2.set_title('総支給額から手取り額への計算', fontsize=14)
-    ax2.set_ylim(-50000, 400000)
+    ax2.set_ylim(-80000, 400000)
     
     plt.suptitle('図4: 給与明細の詳細解説', fontsize=16)
     plt.tight_layout()
@@ -213,17 +200,18 @@ def create_fig5():
     # サンキーダイアグラムの代わりに、フロー図風の可視化
     fig, ax = plt.subplots(figsize=(14, 10))
     
-    # 手取り額
-    take_home = 294441
+    # 手取り額（図4の給与明細）
+    take_home = monthly_payslip()['take_home']
     
-    # 配分
+    # 配分（投資は手取りから他の支出を引いた残り）
     categories = {
         '生活費': {'amount': 176000, 'color': colors['primary'], 'items': ['家賃: 120,000', '食費: 40,000', '光熱費: 16,000']},
         '自己投資': {'amount': 29000, 'color': colors['secondary'], 'items': ['書籍: 10,000', 'セミナー: 10,000', '資格: 9,000']},
         '娯楽・交際': {'amount': 29000, 'color': colors['accent'], 'items': ['飲み会: 15,000', '趣味: 14,000']},
         '緊急予備': {'amount': 15000, 'color': colors['neutral'], 'items': ['予備費: 15,000']},
-        '投資': {'amount': 45441, 'color': colors['positive'], 'items': ['NISA: 45,441']}
     }
+    investment = take_home - sum(cat['amount'] for cat in categories.values())
+    categories['投資'] = {'amount': investment, 'color': colors['positive'], 'items': [f'NISA: {investment:,}']}
     
     # メインの棒グラフ
     y_pos = np.arange(len(categories))
@@ -344,72 +332,9 @@ def create_fig8():
     ages = np.arange(22, 66)
     years_exp = ages - 22
     
-    # 上位20%パス（早期昇進）
-    top_path = []
-    for year in years_exp:
-        if year < 3:
-            salary = 340  # B2
-        elif year < 5:
-            salary = 390  # B1
-        elif year < 7:
-            salary = 480  # P3
-        elif year < 10:
-            salary = 520  # P2
-        elif year < 13:
-            salary = 590  # P1
-        elif year < 17:
-            salary = 700  # M3
-        elif year < 22:
-            salary = 800  # M2
-        elif year < 27:
-            salary = 900  # M1
-        elif year < 32:
-            salary = 980  # D3
-        else:
-            salary = 1100  # D2
-        top_path.append(salary)
-    
-    # 標準パス
-    standard_path = []
-    for year in years_exp:
-        if year < 3:
-            salary = 340  # B2
-        elif year < 6:
-            salary = 390  # B1
-        elif year < 9:
-            salary = 430  # P4
-        elif year < 13:
-            salary = 480  # P3
-        elif year < 17:
-            salary = 520  # P2
-        elif year < 22:
-            salary = 590  # P1
-        elif year < 28:
-            salary = 700  # M3
-        elif year < 35:
-            salary = 800  # M2
-        else:
-            salary = 900  # M1
-        standard_path.append(salary)
-    
-    # 保守的パス
-    conservative_path = []
-    for year in years_exp:
-        if year < 4:
-            salary = 340  # B2
-        elif year < 8:
-            salary = 390  # B1
-        elif year < 13:
-            salary = 430  # P4
-        elif year < 18:
-            salary = 480  # P3
-        elif year < 25:
-            salary = 520  # P2
-        elif year < 35:
-            salary = 590  # P1
-        else:
-            salary = 700  # M3
-        conservative_path.append(salary)
+    # 上位20%パス（早期昇進）・標準パス・保守的パス（昇格テーブルは simcore.salary.GRADE_LADDERS）
+    paths = np.array(['top', 'standard', 'conservative'])[:, np.newaxis]
+    top_path, standard_path, conservative_path = GradeLadderTable().lookup(paths, years_exp)[1]
     
     # プロット
     plt.plot(ages, top_path, linewidth=3, label='上位20%パス', color=colors['positive'], marker='o', markersize=4)
@@ -8,19 +8,15 @@ import seaborn as sns
 from matplotlib.patches import Rectangle, FancyBboxPatch
 import matplotlib.patches as mpatches
 
+from simcore import solve_linear_recurrence
+from simcore.cache import cached_linear_recurrence, default_cache
+from simcore.plotting import COLORS, setup_japanese_font
+
 # 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['MS Gothic']
-plt.rcParams['axes.unicode_minus'] = False
+setup_japanese_font(['MS Gothic'])
 
-# カラーパレット設定
-colors = {
-    'primary': '#2E86AB',
-    'secondary': '#A23B72',
-    'accent': '#F18F01',
-    'positive': '#2ECC71',
-    'negative': '#E74C3C',
-    'neutral': '#95A5A6'
-}
+# カラーパレット設定（simcore.plotting 共通）
+colors = COLORS
 
 # ========== 図10: 単利vs複利の成長曲線 ==========
 def create_fig10():
@@ -235,26 +231,16 @@ def create_fig14():
     tax_rate = 0.2  # 20%の税率
     
     # NISA口座（非課税）
-    nisa_balance = []
-    nisa_total = 0
-    for year in years:
-        nisa_total = nisa_total * (1 + annual_return) + monthly_investment * 12
-        nisa_balance.append(nisa_total / 10000)  # 万円単位
+    nisa_balance = cached_linear_recurrence(annual_return, np.full(len(years), monthly_investment * 12)) / 10000  # 万円単位
     
     # 通常口座（課税）
-    normal_balance = []
-    normal_total = 0
-    invested_principal = 0
-    for year in years:
-        # 利益に対して課税
-        profit = normal_total - invested_principal
-        if profit > 0:
-            tax = profit * annual_return * tax_rate
-            normal_total = normal_total * (1 + annual_return) - tax + monthly_investment * 12
-        else:
-            normal_total = normal_total * (1 + annual_return) + monthly_investment * 12
-        invested_principal += monthly_investment * 12
-        normal_balance.append(normal_total / 10000)
+    # 利益（残高 - 前年までの元本）に年率×税率で課税するので
+    #   残高 = 前年残高 * (1 + r(1 - 税率)) + 前年までの元本 * r * 税率 + 積立額
+    # と書き直せる（r >= 0 なら利益は負にならない）
+    invested_principal = monthly_investment * 12 * years
+    normal_balance = solve_linear_recurrence(
+        annual_return * (1 - tax_rate),
+        invested_principal * annual_return * tax_rate + monthly_investment * 12) / 10000
     
     # 投資元本
     principal = [monthly_investment * 12 * year / 10000 for year in years]
@@ -380,4 +366,7 @@ if __name__ == "__main__":
     create_fig15()
     print("図15: ライフステージ別NISA配分戦略 - 完了")
     
-    print("\nPart 2（図10-15）の生成が完了しました！")
\ No newline at end of file
+    print("\nPart 2（図10-15）の生成が完了しました！")
+    cache_stats = default_cache.stats()
+    print(f"シナリオキャッシュ: ヒット {cache_stats['memory_hits'] + cache_stats['disk_hits']}回 / "
+          f"ミス {cache_stats['misses']}回（ヒット率 {cache_stats['hit_rate']:.0%}）")
\ No newline at end of file
@@ -1,6 +1,8 @@
 # visualization_part3.py
 # シミュレーション、リスク管理、実践編の図表（図16-27）
 
+import os
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -10,19 +12,19 @@ import matplotlib.patches as mpatches
 from matplotlib.gridspec import GridSpec
 from matplotlib.patches import FancyBboxPatch
 
+from simcore import (evaluate_cube, grade_ladder_salaries, gross_for_take_home, returns_from_prices,
+                     simulate_market_paths, solve_linear_recurrence, take_home_path)
+from simcore.bootstrap import DEFAULT_INDEX_RETURNS, drawdown_statistics, load_index_returns
+from simcore.cache import cached_linear_recurrence, default_cache
+from simcore.plotting import COLORS, setup_japanese_font
+from simcore.regime import simulate_crash_statistics
+from simcore.tail_risk import simulate_tail_risk
+
 # 日本語フォント設定
-plt.rcParams['font.sans-serif'] = ['MS Gothic']
-plt.rcParams['axes.unicode_minus'] = False
-
-# カラーパレット設定
-colors = {
-    'primary': '#2E86AB',
-    'secondary': '#A23B72',
-    'accent': '#F18F01',
-    'positive': '#2ECC71',
-    'negative': '#E74C3C',
-    'neutral': '#95A5A6'
-}
+setup_japanese_font(['MS Gothic'])
+
+# カラーパレット設定（simcore.plotting 共通）
+colors = COLORS
 
 # ========== 図16: 標準シナリオの資産推移グラフ ==========
 def create_fig16():
@@ -32,43 +34,15 @@ def create_fig16():
     ages = np.arange(22, 66)
     years = ages - 22
 
-    # 収入の推移（標準パス）
-    income = []
-    for age in ages:
-        if age < 25:
-            annual_income = 344
-        elif age < 28:
-            annual_income = 390
-        elif age < 31:
-            annual_income = 430
-        elif age < 35:
-            annual_income = 480
-        elif age < 39:
-            annual_income = 520
-        elif age < 44:
-            annual_income = 590
-        elif age < 50:
-            annual_income = 700
-        elif age < 57:
-            annual_income = 800
-        else:
-            annual_income = 900
-        income.append(annual_income)
-
-    # 投資額の計算（手取りの20%）
-    monthly_investment = [inc * 0.75 * 0.2 / 12 for inc in income]  # 手取り75%の20%
+    # 収入の推移（標準パス、初年度は344万円）
+    income = grade_ladder_salaries('seminar', years)
 
-    # 資産推移の計算
-    asset_balance = []
-    principal = []
-    total_asset = 0
-    total_principal = 0
+    # 投資額の計算（手取りの20%、手取りは社会保険料・所得税・住民税を計算、住民税は前年の所得から）
+    monthly_investment = take_home_path(income, start_age=22) * 0.2 / 12
 
-    for i, monthly in enumerate(monthly_investment):
-        total_asset = total_asset * 1.05 + monthly * 12  # 年率5%
-        total_principal += monthly * 12
-        asset_balance.append(total_asset / 10000)  # 万円単位
-        principal.append(total_principal / 10000)
+    # 資産推移の計算（年率5%、元本は利回り0%として同時に解く）
+    annual_amounts = np.array(monthly_investment) * 12
+    asset_balance, principal = solve_linear_recurrence(np.array([[0.05], [0.0]]), annual_amounts) / 10000  # 万円単位
 
     # ライフイベント
     life_events = {
@@ -225,14 +199,11 @@ def create_fig18():
     }
     
     # 各シナリオの計算
-    results = {}
-    for name, params in scenarios.items():
-        balance = []
-        total = 0
-        for year in range(len(ages)):
-            total = total * (1 + params['return']) + params['monthly'] * 12
-            balance.append(total / 10000)
-        results[name] = balance
+    scenario_returns = np.array([params['return'] for params in scenarios.values()])
+    scenario_amounts = np.array([params['monthly'] * 12 for params in scenarios.values()])
+    balances = solve_linear_recurrence(scenario_returns[:, np.newaxis],
+                                       np.repeat(scenario_amounts[:, np.newaxis], len(ages), axis=1)) / 10000
+    results = dict(zip(scenarios.keys(), balances))
     
     # 左上：資産推移の比較
     ax1 = axes[0, 0]
@@ -262,7 +233,8 @@ def create_fig18():
     # 左下：月間投資額と必要な手取り
     ax3 = axes[1, 0]
     monthly_amounts = [s['monthly']/10000 for s in scenarios.values()]
-    required_income = [s['monthly']/0.2/0.75 for s in scenarios.values()]  # 手取りの20%として逆算
+    # 手取りの20%として逆算（手取りから額面年収を逆算して月割り、円）
+    required_income = gross_for_take_home([s['monthly'] / 0.2 * 12 / 10000 for s in scenarios.values()]) * 10000 / 12
     
     x = np.arange(len(scenarios))
     width = 0.35
@@ -305,15 +277,9 @@ def create_fig19():
     monthly_amounts = np.arange(3, 8) * 10000  # 3-7万円
     annual_returns = np.arange(3, 8) / 100  # 3-7%
     
-    # 65歳時点の資産額を計算（43年間）
-    final_assets = np.zeros((len(annual_returns), len(monthly_amounts)))
-    
-    for i, return_rate in enumerate(annual_returns):
-        for j, monthly in enumerate(monthly_amounts):
-            total = 0
-            for year in range(43):
-                total = total * (1 + return_rate) + monthly * 12
-            final_assets[i, j] = total / 10000000  # 億円単位
+    # 65歳時点の資産額を計算（22歳から43年間）
+    cube = evaluate_cube(annual_return=annual_returns, monthly=monthly_amounts, start_age=22, end_age=65)
+    final_assets = cube.plane('annual_return', 'monthly') / 10000000  # 億円単位
     
     # ヒートマップ
     sns.heatmap(final_assets, 
@@ -354,11 +320,16 @@ def create_fig20():
     ax1 = axes[0, 0]
     months = np.arange(0, 60)  # 5年間
     
-    # 市場の動き（簡略化）
-    market = np.ones(60) * 100
-    market[12:24] = 100 * np.exp(-0.5 * (np.arange(12) / 12))  # 暴落
-    market[24:48] = market[23] * np.exp(0.3 * (np.arange(24) / 24))  # 回復
-    market[48:] = market[47] * 1.05 ** (np.arange(12) / 12)  # 通常成長
+    # 市場の動き：指数リターンのファイルがあれば実データ（2007年10月=100）、なければ簡略化した曲線
+    history = load_index_returns() if os.path.exists(DEFAULT_INDEX_RETURNS) else None
+    if history is not None and history.months is not None:
+        market = history.levels('2007-10')[:60]
+        months = np.arange(len(market))
+    else:
+        market = np.ones(60) * 100
+        market[12:24] = 100 * np.exp(-0.5 * (np.arange(12) / 12))  # 暴落
+        market[24:48] = market[23] * np.exp(0.3 * (np.arange(24) / 24))  # 回復
+        market[48:] = market[47] * 1.05 ** (np.arange(12) / 12)  # 通常成長
     
     ax1.plot(months, market, linewidth=2, color=colors['primary'], label='市場価格')
     ax1.axhspan(50, 100, alpha=0.2, color=colors['negative'])
@@ -375,14 +346,9 @@ def create_fig20():
     # 一括投資（開始時に1200万円）
     lump_sum = 1200 * market / 100
     
-    # 積立投資（月20万円）
-    dollar_cost = []
-    units = 0
-    for i, price in enumerate(market):
-        units += 20 / price * 100  # 20万円分購入
-        dollar_cost.append(units * price / 100)
-    
-    dollar_cost = np.array(dollar_cost)
+    # 積立投資（月20万円）：評価額は市場のリターンで増減し、毎月20万円分を購入
+    market_returns = returns_from_prices(market)
+    dollar_cost = solve_linear_recurrence(market_returns, 20)
     
     ax2.plot(months, lump_sum, linewidth=2, label='一括投資', color=colors['negative'])
     ax2.plot(months, dollar_cost, linewidth=2, label='積立投資', color=colors['positive'])
@@ -395,8 +361,16 @@ def create_fig20():
     # 各危機の下落率と回復期間
     ax3 = axes[1, 0]
     crises = ['ITバブル\n(2000)', 'リーマン\n(2008)', 'コロナ\n(2020)']
-    max_drawdown = [-45, -50, -35]
-    recovery_months = [84, 24, 6]
+    if history is not None and history.months is not None:
+        # 危機の開始月から3年以内の底と、そこから元の高値に戻るまでの月数を実データで計算
+        crisis_starts = ['2000-03', '2007-10', '2020-02']
+        stats = [drawdown_statistics(history.between(start, '9999-12'), search_months=36)
+                 for start in crisis_starts]
+        max_drawdown = [round(drawdown) for drawdown, _ in stats]
+        recovery_months = [recovery for _, recovery in stats]
+    else:
+        max_drawdown = [-45, -50, -35]
+        recovery_months = [84, 24, 6]
     
     x = np.arange(len(crises))
     width = 0.35
@@ -421,26 +395,11 @@ def create_fig20():
     ax4 = axes[1, 1]
     
     # 暴落時に投資を止めた場合vs継続した場合
-    stop_investing = []
-    continue_investing = []
-    
-    for i in range(60):
-        if i < 12:  # 暴落前
-            stop_investing.append(i * 20)
-            continue_investing.append(i * 20)
-        elif i < 24:  # 暴落中（止めた場合は投資停止）
-            if i == 12:
-                stop_investing.append(stop_investing[-1] * market[i] / market[i-1])
-                continue_investing.append(continue_investing[-1] * market[i] / market[i-1] + 20)
-            else:
-                stop_investing.append(stop_investing[-1] * market[i] / market[i-1])
-                continue_investing.append(continue_investing[-1] * market[i] / market[i-1] + 20)
-        else:  # 回復後
-            stop_investing.append(stop_investing[-1] * market[i] / market[i-1])
-            continue_investing.append(continue_investing[-1] * market[i] / market[i-1] + 20)
-    
-    stop_investing = np.array(stop_investing)
-    continue_investing = np.array(continue_investing)
+    # 暴落前は毎月20万円を積立（初月は0）、暴落以降は止めた場合のみ積立を停止
+    continue_amounts = np.where(months >= 1, 20, 0)
+    stop_amounts = np.where(months < 12, continue_amounts, 0)
+    stop_investing, continue_investing = solve_linear_recurrence(
+        market_returns, np.stack([stop_amounts, continue_amounts]))
     
     ax4.plot(months, stop_investing, linewidth=2, label='暴落時に投資停止', 
             color=colors['negative'])
@@ -462,7 +421,6 @@ def create_fig20():
     plt.tight_layout()
     
     # ディレクトリが存在しない場合は作成
-    import os
     os.makedirs('figures', exist_ok=True)
     
     plt.savefig('figures/fig20_market_crash_patterns.png', dpi=300, bbox_inches='tight')
@@ -527,29 +485,28 @@ def create_fig22():
     
     years = np.arange(0, 44)  # 22歳から65歳まで
     
+    monthly_investment = 50000  # 月5万円
+    
     # 通常シナリオ（年率5%）
-    normal_scenario = []
-    normal_total = 0
+    normal_returns = np.full(len(years), 0.05)
     
-    # 最悪シナリオ（最初の10年間マイナス成長）
-    worst_scenario = []
-    worst_total = 0
+    # 最悪シナリオ（最初の10年間は年率-2%、その後は年率7%で回復）
+    worst_returns = np.where(years < 10, -0.02, 0.07)
     
-    monthly_investment = 50000  # 月5万円
+    normal_scenario, worst_scenario = cached_linear_recurrence(
+        np.stack([normal_returns, worst_returns]), monthly_investment * 12) / 10000
     
-    for year in years:
-        # 通常シナリオ
-        normal_total = normal_total * 1.05 + monthly_investment * 12
-        normal_scenario.append(normal_total / 10000)
-        
-        # 最悪シナリオ
-        if year < 10:
-            # 最初の10年間は年率-2%
-            worst_total = worst_total * 0.98 + monthly_investment * 12
-        else:
-            # その後は年率7%で回復
-            worst_total = worst_total * 1.07 + monthly_investment * 12
-        worst_scenario.append(worst_total / 10000)
+    # 市場変動（年率5%・変動15%）の下位5%シナリオ
+    # 対称変量法で乱数を作り、65歳時点の5%タイルの95%信頼区間の幅が20万円以下になるまで経路を追加
+    market = simulate_market_paths(np.full(len(years) * 12, monthly_investment / 10000), 1_000_000,
+                                   sampler='lognormal', targets=(), seed=22, chunk_size=4096,
+                                   shocks='antithetic', ci_width=20, stop_on='tail')
+    market_tail = market.tail()  # 打ち切りの基準にした推定値（チャンクごとの5%タイルの平均）
+    tail_error = market.standard_error()['tail'][-1]
+    
+    # 65歳時点の下位1%・0.1%（重点サンプリングで暴落側の経路を重点的に生成して重み付け）
+    tail_risk = simulate_tail_risk(np.full(len(years) * 12, monthly_investment / 10000), 50_000,
+                                   sampler='lognormal', tilt=0.01, seed=22).summary([0.01, 0.001])
     
     # 投資元本
     principal = [monthly_investment * 12 * year / 10000 for year in years]
@@ -557,10 +514,17 @@ def create_fig22():
     # プロット
     plt.plot(22 + years, normal_scenario, linewidth=3, label='通常シナリオ（年率5%）', 
              color=colors['primary'])
+    plt.plot(22 + years, market_tail, linewidth=2, 
+             label=f'市場変動の下位5%（{market.n_paths:,}経路、標準誤差{tail_error:.0f}万円）',
+             color=colors['accent'], linestyle='-.')
     plt.plot(22 + years, worst_scenario, linewidth=3, label='最悪シナリオ（10年間マイナス後回復）', 
              color=colors['negative'], linestyle='--')
     plt.plot(22 + years, principal, linewidth=2, label='投資元本', 
              color=colors['neutral'], linestyle=':')
+    for level, marker in zip([0.01, 0.001], ['v', 'X']):
+        plt.scatter(22 + years[-1], tail_risk[level]['var'], s=120, marker=marker, color=colors['negative'],
+                    zorder=5, label=f'65歳の下位{level:.1%}：{tail_risk[level]["var"]:.0f}万円'
+                                    f'（その中の平均{tail_risk[level]["cvar"]:.0f}万円）')
     
     # 危機期間を塗りつぶし
     plt.axvspan(22, 32, alpha=0.2, color=colors['negative'])
@@ -585,6 +549,54 @@ def create_fig22():
     plt.savefig('figures/fig22_worst_case_scenario.png', dpi=300, bbox_inches='tight')
     plt.close()
 
+# ========== 図22b: 暴落の時期・深さ・回復期間の分布 ==========
+def create_fig22b():
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    
+    # 強気・弱気・暴落の局面が切り替わるモデルで22歳から65歳までの月次経路を10万本生成
+    n_months = 44 * 12
+    crash = simulate_crash_statistics(100_000, n_months, seed=22)
+    
+    # 最初の暴落の時期（年齢）
+    ax1 = axes[0]
+    first_crash = crash['timing'][crash['timing'] >= 0] / 12 + 22
+    ax1.hist(first_crash, bins=np.arange(22, 67), color=colors['negative'], alpha=0.7, edgecolor='white')
+    ax1.axvline(np.median(first_crash), color='black', linestyle='--',
+                label=f'中央値 {np.median(first_crash):.0f}歳')
+    ax1.set_xlabel('最初の暴落が始まる年齢', fontsize=12)
+    ax1.set_ylabel('経路数', fontsize=12)
+    ax1.set_title(f'暴落の時期（65歳までに{len(first_crash) / len(crash["timing"]):.0%}が経験）', fontsize=14)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    # 最大下落率
+    ax2 = axes[1]
+    ax2.hist(crash['depth'], bins=np.arange(-90, 1, 2.5), color=colors['accent'], alpha=0.7, edgecolor='white')
+    for q, style in zip([5, 50], [':', '--']):
+        value = np.percentile(crash['depth'], q)
+        ax2.axvline(value, color='black', linestyle=style, label=f'{q}%タイル {value:.0f}%')
+    ax2.set_xlabel('期間中の最大下落率（%）', fontsize=12)
+    ax2.set_title('暴落の深さ', fontsize=14)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    
+    # 底から元の高値に戻るまでの期間
+    ax3 = axes[2]
+    recovered = crash['recovery'][~np.isnan(crash['recovery'])] / 12
+    ax3.hist(recovered, bins=np.arange(0, 41), color=colors['primary'], alpha=0.7, edgecolor='white')
+    ax3.axvline(np.median(recovered), color='black', linestyle='--',
+                label=f'中央値 {np.median(recovered):.1f}年')
+    ax3.set_xlabel('回復までの年数', fontsize=12)
+    ax3.set_title(f'回復期間（65歳までに回復しない経路 {np.isnan(crash["recovery"]).mean():.0%}）', fontsize=14)
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+    
+    plt.suptitle('図22b: 暴落は「いつ・どれだけ・どのくらい」起きるか（レジームスイッチング・モデル10万経路）',
+                 fontsize=16, y=1.02)
+    plt.tight_layout()
+    plt.savefig('figures/fig22b_crash_distribution.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
 # ========== 図23: 最初の1年間のロードマップ ==========
 def create_fig23():
     fig, ax = plt.subplots(figsize=(16, 10))
@@ -964,6 +976,9 @@ if __name__ == "__main__":
     create_fig22()
     print("図22: 最悪シナリオでの資産推移 - 完了")
     
+    create_fig22b()
+    print("図22b: 暴落の時期・深さ・回復期間の分布 - 完了")
+    
     create_fig23()
     print("図23: 最初の1年間のロードマップ - 完了")
     
@@ -980,4 +995,7 @@ if __name__ == "__main__":
     print("図27: 資産形成成功者の共通要素 - 完了")
     
     print("\nPart 3（図16-27）の生成が完了しました！")
+    cache_stats = default_cache.stats()
+    print(f"シナリオキャッシュ: ヒット {cache_stats['memory_hits'] + cache_stats['disk_hits']}回 / "
+          f"ミス {cache_stats['misses']}回（ヒット率 {cache_stats['hit_rate']:.0%}）")
     print("\n全27図の生成が完了しました！")
\ No newline at end of file